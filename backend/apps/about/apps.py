@@ -7,3 +7,8 @@ class AboutConfig(AppConfig):
     
     # NOTE: Do not access database in ready() - it runs before migrations
     # Instead, create a data migration or management command to initialize default data
+
+    def ready(self):
+        from .signals import register_about_cache_signals
+
+        register_about_cache_signals()
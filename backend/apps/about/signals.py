@@ -0,0 +1,15 @@
+"""About app signal registration.
+
+``register_about_cache_signals`` is called from AboutConfig.ready and keeps
+cached about page responses in sync with writes.
+"""
+
+from apps.core.response_cache import register_cache_invalidation
+from .models import AboutPage
+
+ABOUT_CACHE_TAG = "about"
+
+
+def register_about_cache_signals() -> None:
+    """Invalidate cached about page responses whenever the page changes."""
+    register_cache_invalidation(AboutPage, lambda instance: [ABOUT_CACHE_TAG])
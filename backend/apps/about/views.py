@@ -1,9 +1,11 @@
-from rest_framework import viewsets, status
+from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.decorators import action
-from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
+from apps.core.response_cache import build_cache_key, cached_response
 from .models import AboutPage
 from .serializers import AboutPageSerializer
+from .signals import ABOUT_CACHE_TAG
 import logging
 
 logger = logging.getLogger('django')
@@ -19,14 +21,16 @@ class AboutPageViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def current(self, request):
         """Get current/primary about page (most recently updated)."""
-        about = AboutPage.objects.order_by('-updated_at').first()
-        if not about:
-            logger.warning('[AboutAPI] No about page found')
-            return Response(
-                {'detail': 'About page not configured'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        serializer = self.get_serializer(about)
-        logger.debug(f'[AboutAPI] Returning about page: {about.headline}')
-        return Response(serializer.data)
+        cache_key = build_cache_key('about', 'current', request, tags=[ABOUT_CACHE_TAG])
+
+        def fetch_payload():
+            about = AboutPage.objects.order_by('-updated_at').first()
+            if not about:
+                logger.warning('[AboutAPI] No about page found')
+                raise NotFound('About page not configured')
+
+            serializer = self.get_serializer(about)
+            logger.debug(f'[AboutAPI] Returning about page: {about.headline}')
+            return serializer.data
+
+        return cached_response(request, cache_key, fetch_payload)
@@ -0,0 +1,138 @@
+"""Revenue and order time series for the admin dashboard.
+
+Series are grouped in the database over ``DailySalesRollup`` (``TruncWeek`` /
+``TruncMonth`` on the rollup date), counting sold orders
+(``apps.orders.order_lines.SALES_STATUSES``) by the day they were placed, like
+the summary's revenue figures. Periods are always whole: ``from``/``to`` are
+widened to the start of their week or month.
+
+Every closed period is cached on its own under a cache tag for that period
+(``sales_period_tags``). Order writes bump the tags of the periods the order
+was placed in, so a year-long chart only recomputes the current period and
+any past period whose orders actually changed.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List
+
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from apps.core.response_cache import get_or_set_many_payloads, get_tag_versions
+from apps.orders.models import DailySalesRollup
+from apps.orders.order_lines import SALES_STATUSES
+
+GRANULARITIES = ('day', 'week', 'month')
+DEFAULT_PERIODS = {'day': 30, 'week': 12, 'month': 12}
+MAX_PERIODS = 750
+CLOSED_PERIOD_TIMEOUT = 60 * 60 * 24
+
+
+def period_start(granularity: str, day: date) -> date:
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(granularity: str, start: date) -> date:
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    if granularity == 'month':
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def default_start(granularity: str, end: date) -> date:
+    start = period_start(granularity, end)
+    for _ in range(DEFAULT_PERIODS[granularity] - 1):
+        start = period_start(granularity, start - timedelta(days=1))
+    return start
+
+
+def iter_periods(granularity: str, start: date, end: date) -> List[date]:
+    """Start dates of every period overlapping ``[start, end]``."""
+    periods = []
+    current = period_start(granularity, start)
+    while current <= end:
+        periods.append(current)
+        current = next_period(granularity, current)
+    return periods
+
+
+def sales_period_tag(granularity: str, start: date) -> str:
+    return f"sales-period:{granularity}:{start.isoformat()}"
+
+
+def sales_period_tags(created_at) -> List[str]:
+    """Cache tags of every period containing an order placed at ``created_at``."""
+    day = timezone.localdate(created_at)
+    return [sales_period_tag(granularity, period_start(granularity, day)) for granularity in GRANULARITIES]
+
+
+def _empty_point(start: date) -> Dict[str, Any]:
+    return {
+        'period': start.isoformat(),
+        'revenue': Decimal('0.00'),
+        'orders': 0,
+        'average_order_value': Decimal('0.00'),
+        'units': 0,
+    }
+
+
+def compute_periods(granularity: str, starts: Iterable[date]) -> Dict[date, Dict[str, Any]]:
+    """Series points for ``starts`` in one grouped query over the rollups."""
+    starts = sorted(set(starts))
+    if not starts:
+        return {}
+    rollups = DailySalesRollup.objects.filter(
+        status__in=SALES_STATUSES,
+        date__gte=starts[0],
+        date__lt=next_period(granularity, starts[-1]),
+    )
+    if granularity == 'week':
+        rollups = rollups.annotate(period=TruncWeek('date'))
+    elif granularity == 'month':
+        rollups = rollups.annotate(period=TruncMonth('date'))
+    else:
+        rollups = rollups.annotate(period=F('date'))
+    rows = rollups.values('period').annotate(
+        revenue=Sum('revenue'), orders=Sum('order_count'), units=Sum('units'),
+    ).order_by()
+
+    points = {start: _empty_point(start) for start in starts}
+    for row in rows:
+        point = points.get(row['period'])
+        if point is None:
+            continue
+        orders = row['orders'] or 0
+        revenue = row['revenue'] or Decimal('0.00')
+        point.update({
+            'revenue': revenue,
+            'orders': orders,
+            'average_order_value': (revenue / orders).quantize(Decimal('0.01')) if orders else Decimal('0.00'),
+            'units': row['units'] or 0,
+        })
+    return points
+
+
+def sales_series(granularity: str, start: date, end: date) -> List[Dict[str, Any]]:
+    """Revenue, orders, AOV and units per period from ``start`` to ``end``."""
+    periods = iter_periods(granularity, start, end)
+    current = period_start(granularity, timezone.localdate())
+    closed = [period for period in periods if period < current]
+
+    tags = {period: sales_period_tag(granularity, period) for period in closed}
+    versions = get_tag_versions(tags.values())
+    keys = {
+        period: f"admin-analytics:{granularity}:{period.isoformat()}:{versions[tags[period]]}"
+        for period in closed
+    }
+    points = get_or_set_many_payloads(
+        keys, lambda missing: compute_periods(granularity, missing), timeout=CLOSED_PERIOD_TIMEOUT,
+    )
+    # The current (and any future) period is always live
+    points.update(compute_periods(granularity, [period for period in periods if period >= current]))
+    return [points[period] for period in periods]
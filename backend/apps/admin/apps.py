@@ -7,3 +7,8 @@ class AdminConfig(AppConfig):
     # Use a custom label to avoid colliding with Django's builtin 'admin' app
     label = 'pgf_admin'
     verbose_name = 'Admin Dashboard'
+
+    def ready(self):
+        from .signals import register_dashboard_cache_signals
+
+        register_dashboard_cache_signals()
@@ -0,0 +1,37 @@
+"""Counts behind the admin dashboard summary and alerts.
+
+Each table is read once per payload: orders through the daily rollups
+(``apps.orders.rollups.status_totals``, one grouped query) and messages with
+one conditional aggregate. The views cache the resulting payloads for
+``ADMIN_DASHBOARD_CACHE_TTL`` seconds per role; order and message writes
+invalidate them (see ``apps.admin.signals``).
+"""
+from typing import Dict
+
+from django.db.models import Count, Q
+
+from apps.messages.models import UserMessage
+
+AWAITING_CONFIRMATION = ('pending', 'received', 'confirmed')
+IN_TRANSIT = ('shipped', 'out_for_delivery')
+
+
+def message_counts() -> Dict[str, int]:
+    """Total, unread (``new``) and awaiting-reply (``new``/``read``) messages."""
+    return UserMessage.objects.aggregate(
+        total=Count('id'),
+        unread=Count('id', filter=Q(status='new')),
+        awaiting_reply=Count('id', filter=Q(status__in=('new', 'read'))),
+    )
+
+
+def orders_with_status(totals, statuses) -> int:
+    """Sum of order counts in ``totals`` (from ``status_totals``) for ``statuses``."""
+    return sum(totals.get(status, {}).get('orders') or 0 for status in statuses)
+
+
+def role_scope(user) -> str:
+    """Cache scope for ``user``: dashboard payloads are cached per role."""
+    if getattr(user, 'is_superuser', False):
+        return 'superuser'
+    return f"role-{getattr(user, 'role', None) or 'staff'}"
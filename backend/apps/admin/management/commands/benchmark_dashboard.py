@@ -0,0 +1,153 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Avg, Q, Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.admin.analytics import sales_series
+from apps.admin.views import AdminDashboardViewSet
+from apps.core.response_cache import get_local_cache, get_or_set_payload
+from apps.messages.models import UserMessage
+from apps.orders.models import Order
+from apps.orders.rollups import rebuild_rollups
+
+STATUS_WEIGHTS = [
+    ('pending', 5), ('received', 3), ('confirmed', 3), ('processing', 5), ('shipped', 4),
+    ('out_for_delivery', 2), ('delivered', 70), ('cancelled', 8),
+]
+
+
+def legacy_summary_and_alerts():
+    """The per-status count()/Sum() queries the dashboard issued before rollups."""
+    now = timezone.now()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    month_start = today_start.replace(day=1)
+    delivered = Order.objects.filter(status='delivered')
+    summary = [
+        Order.objects.count(),
+        Order.objects.filter(status='pending').count(),
+        Order.objects.filter(status='processing').count(),
+        delivered.count(),
+        Order.objects.filter(status='cancelled').count(),
+        UserMessage.objects.filter(status='new').count(),
+        UserMessage.objects.count(),
+        delivered.filter(created_at__gte=today_start).aggregate(total=Sum('total_amount')),
+        delivered.filter(created_at__gte=month_start).aggregate(total=Sum('total_amount')),
+        delivered.aggregate(total=Sum('total_amount')),
+        Order.objects.aggregate(avg=Avg('total_amount')),
+        list(Order.objects.order_by('-created_at')[:5]),
+        list(UserMessage.objects.order_by('-created_at')[:5]),
+    ]
+    alerts = [
+        Order.objects.filter(Q(status='pending') | Q(status='received') | Q(status='confirmed')).count(),
+        UserMessage.objects.filter(Q(status='new') | Q(status='read')).count(),
+        Order.objects.filter(status='processing').count(),
+        Order.objects.filter(Q(status='shipped') | Q(status='out_for_delivery')).count(),
+    ]
+    return summary, alerts
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the admin dashboard summary/alerts queries on a seeded database: the "
+        "previous per-status queries against the rollup/conditional-aggregate version, "
+        "uncached and cached. Seeded rows are rolled back unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=100000, help="Orders to seed.")
+        parser.add_argument("--messages", type=int, default=5000, help="Messages to seed.")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per variant.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--keep", action="store_true", help="Commit the seeded rows.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            self.run(options["repeat"])
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def seed(self, options):
+        rng = random.Random(options["seed"])
+        statuses = [status for status, weight in STATUS_WEIGHTS for _ in range(weight)]
+        now = timezone.now()
+        started = time.perf_counter()
+        remaining = options["orders"]
+        while remaining > 0:
+            batch = []
+            for _ in range(min(remaining, 2000)):
+                qty = rng.randint(1, 3)
+                price = Decimal(rng.randrange(500, 20000)).quantize(Decimal('1.00'))
+                batch.append(Order(
+                    name='Bench Customer', email='bench@example.com', phone='0700000000', address='Nairobi',
+                    items=[{'product_id': rng.randint(1, 500), 'name': 'Bench item', 'price': str(price), 'qty': qty}],
+                    total_amount=price * qty, status=rng.choice(statuses), paid=rng.random() < 0.6,
+                ))
+            created = Order.objects.bulk_create(batch)
+            # auto_now_add stamps every row with now(); spread them over a year
+            for order in created:
+                order.created_at = now - timedelta(days=rng.randint(0, 364), minutes=rng.randint(0, 1439))
+            Order.objects.bulk_update(created, ['created_at'], batch_size=1000)
+            remaining -= len(batch)
+
+        UserMessage.objects.bulk_create(
+            [
+                UserMessage(
+                    name='Bench Visitor', email='visitor@example.com',
+                    message='Is this available?', status=rng.choice(['new', 'read', 'replied', 'resolved']),
+                )
+                for _ in range(options["messages"])
+            ],
+            batch_size=2000,
+        )
+        rows = rebuild_rollups()
+        self.stdout.write(
+            f"Seeded {options['orders']} orders and {options['messages']} messages "
+            f"({rows} rollup rows) in {time.perf_counter() - started:.1f} s"
+        )
+
+    def measure(self, label, func, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        query_count = len(queries)
+        timings_ms = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings_ms.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(
+            f"{label:<36} {query_count:>3} queries  "
+            f"mean {statistics.mean(timings_ms):8.2f} ms  p50 {statistics.median(timings_ms):8.2f} ms"
+        )
+
+    def run(self, repeat):
+        view = AdminDashboardViewSet()
+
+        def consolidated():
+            view.build_summary()
+            view.build_alerts()
+
+        def cached():
+            get_or_set_payload('benchmark-dashboard:summary', view.build_summary, timeout=60)
+            get_or_set_payload('benchmark-dashboard:alerts', view.build_alerts, timeout=60)
+
+        self.measure("before (per-status queries)", legacy_summary_and_alerts, repeat)
+        self.measure("after (rollups + one aggregate)", consolidated, repeat)
+        cached()  # warm
+        self.measure("after, cached", cached, repeat)
+        cache.delete_many(['benchmark-dashboard:summary', 'benchmark-dashboard:alerts'])
+
+        today = timezone.localdate()
+        year_ago = today - timedelta(days=364)
+        self.measure("analytics, 365 days (first call)", lambda: sales_series('day', year_ago, today), 1)
+        self.measure("analytics, 365 days (closed cached)", lambda: sales_series('day', year_ago, today), repeat)
+        self.measure("analytics, 12 months", lambda: sales_series('month', year_ago, today), repeat)
+        get_local_cache().clear()
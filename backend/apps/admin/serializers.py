@@ -315,6 +315,7 @@ class RevenueAnalyticsSerializer(serializers.Serializer):
     revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
     orders = serializers.IntegerField()
     average_order_value = serializers.DecimalField(max_digits=12, decimal_places=2)
+    units = serializers.IntegerField(required=False)
 
 
 class AlertSerializer(serializers.Serializer):
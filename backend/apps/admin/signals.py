@@ -0,0 +1,28 @@
+"""Admin dashboard signal registration.
+
+``register_dashboard_cache_signals`` is called from AdminConfig.ready and
+drops cached dashboard summaries/alerts whenever an order or message changes,
+including through the admin status and mark-paid endpoints. Order writes
+also bump the sales period tags of the day, week and month the order was
+placed in (see ``apps.admin.analytics``).
+"""
+
+from apps.core.response_cache import register_cache_invalidation
+from apps.admin.analytics import sales_period_tags
+from apps.messages.models import UserMessage
+from apps.orders.models import Order
+
+ADMIN_DASHBOARD_CACHE_TAG = "admin-dashboard"
+
+
+def order_cache_tags(order) -> list:
+    """Return every dashboard cache tag invalidated by a write to ``order``."""
+    if order.created_at is None:
+        return [ADMIN_DASHBOARD_CACHE_TAG]
+    return [ADMIN_DASHBOARD_CACHE_TAG, *sales_period_tags(order.created_at)]
+
+
+def register_dashboard_cache_signals() -> None:
+    """Invalidate cached dashboard payloads on order and message writes."""
+    register_cache_invalidation(Order, order_cache_tags)
+    register_cache_invalidation(UserMessage, lambda instance: [ADMIN_DASHBOARD_CACHE_TAG])
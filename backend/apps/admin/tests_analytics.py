@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.response_cache import get_local_cache
+from apps.orders.models import Order
+from apps.users.models import User
+
+
+def make_order(days_ago, amount, qty=1, status='delivered'):
+    order = Order.objects.create(
+        name='Jane', email='jane@example.com', phone='0712345678', address='Nairobi',
+        items=[{'product_id': 1, 'name': 'Sofa', 'price': str(amount / qty), 'qty': qty}],
+        total_amount=amount, status=status,
+    )
+    # created_at is auto_now_add; move it back and let the rollups follow
+    order.created_at = timezone.now() - timedelta(days=days_ago)
+    order.save(update_fields=['created_at'])
+    return order
+
+
+class SalesAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_local_cache().clear()
+        self.client = APIClient()
+        admin = User.objects.create_superuser(email='admin@example.com', password='StrongPass123!', name='Admin')
+        self.client.force_authenticate(admin)
+        self.today = timezone.localdate()
+
+    def get(self, **params):
+        response = self.client.get('/api/admin/dashboard/analytics/', params)
+        self.assertEqual(response.status_code, 200)
+        return {point['period']: point for point in response.data['results']}
+
+    def test_daily_series_fills_gaps_and_counts_sold_orders(self):
+        make_order(2, Decimal('100.00'), qty=2)
+        make_order(2, Decimal('50.00'))
+        make_order(2, Decimal('999.00'), status='cancelled')
+        make_order(0, Decimal('30.00'))
+
+        series = self.get(granularity='day', **{'from': (self.today - timedelta(days=3)).isoformat()})
+
+        self.assertEqual(len(series), 4)
+        two_days_ago = series[(self.today - timedelta(days=2)).isoformat()]
+        self.assertEqual(
+            (two_days_ago['orders'], two_days_ago['revenue'], two_days_ago['average_order_value'], two_days_ago['units']),
+            (2, '150.00', '75.00', 3),
+        )
+        self.assertEqual(series[(self.today - timedelta(days=1)).isoformat()]['orders'], 0)
+        self.assertEqual(series[self.today.isoformat()]['revenue'], '30.00')
+
+        weeks = self.get(granularity='week', **{'from': (self.today - timedelta(days=14)).isoformat()})
+        self.assertEqual(sum(point['orders'] for point in weeks.values()), 3)
+        self.assertTrue(all(date.fromisoformat(period).weekday() == 0 for period in weeks))
+
+    def test_closed_periods_are_cached_until_their_orders_change(self):
+        order = make_order(40, Decimal('100.00'))
+        month = (self.today - timedelta(days=40)).replace(day=1).isoformat()
+        params = {'granularity': 'month', 'from': month}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.get(**params)[month]['orders'], 1)
+        # Only the current month is recomputed
+        with self.assertNumQueries(1):
+            self.get(**params)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = 'cancelled'
+            order.save()
+        self.assertEqual(self.get(**params)[month]['orders'], 0)
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.client.get('/api/admin/dashboard/analytics/?granularity=year').status_code, 400)
+        self.assertEqual(self.client.get('/api/admin/dashboard/analytics/?from=yesterday').status_code, 400)
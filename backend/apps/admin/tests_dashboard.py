@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.core.response_cache import get_local_cache
+from apps.messages.models import UserMessage
+from apps.orders.models import Order
+from apps.users.models import User
+
+
+def make_order(status='pending', amount=Decimal('100.00')):
+    return Order.objects.create(
+        name='Jane', email='jane@example.com', phone='0712345678', address='Nairobi',
+        items=[{'product_id': 1, 'name': 'Sofa', 'price': str(amount), 'qty': 1}],
+        total_amount=amount, status=status,
+    )
+
+
+class DashboardSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_local_cache().clear()
+        self.client = APIClient()
+        admin = User.objects.create_superuser(email='admin@example.com', password='StrongPass123!', name='Admin')
+        self.client.force_authenticate(admin)
+        for status in ('pending', 'received', 'processing', 'shipped', 'delivered'):
+            make_order(status)
+        UserMessage.objects.create(name='Ann', email='ann@example.com', message='Hello there', status='new')
+        UserMessage.objects.create(name='Ben', email='ben@example.com', message='Hello there', status='read')
+
+    def test_summary_and_alerts_use_one_query_per_table_and_are_cached(self):
+        # rollups, messages, recent orders, recent messages
+        with self.assertNumQueries(4):
+            summary = self.client.get('/api/admin/dashboard/summary/').data
+        # rollups, messages
+        with self.assertNumQueries(2):
+            alerts = self.client.get('/api/admin/dashboard/alerts/').data
+        with self.assertNumQueries(0):
+            self.client.get('/api/admin/dashboard/summary/')
+            self.client.get('/api/admin/dashboard/alerts/')
+
+        self.assertEqual(summary['total_orders'], 5)
+        self.assertEqual(summary['unread_messages'], 1)
+        self.assertEqual(summary['total_messages'], 2)
+        counts = {alert['type']: alert['count'] for alert in alerts}
+        self.assertEqual(counts, {
+            'pending_orders': 2, 'unread_messages': 2, 'processing_orders': 1, 'in_transit_orders': 1,
+        })
+
+    def test_status_and_paid_endpoints_invalidate_cached_summary(self):
+        self.assertEqual(self.client.get('/api/admin/dashboard/summary/').data['delivered_orders'], 1)
+        order = Order.objects.get(status='processing')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/admin/dashboard/orders/{order.id}/status/', {'status': 'delivered'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        summary = self.client.get('/api/admin/dashboard/summary/').data
+        self.assertEqual(summary['delivered_orders'], 2)
+        self.assertEqual(summary['revenue_all_time'], '200.00')
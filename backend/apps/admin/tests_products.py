@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.orders.models import Order
+from apps.orders.order_lines import create_order_lines
+from apps.products.models import Product
+from apps.users.models import User
+
+
+class AdminProductQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin = User.objects.create_superuser(email='admin@example.com', password='StrongPass123!', name='Admin')
+        self.client.force_authenticate(admin)
+        self.products = [
+            Product.objects.create(name=f'Chair {index}', slug=f'chair-{index}', price=Decimal('10.00'))
+            for index in range(12)
+        ]
+        items = [
+            {'product_id': product.id, 'name': product.name, 'price': '10.00', 'qty': index + 1}
+            for index, product in enumerate(self.products)
+        ]
+        order = Order.objects.create(
+            name='Jane', email='jane@example.com', phone='0712345678', address='Nairobi',
+            items=items, total_amount=Decimal('780.00'), status='delivered',
+        )
+        create_order_lines(order)
+
+    def test_top_products_resolves_products_in_one_query(self):
+        # grouped sales, one in_bulk for the products
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/admin/dashboard/top-products/?limit=10')
+
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual(response.data[0]['id'], self.products[-1].id)
+        self.assertEqual(response.data[0]['units_sold'], 12)
+        self.assertEqual(response.data[0]['revenue'], 120.0)
+
+    def test_products_page_fetches_sales_for_its_rows_only(self):
+        # count, page, sales of the page's ids
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/admin/dashboard/products/?limit=5')
+        self.assertEqual(len(response.data['results']), 5)
+        units = {row['id']: row['units_sold'] for row in response.data['results']}
+        self.assertEqual(units[self.products[-1].id], 12)
+
+        # page, sales (no COUNT in cursor mode)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/admin/dashboard/products/?cursor=&limit=5')
+        self.assertEqual(len(response.data['results']), 5)
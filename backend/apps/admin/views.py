@@ -1,8 +1,10 @@
 import logging
-from datetime import timedelta
+from datetime import date, timedelta
+from django.conf import settings
 from django.utils import timezone
 from django.db import IntegrityError
-from django.db.models import Sum, Avg, Q, F, Case, When, Value
+from django.http import StreamingHttpResponse
+from django.db.models import F, Case, When, Value
 from django.db.models.functions import Coalesce
 from django.contrib.contenttypes.models import ContentType
 from rest_framework import viewsets, status
@@ -10,10 +12,20 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import JSONRenderer
 
 from apps.orders.models import Order
+from apps.orders.exports import EXPORT_FORMATS, export_queryset, iter_export
+from apps.orders.order_lines import product_sales_map, top_selling
+from apps.orders.rollups import status_totals
 from apps.messages.models import UserMessage
 from apps.products.models import Product
+from apps.products.search import search_products
+from apps.core.pagination import KeysetPagination
+from apps.core.response_cache import build_cache_key, get_or_set_payload
+from apps.admin.analytics import GRANULARITIES, MAX_PERIODS, default_start, iter_periods, sales_series
+from apps.admin.dashboard import AWAITING_CONFIRMATION, IN_TRANSIT, message_counts, orders_with_status, role_scope
+from apps.admin.signals import ADMIN_DASHBOARD_CACHE_TAG
 from apps.admin.models import AdminAuditLog
 from apps.admin.permissions import IsAdminOrStaff, HasRole
 from apps.admin.serializers import (
@@ -24,11 +36,24 @@ from apps.admin.serializers import (
     MessageReplySerializer,
     AlertSerializer,
     AdminAuditLogSerializer,
+    RevenueAnalyticsSerializer,
 )
 
 logger = logging.getLogger(__name__)
 
 
+class CSVExportRenderer(JSONRenderer):
+    """Lets ``?format=csv`` through content negotiation; error bodies stay JSON."""
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class JSONLExportRenderer(JSONRenderer):
+    """Lets ``?format=jsonl`` through content negotiation; error bodies stay JSON."""
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
+
+
 class AdminDashboardViewSet(viewsets.ViewSet):
     """
     ViewSet for admin dashboard endpoints.
@@ -60,34 +85,13 @@ class AdminDashboardViewSet(viewsets.ViewSet):
         except Exception as e:
             logger.exception(f"Failed to log admin action: {e}")
 
-    def get_product_sales_map(self):
-        """Build a map of product_id -> sales metrics from delivered orders."""
-        product_sales = {}
-        delivered_orders = Order.objects.filter(status='delivered')
-
-        for order in delivered_orders:
-            if not order.items:
-                continue
-
-            for item in order.items:
-                product_id = item.get('product_id')
-                if not product_id:
-                                        continue
-
-                qty = int(item.get('qty', 0) or 0)
-                price = float(item.get('price', 0) or 0)
-                revenue = qty * price
-
-                if product_id not in product_sales:
-                    product_sales[product_id] = {
-                        'units_sold': 0,
-                        'revenue': 0,
-                    }
-
-                product_sales[product_id]['units_sold'] += qty
-                product_sales[product_id]['revenue'] += revenue
-
-        return product_sales
+    def cached_payload(self, request, action_name, fetcher):
+        """Cache ``fetcher()`` briefly per role; order/message writes invalidate it."""
+        key = build_cache_key(
+            'admin-dashboard', action_name, request,
+            tags=[ADMIN_DASHBOARD_CACHE_TAG], scope=role_scope(request.user),
+        )
+        return get_or_set_payload(key, fetcher, timeout=settings.ADMIN_DASHBOARD_CACHE_TTL)
 
     @action(detail=False, methods=['get'])
     def summary(self, request):
@@ -95,74 +99,40 @@ class AdminDashboardViewSet(viewsets.ViewSet):
         Get dashboard summary with KPI metrics.
         /api/admin/dashboard/summary/
         """
-        now = timezone.now()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-        # Order counts
-        total_orders = Order.objects.count()
-        pending_orders = Order.objects.filter(status='pending').count()
-        processing_orders = Order.objects.filter(status='processing').count()
-        delivered_orders = Order.objects.filter(status='delivered').count()
-        cancelled_orders = Order.objects.filter(status='cancelled').count()
-
-        # Message counts
-        # only messages with status 'new' should be considered unread
-        unread_messages = UserMessage.objects.filter(status='new').count()
-        total_messages = UserMessage.objects.count()
-
-        # Revenue metrics
-        revenue_data_today = Order.objects.filter(
-            status='delivered',
-            created_at__gte=today_start
-        ).aggregate(
-            total=Sum('total_amount')
-        )
-        revenue_today = revenue_data_today['total'] or 0
-
-        revenue_data_month = Order.objects.filter(
-            status='delivered',
-            created_at__gte=month_start
-        ).aggregate(
-            total=Sum('total_amount')
-        )
-        revenue_this_month = revenue_data_month['total'] or 0
+        return Response(self.cached_payload(request, 'summary', self.build_summary))
 
-        revenue_data_all = Order.objects.filter(
-            status='delivered'
-        ).aggregate(
-            total=Sum('total_amount')
-        )
-        revenue_all_time = revenue_data_all['total'] or 0
+    def build_summary(self):
+        today = timezone.localdate()
+        month_start = today.replace(day=1)
 
-        # Average order value (use DB aggregation)
-        avg_order = Order.objects.aggregate(avg=Avg('total_amount'))
-        average_order_value = avg_order['avg'] or 0
+        # Order counts and revenue from the daily rollups (one grouped query)
+        totals = status_totals(today, month_start)
+        total_orders = sum(row['orders'] or 0 for row in totals.values())
 
-        # Recent orders (last 5)
-        recent_orders = Order.objects.order_by('-created_at')[:5]
+        # Message counts in one conditional aggregate
+        messages = message_counts()
 
-        # Recent messages (last 5)
-        recent_messages = UserMessage.objects.order_by('-created_at')[:5]
+        # Revenue metrics (delivered orders by creation date)
+        delivered = totals.get('delivered', {})
+        revenue_all_orders = sum(row['revenue_total'] or 0 for row in totals.values())
 
         data = {
             'total_orders': total_orders,
-            'pending_orders': pending_orders,
-            'processing_orders': processing_orders,
-            'delivered_orders': delivered_orders,
-            'cancelled_orders': cancelled_orders,
-            'unread_messages': unread_messages,
-            'total_messages': total_messages,
-            'revenue_today': revenue_today,
-            'revenue_this_month': revenue_this_month,
-            'revenue_all_time': revenue_all_time,
-            'average_order_value': average_order_value,
-            'recent_orders': recent_orders,
-            'recent_messages': recent_messages,
+            'pending_orders': orders_with_status(totals, ['pending']),
+            'processing_orders': orders_with_status(totals, ['processing']),
+            'delivered_orders': orders_with_status(totals, ['delivered']),
+            'cancelled_orders': orders_with_status(totals, ['cancelled']),
+            # only messages with status 'new' should be considered unread
+            'unread_messages': messages['unread'],
+            'total_messages': messages['total'],
+            'revenue_today': delivered.get('revenue_today') or 0,
+            'revenue_this_month': delivered.get('revenue_month') or 0,
+            'revenue_all_time': delivered.get('revenue_total') or 0,
+            'average_order_value': revenue_all_orders / total_orders if total_orders else 0,
+            'recent_orders': Order.objects.order_by('-created_at')[:5],
+            'recent_messages': UserMessage.objects.order_by('-created_at')[:5],
         }
-
-        serializer = DashboardSummarySerializer(data)
-        return Response(serializer.data)
+        return DashboardSummarySerializer(data).data
 
     @action(detail=False, methods=['get'])
     def alerts(self, request):
@@ -170,12 +140,16 @@ class AdminDashboardViewSet(viewsets.ViewSet):
         Get active alerts that need admin attention.
         /api/admin/dashboard/alerts/
         """
+        return Response(self.cached_payload(request, 'alerts', self.build_alerts))
+
+    def build_alerts(self):
+        today = timezone.localdate()
+        totals = status_totals(today, today.replace(day=1))
+        messages = message_counts()
         alerts = []
 
         # Pending orders alert
-        pending = Order.objects.filter(
-            Q(status='pending') | Q(status='received') | Q(status='confirmed')
-        ).count()
+        pending = orders_with_status(totals, AWAITING_CONFIRMATION)
         if pending > 0:
             alerts.append({
                 'type': 'pending_orders',
@@ -186,9 +160,7 @@ class AdminDashboardViewSet(viewsets.ViewSet):
             })
 
         # Unread messages alert
-        unread = UserMessage.objects.filter(
-            Q(status='new') | Q(status='read')
-        ).count()
+        unread = messages['awaiting_reply']
         if unread > 0:
             alerts.append({
                 'type': 'unread_messages',
@@ -199,7 +171,7 @@ class AdminDashboardViewSet(viewsets.ViewSet):
             })
 
         # Processing orders alert
-        processing = Order.objects.filter(status='processing').count()
+        processing = orders_with_status(totals, ['processing'])
         if processing > 0:
             alerts.append({
                 'type': 'processing_orders',
@@ -210,7 +182,7 @@ class AdminDashboardViewSet(viewsets.ViewSet):
             })
 
         # Out for delivery alert
-        in_transit = Order.objects.filter(Q(status='shipped') | Q(status='out_for_delivery')).count()
+        in_transit = orders_with_status(totals, IN_TRANSIT)
         if in_transit > 0:
             alerts.append({
                 'type': 'in_transit_orders',
@@ -220,8 +192,46 @@ class AdminDashboardViewSet(viewsets.ViewSet):
                 'action_url': '/admin/orders/?status=out_for_delivery',
             })
 
-        serializer = AlertSerializer(alerts, many=True)
-        return Response(serializer.data)
+        return AlertSerializer(alerts, many=True).data
+
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """
+        Revenue, order count, average order value and units per period.
+        /api/admin/dashboard/analytics/?granularity=day|week|month&from=YYYY-MM-DD&to=YYYY-MM-DD
+        """
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in GRANULARITIES:
+            return Response(
+                {'error': f"granularity must be one of: {', '.join(GRANULARITIES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            end = date.fromisoformat(request.query_params['to']) if request.query_params.get('to') else timezone.localdate()
+            start = (
+                date.fromisoformat(request.query_params['from']) if request.query_params.get('from')
+                else default_start(granularity, end)
+            )
+        except ValueError:
+            return Response(
+                {'error': 'from and to must be dates in YYYY-MM-DD format'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if start > end:
+            return Response({'error': 'from must not be after to'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(iter_periods(granularity, start, end)) > MAX_PERIODS:
+            return Response(
+                {'error': f'At most {MAX_PERIODS} periods per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        series = sales_series(granularity, start, end)
+        return Response({
+            'granularity': granularity,
+            'from': series[0]['period'],
+            'to': end.isoformat(),
+            'results': RevenueAnalyticsSerializer(series, many=True).data,
+        })
 
     @action(detail=False, methods=['get'])
     def recent_orders(self, request):
@@ -257,6 +267,42 @@ class AdminDashboardViewSet(viewsets.ViewSet):
         serializer = AdminMessageSerializer(messages, many=True)
         return Response(serializer.data)
 
+    @action(
+        detail=False, methods=['get'], url_path='orders/export',
+        renderer_classes=[JSONRenderer, CSVExportRenderer, JSONLExportRenderer],
+    )
+    def export_orders(self, request):
+        """
+        Stream orders as one row per line item.
+        GET /api/admin/dashboard/orders/export/?from=YYYY-MM-DD&to=YYYY-MM-DD&status=delivered&format=csv|jsonl
+        """
+        fmt = request.query_params.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            start = date.fromisoformat(request.query_params['from']) if request.query_params.get('from') else None
+            end = date.fromisoformat(request.query_params['to']) if request.query_params.get('to') else None
+        except ValueError:
+            return Response(
+                {'error': 'from and to must be dates in YYYY-MM-DD format'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        statuses = [value for value in request.query_params.get('status', '').split(',') if value]
+        if any(value not in dict(Order.STATUS_CHOICES) for value in statuses):
+            return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+
+        orders = export_queryset(start, end, statuses)
+        content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(iter_export(fmt, orders), content_type=f'{content_type}; charset=utf-8')
+        stamp = timezone.localdate().isoformat()
+        response['Content-Disposition'] = f'attachment; filename="orders-{stamp}.{fmt}"'
+
+        logger.info(f"Order export ({fmt}) started by {request.user.email}")
+        return response
+
     @action(detail=False, methods=['post'], url_path='orders/(?P<order_id>[^/.]+)/status')
     def update_order_status(self, request, pk=None, order_id=None):
         """
@@ -449,27 +495,20 @@ class AdminDashboardViewSet(viewsets.ViewSet):
         /api/admin/dashboard/top-products/?limit=10
         """
         limit = int(request.query_params.get('limit', 10))
-        product_sales = self.get_product_sales_map()
-        
-        # Get product details and sort by units sold
-        top_product_ids = sorted(
-            product_sales.items(),
-            key=lambda x: x[1]['units_sold'],
-            reverse=True
-        )[:limit]
-        
+        rows = top_selling(limit)
+        products = Product.objects.only('id', 'name').in_bulk([row['product_id'] for row in rows])
+
         result = []
-        for product_id, sales_data in top_product_ids:
-            try:
-                product = Product.objects.get(id=product_id)
-                result.append({
-                    'id': product.id,
-                    'name': product.name,
-                    'units_sold': sales_data['units_sold'],
-                    'revenue': sales_data['revenue'],
-                })
-            except Product.DoesNotExist:
-                pass
+        for row in rows:
+            product = products.get(row['product_id'])
+            if product is None:
+                continue
+            result.append({
+                'id': product.id,
+                'name': product.name,
+                'units_sold': row['units_sold'],
+                'revenue': float(row['revenue'] or 0),
+            })
         
         return Response(result)
 
@@ -478,6 +517,7 @@ class AdminDashboardViewSet(viewsets.ViewSet):
         """
         Get all products (paged).
         GET /api/admin/dashboard/products/?search=sofa&category=furniture&page=1
+        GET /api/admin/dashboard/products/?cursor=&limit=20 (keyset pages)
         """
         search = request.query_params.get('search', '')
         category = request.query_params.get('category', '')
@@ -487,34 +527,41 @@ class AdminDashboardViewSet(viewsets.ViewSet):
         queryset = Product.objects.all()
         
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | 
-                Q(description__icontains=search) |
-                Q(sku__icontains=search)
-            )
+            queryset = search_products(queryset, search, rank=False)
         
         if category:
             queryset = queryset.filter(category=category)
         
+        from apps.admin.serializers import AdminProductSerializer
+
+        def with_sales(products):
+            serialized = AdminProductSerializer(products, many=True).data
+            product_sales = product_sales_map(item['id'] for item in serialized)
+            results = []
+            for item in serialized:
+                sales = product_sales.get(item['id'], {'units_sold': 0, 'revenue': 0})
+                item['units_sold'] = sales['units_sold']
+                results.append(item)
+            return results
+
+        # ?cursor= switches to keyset pages (no per-page COUNT unless ?with_count=true)
+        paginator = KeysetPagination()
+        if paginator.is_requested(request):
+            paginator.page_size_query_param = 'limit'
+            products = paginator.paginate_queryset(queryset, request, view=self)
+            data = paginator.get_cursor_data(with_sales(products))
+            data['limit'] = paginator.get_page_size(request)
+            return Response(data)
+
         # Order by newest first
         queryset = queryset.order_by('-created_at')
         
         # Count total
         total_count = queryset.count()
-
-        product_sales = self.get_product_sales_map()
         
         # Paginate
         offset = (page - 1) * limit
-        products = queryset[offset:offset + limit]
-        
-        from apps.admin.serializers import AdminProductSerializer
-        serialized = AdminProductSerializer(products, many=True).data
-        results = []
-        for item in serialized:
-            sales = product_sales.get(item['id'], {'units_sold': 0, 'revenue': 0})
-            item['units_sold'] = sales['units_sold']
-            results.append(item)
+        results = with_sales(queryset[offset:offset + limit])
         
         return Response({
             'count': total_count,
@@ -0,0 +1,144 @@
+"""Server-side guest carts keyed by the Django session.
+
+A guest cart is stored compactly in the cache as
+``{'items': {product_id: quantity}, 'persisted_at': <unix time>}`` under
+``guest-cart:<session_key>`` and expires ``GUEST_CART_TTL`` seconds after the
+last write.
+
+Writes persist lazily: at most once every ``GUEST_CART_PERSIST_INTERVAL``
+seconds the compact form is copied into a ``Cart`` row with ``user=None`` and
+``session_key`` set, so a cache eviction or restart loses at most that window.
+Reads fall back to that row when the cache entry is gone.
+
+Every read-modify-write of a guest cart runs under ``guest_cart_lock``, a
+per-session cache lock, so two concurrent add-to-cart requests from one
+session cannot overwrite each other's change.
+
+On login ``merge_guest_cart`` adds the whole guest cart to the user's cart
+with one ``add_quantities`` call and drops the guest copy. Persisted guest
+carts that are never merged are removed by ``compact_carts``.
+"""
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Cart, CartItem
+from .services import add_quantities, get_user_cart
+
+logger = logging.getLogger(__name__)
+
+GUEST_CART_KEY = 'guest-cart:{session_key}'
+GUEST_CART_LOCK_KEY = 'guest-cart-lock:{session_key}'
+# A crashed holder's lock expires after this many seconds
+GUEST_CART_LOCK_TIMEOUT = 5
+LOCK_POLL_INTERVAL_SECONDS = 0.02
+
+
+def ensure_session_key(request) -> str:
+    """Return the request's session key, creating the session if needed."""
+    if not request.session.session_key:
+        request.session.create()
+    return request.session.session_key
+
+
+@contextmanager
+def guest_cart_lock(session_key: str):
+    """Hold the guest cart of ``session_key`` for one load/modify/save cycle."""
+    lock_key = GUEST_CART_LOCK_KEY.format(session_key=session_key)
+    token = uuid.uuid4().hex
+    while not cache.add(lock_key, token, timeout=GUEST_CART_LOCK_TIMEOUT):
+        time.sleep(LOCK_POLL_INTERVAL_SECONDS)
+    try:
+        yield
+    finally:
+        # Only release our own lock, not one taken after ours expired
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+class GuestCart:
+    """Compact, cache-backed cart for an anonymous session."""
+
+    def __init__(self, session_key: str, items: Optional[Dict[int, int]] = None, persisted_at: float = 0.0):
+        self.session_key = session_key
+        self.items: Dict[int, int] = dict(items or {})
+        self.persisted_at = persisted_at
+
+    @property
+    def cache_key(self) -> str:
+        return GUEST_CART_KEY.format(session_key=self.session_key)
+
+    @classmethod
+    def load(cls, session_key: str) -> 'GuestCart':
+        stored = cache.get(GUEST_CART_KEY.format(session_key=session_key))
+        if stored is not None:
+            items = {int(pid): qty for pid, qty in stored.get('items', {}).items()}
+            return cls(session_key, items, stored.get('persisted_at', 0.0))
+
+        rows = CartItem.objects.filter(cart__session_key=session_key, cart__user__isnull=True)
+        items = dict(rows.values_list('product_id', 'quantity'))
+        # Loaded from the database, so it is persisted as of now
+        return cls(session_key, items, time.time() if items else 0.0)
+
+    def add(self, product_id: int, quantity: int) -> None:
+        self.items[product_id] = self.items.get(product_id, 0) + quantity
+
+    def set(self, product_id: int, quantity: int) -> None:
+        if quantity <= 0:
+            self.items.pop(product_id, None)
+        else:
+            self.items[product_id] = quantity
+
+    def save(self) -> None:
+        """Write to the cache, persisting to the database when it is due."""
+        if time.time() - self.persisted_at >= settings.GUEST_CART_PERSIST_INTERVAL:
+            self.persist()
+        cache.set(
+            self.cache_key,
+            {'items': self.items, 'persisted_at': self.persisted_at},
+            timeout=settings.GUEST_CART_TTL,
+        )
+
+    def persist(self) -> None:
+        """Copy the compact form into a ``Cart`` row (``user=None``)."""
+        with transaction.atomic():
+            cart, _ = Cart.objects.get_or_create(session_key=self.session_key, user=None)
+            CartItem.objects.filter(cart=cart).exclude(product_id__in=list(self.items)).delete()
+            if self.items:
+                CartItem.objects.bulk_create(
+                    [CartItem(cart=cart, product_id=pid, quantity=qty) for pid, qty in self.items.items()],
+                    update_conflicts=True,
+                    unique_fields=['cart', 'product_id'],
+                    update_fields=['quantity'],
+                )
+            # Touch updated_at so compaction measures idleness from the last write
+            cart.save(update_fields=['updated_at'])
+        self.persisted_at = time.time()
+
+    def delete(self) -> None:
+        cache.delete(self.cache_key)
+        Cart.objects.filter(session_key=self.session_key, user__isnull=True).delete()
+
+
+def merge_guest_cart(session_key: Optional[str], user) -> Dict[int, int]:
+    """
+    Move the guest cart of ``session_key`` into ``user``'s cart.
+
+    Returns the quantities that were added (unknown products are dropped).
+    """
+    if not session_key:
+        return {}
+    with guest_cart_lock(session_key):
+        guest = GuestCart.load(session_key)
+        if not guest.items:
+            return {}
+        applied = add_quantities(get_user_cart(user), guest.items)
+        guest.delete()
+    logger.info("Merged guest cart (%s lines) into cart of user %s", len(applied), user.pk)
+    return applied
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.cart.services import compact_carts
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete empty carts and guest carts idle for longer than CART_ABANDONED_DAYS, "
+        "in bounded chunks. Also scheduled through Celery beat (apps.cart.tasks)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--abandoned-days",
+            type=int,
+            default=settings.CART_ABANDONED_DAYS,
+            help="Carts not updated for this many days are compacted.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Carts deleted per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many carts would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["abandoned_days"])
+        deleted = compact_carts(cutoff, chunk_size=options["chunk_size"], dry_run=options["dry_run"])
+        verb = "would delete" if options["dry_run"] else "deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {deleted} carts idle since {cutoff:%Y-%m-%d %H:%M}"))
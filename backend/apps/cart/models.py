@@ -10,10 +10,20 @@ class Cart(models.Model):
         null=True,
         blank=True,
     )
+    # Set for guest carts persisted from the cache (see apps.cart.guest)
+    session_key = models.CharField(max_length=40, unique=True, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # compact_carts scans guest and empty carts by age
+            models.Index(fields=['updated_at'], name='cart_updated_idx'),
+        ]
+
     def __str__(self):
+        if self.user_id is None and self.session_key:
+            return f"Cart(guest={self.session_key[:8]})"
         return f"Cart(user={self.user_id})"
 
 
@@ -1,8 +1,19 @@
 from rest_framework import serializers
 
+from apps.core.media_utils import absolute_media_url
 from apps.products.models import Product
 from .models import Cart, CartItem
 
+CART_PRODUCT_FIELDS = ('id', 'name', 'slug', 'price', 'main_image')
+
+
+def load_cart_products(items):
+    """Fetch the products of ``items`` in one ``id__in`` query, keyed by id."""
+    product_ids = {item.product_id for item in items}
+    if not product_ids:
+        return {}
+    return Product.objects.only(*CART_PRODUCT_FIELDS).in_bulk(product_ids)
+
 
 class CartProductSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
@@ -12,19 +23,18 @@ class CartProductSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'slug', 'price', 'main_image', 'image')
 
     def get_image(self, obj):
-        request = self.context.get('request')
         if not obj.main_image:
             return None
-        try:
-            url = obj.main_image.url
-            if request is not None:
-                return request.build_absolute_uri(url)
-            return url
-        except Exception:
-            return None
+        return absolute_media_url(obj.main_image.name)
 
 
 class CartItemSerializer(serializers.ModelSerializer):
+    """
+    Cart line with its product.
+
+    Pass ``products`` (id -> Product, see ``load_cart_products``) in the
+    context to resolve every item's product without per-item queries.
+    """
     product = serializers.SerializerMethodField()
 
     class Meta:
@@ -32,9 +42,11 @@ class CartItemSerializer(serializers.ModelSerializer):
         fields = ('id', 'product_id', 'quantity', 'product')
 
     def get_product(self, obj):
-        try:
-            product = Product.objects.get(id=obj.product_id)
-        except Product.DoesNotExist:
+        products = self.context.get('products')
+        if products is None:
+            products = load_cart_products([obj])
+        product = products.get(obj.product_id)
+        if product is None:
             return None
         return CartProductSerializer(product, context=self.context).data
 
@@ -0,0 +1,209 @@
+"""Cart write path shared by the cart API and the login merge.
+
+Quantities are applied in a fixed number of queries regardless of how many
+lines are involved, and without read-modify-write races:
+
+1. one ``id__in`` query keeps only product ids that exist
+2. ``bulk_create(ignore_conflicts=True)`` makes sure a row exists for every
+   (cart, product_id) pair, relying on the unique constraint
+3. one ``UPDATE ... SET quantity = quantity + CASE product_id ...`` adds the
+   requested amounts, so concurrent adds to the same line both land
+
+A plain ``bulk_create(update_conflicts=True)`` would overwrite the quantity
+with the incoming value instead of adding to it, which is why the increment
+is a separate ``F()`` update.
+
+Every write refreshes the user's cached cart summary (``get_cart_summary``)
+once the transaction commits, so the header badge never has to load the
+cart. Summaries are also keyed by the ``products`` cache tag version: a price
+change makes every summary recompute lazily instead of serving old totals.
+
+``compact_carts`` removes carts nobody will come back to: empty carts and
+guest carts (see ``apps.cart.guest``) idle for longer than the cutoff. Item
+writes go through ``touch_cart`` so ``Cart.updated_at`` tracks the last
+change to the cart's contents.
+"""
+import time
+from decimal import Decimal
+from datetime import datetime
+from typing import Any, Dict, Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import (
+    Case, DecimalField, Exists, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.core.response_cache import get_tag_versions
+from apps.products.models import Product
+from apps.products.signals import PRODUCTS_CACHE_TAG
+from .models import Cart, CartItem
+
+CART_SUMMARY_TIMEOUT = 60 * 60 * 24
+
+
+def get_user_cart(user) -> Cart:
+    cart, _ = Cart.objects.get_or_create(user=user)
+    return cart
+
+
+def touch_cart(cart: Cart) -> None:
+    """Mark ``cart`` as written to now, without loading or saving the row."""
+    cart.updated_at = timezone.now()
+    Cart.objects.filter(pk=cart.pk).update(updated_at=cart.updated_at)
+
+
+def normalize_items(raw_items: Iterable[Any]) -> Dict[int, int]:
+    """
+    Turn ``[{product_id, quantity}, ...]`` into ``{product_id: quantity}``.
+
+    Duplicate product ids are summed; entries without a usable product id or
+    with a non-positive quantity are skipped.
+    """
+    quantities: Dict[int, int] = {}
+    for item in raw_items or []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            product_id = int(item.get('product_id') or 0)
+            quantity = int(item.get('quantity', 1))
+        except (TypeError, ValueError):
+            continue
+        if product_id <= 0 or quantity <= 0:
+            continue
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+def existing_product_ids(product_ids: Iterable[int]) -> set:
+    """Subset of ``product_ids`` that exist, in one query."""
+    product_ids = set(product_ids)
+    if not product_ids:
+        return set()
+    return set(Product.objects.filter(id__in=product_ids).values_list('id', flat=True))
+
+
+def add_quantities(cart: Cart, quantities: Dict[int, int], validate: bool = True) -> Dict[int, int]:
+    """
+    Atomically add ``quantities`` to ``cart``.
+
+    Returns the quantities that were applied (unknown products are dropped
+    when ``validate`` is true).
+    """
+    if validate and quantities:
+        known = existing_product_ids(quantities)
+        quantities = {pid: qty for pid, qty in quantities.items() if pid in known}
+    if not quantities:
+        return {}
+
+    with transaction.atomic():
+        # Touch the cart first: it locks the cart row before any item row,
+        # so compact_carts cannot delete it under this write
+        touch_cart(cart)
+        CartItem.objects.bulk_create(
+            [CartItem(cart=cart, product_id=pid, quantity=0) for pid in quantities],
+            ignore_conflicts=True,
+        )
+        increment = Case(
+            *[When(product_id=pid, then=Value(qty)) for pid, qty in quantities.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        CartItem.objects.filter(cart=cart, product_id__in=list(quantities)).update(
+            quantity=F('quantity') + increment
+        )
+        refresh_cart_summary_on_commit(cart)
+    return quantities
+
+
+def merge_guest_items(user, raw_items: Iterable[Any]) -> Cart:
+    """Merge a guest cart payload into ``user``'s persistent cart."""
+    cart = get_user_cart(user)
+    add_quantities(cart, normalize_items(raw_items))
+    return cart
+
+
+def _cart_summary_key(user_id) -> str:
+    version = get_tag_versions([PRODUCTS_CACHE_TAG])[PRODUCTS_CACHE_TAG]
+    return f"cart-summary:{user_id}:{version}"
+
+
+def compute_cart_summary(cart: Cart) -> Dict[str, Any]:
+    """Item count and total of ``cart`` in one aggregate query."""
+    price = Subquery(Product.objects.filter(id=OuterRef('product_id')).values('price')[:1])
+    totals = CartItem.objects.filter(cart=cart).aggregate(
+        total_items=Coalesce(Sum('quantity'), 0),
+        total_price=Coalesce(
+            Sum(F('quantity') * price, output_field=DecimalField(max_digits=14, decimal_places=2)),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        ),
+    )
+    return {
+        'total_items': totals['total_items'],
+        'total_price': Decimal(totals['total_price']).quantize(Decimal('0.01')),
+        'version': str(time.time_ns()),
+    }
+
+
+def refresh_cart_summary(cart: Cart) -> Dict[str, Any]:
+    """Recompute ``cart``'s summary and write it through to the cache."""
+    summary = compute_cart_summary(cart)
+    cache.set(_cart_summary_key(cart.user_id), summary, timeout=CART_SUMMARY_TIMEOUT)
+    return summary
+
+
+def refresh_cart_summary_on_commit(cart: Cart) -> None:
+    if cart.user_id is not None:
+        transaction.on_commit(lambda: refresh_cart_summary(cart))
+
+
+def get_cart_summary(user) -> Dict[str, Any]:
+    """Cached ``{total_items, total_price, version}`` for ``user``'s cart."""
+    summary = cache.get(_cart_summary_key(user.pk))
+    if summary is None:
+        summary = refresh_cart_summary(get_user_cart(user))
+    return summary
+
+
+def compactable_carts(cutoff: datetime):
+    """Empty carts and guest carts not written to since ``cutoff``."""
+    has_items = Exists(CartItem.objects.filter(cart=OuterRef('pk')))
+    return Cart.objects.filter(updated_at__lt=cutoff).filter(Q(user__isnull=True) | ~has_items)
+
+
+def compact_carts(cutoff: datetime, chunk_size: int = 1000, dry_run: bool = False) -> int:
+    """
+    Delete ``compactable_carts(cutoff)`` in primary-key chunks.
+
+    Each chunk is its own short transaction, so the job never holds locks on
+    the whole table. Inside it the chunk is re-checked against
+    ``compactable_carts`` and locked, so a cart written to after it was
+    selected is kept. Returns the number of carts deleted (or, with
+    ``dry_run``, that would be).
+    """
+    chunk_size = max(chunk_size, 1)
+    last_pk = 0
+    total = 0
+    while True:
+        ids = list(
+            compactable_carts(cutoff).filter(pk__gt=last_pk)
+            .order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not ids:
+            break
+        last_pk = ids[-1]
+        if dry_run:
+            total += len(ids)
+            continue
+        with transaction.atomic():
+            doomed = list(
+                compactable_carts(cutoff).filter(pk__in=ids)
+                .select_for_update().values_list('pk', flat=True)
+            )
+            CartItem.objects.filter(cart_id__in=doomed).delete()
+            Cart.objects.filter(pk__in=doomed).delete()
+        total += len(doomed)
+    return total
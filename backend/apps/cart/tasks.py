@@ -0,0 +1,22 @@
+"""
+Celery tasks for cart housekeeping.
+"""
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .services import compact_carts
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def compact_abandoned_carts(chunk_size=1000):
+    """Periodic cleanup of empty and abandoned guest carts (see CELERY_BEAT_SCHEDULE)."""
+    cutoff = timezone.now() - timedelta(days=settings.CART_ABANDONED_DAYS)
+    deleted = compact_carts(cutoff, chunk_size=chunk_size)
+    logger.info("Compacted %s carts idle since %s", deleted, cutoff.isoformat())
+    return deleted
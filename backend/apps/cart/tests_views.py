@@ -0,0 +1,244 @@
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.cart.guest import GuestCart, guest_cart_lock
+from apps.cart.models import Cart, CartItem
+from apps.cart import services
+from apps.cart.services import add_quantities, compact_carts
+from apps.products.models import Product
+from apps.users.models import User
+
+
+class CartQueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(name='Cart User', email='cart@example.com', password='StrongPass123!')
+        self.client.force_authenticate(self.user)
+        self.products = [
+            Product.objects.create(name=f'Chair {index}', slug=f'chair-{index}', price=Decimal('19.99'))
+            for index in range(5)
+        ]
+        self.cart = Cart.objects.create(user=self.user)
+        for product in self.products:
+            CartItem.objects.create(cart=self.cart, product_id=product.id, quantity=3)
+
+    def test_cart_view_renders_in_two_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/cart/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['items']), 5)
+        self.assertEqual(response.data['total_items'], 15)
+        # 15 x 19.99 accumulates float error; Decimal keeps it exact
+        self.assertEqual(response.data['total_price'], Decimal('299.85'))
+        self.assertEqual(response.data['items'][0]['product']['slug'], 'chair-0')
+
+    def test_cart_view_query_count_does_not_grow_with_items(self):
+        extra = Product.objects.create(name='Desk', slug='desk', price=Decimal('5.00'))
+        CartItem.objects.create(cart=self.cart, product_id=extra.id, quantity=1)
+        CartItem.objects.create(cart=self.cart, product_id=987654, quantity=1)  # product since deleted
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/cart/')
+        self.assertEqual(len(response.data['items']), 7)
+        self.assertIsNone(response.data['items'][-1]['product'])
+        self.assertEqual(response.data['total_price'], Decimal('304.85'))
+
+    def test_add_to_cart_does_not_refetch_the_product(self):
+        # product, cart, savepoint, touch, insert-or-ignore, increment, release, item
+        with self.assertNumQueries(8):
+            response = self.client.post('/api/cart/add/', {'product_id': self.products[0].id, 'quantity': 2}, format='json')
+        self.assertEqual(response.data['item']['quantity'], 5)
+        self.assertEqual(response.data['item']['product']['id'], self.products[0].id)
+
+    def test_merge_cart_is_constant_in_queries(self):
+        CartItem.objects.filter(cart=self.cart, product_id=self.products[0].id).update(quantity=1)
+        extra = [
+            Product.objects.create(name=f'Stool {index}', slug=f'stool-{index}', price=Decimal('1.00'))
+            for index in range(45)
+        ]
+        payload = {'items': (
+            [{'product_id': product.id, 'quantity': 1} for product in self.products + extra]
+            + [{'product_id': 987654, 'quantity': 1}, {'product_id': 'bad'}]
+        )}
+        # cart, product validation, savepoint, touch, insert, update, release, items, products
+        with self.assertNumQueries(9):
+            response = self.client.post('/api/cart/merge/', payload, format='json')
+
+        self.assertEqual(len(response.data['items']), 50)
+        self.assertEqual(CartItem.objects.get(cart=self.cart, product_id=self.products[0].id).quantity, 2)
+        self.assertFalse(CartItem.objects.filter(product_id=987654).exists())
+
+
+class CartServiceTests(TestCase):
+    def test_increments_are_applied_in_the_database(self):
+        from apps.cart.services import add_quantities, normalize_items
+
+        user = User.objects.create_user(name='Race', email='race@example.com', password='StrongPass123!')
+        product = Product.objects.create(name='Lamp', slug='lamp', price=Decimal('5.00'))
+        cart = Cart.objects.create(user=user)
+        stale = CartItem.objects.create(cart=cart, product_id=product.id, quantity=1)
+
+        # Two writers that both started from quantity=1 must not overwrite each other
+        add_quantities(cart, {product.id: 2})
+        add_quantities(cart, normalize_items([{'product_id': product.id, 'quantity': 3}]))
+
+        self.assertEqual(stale.quantity, 1)
+        stale.refresh_from_db()
+        self.assertEqual(stale.quantity, 6)
+        self.assertEqual(normalize_items([{'product_id': 1}, {'product_id': '1', 'quantity': 2}, {'quantity': 1}]), {1: 3})
+
+
+class CartSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(name='Badge', email='badge@example.com', password='StrongPass123!')
+        self.client.force_authenticate(self.user)
+        self.product = Product.objects.create(name='Lamp', slug='lamp', price=Decimal('12.50'))
+
+    def _add(self, quantity):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/cart/add/', {'product_id': self.product.id, 'quantity': quantity}, format='json')
+
+    def test_summary_is_written_through_and_served_without_queries(self):
+        self._add(2)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/cart/summary/')
+        self.assertEqual(response.data['total_items'], 2)
+        self.assertEqual(response.data['total_price'], Decimal('25.00'))
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/api/cart/summary/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self._add(1)
+        response = self.client.get('/api/cart/summary/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_items'], 3)
+
+    def test_price_change_recomputes_summary(self):
+        self._add(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.price = Decimal('10.00')
+            self.product.save()
+        self.assertEqual(self.client.get('/api/cart/summary/').data['total_price'], Decimal('20.00'))
+
+
+class GuestCartTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(name='Guest', email='guest@example.com', password='StrongPass123!')
+        self.sofa = Product.objects.create(name='Sofa', slug='sofa', price=Decimal('100.00'))
+        self.bed = Product.objects.create(name='Bed', slug='bed', price=Decimal('250.00'))
+
+    def test_guest_cart_is_kept_per_session_and_merged_on_login(self):
+        self.client.post('/api/cart/guest/', {'product_id': self.sofa.id, 'quantity': 2}, format='json')
+        self.client.post('/api/cart/guest/', {'product_id': self.bed.id}, format='json')
+        response = self.client.patch('/api/cart/guest/', {'product_id': self.sofa.id, 'quantity': 3}, format='json')
+
+        self.assertEqual(response.data['total_items'], 4)
+        self.assertEqual(response.data['total_price'], Decimal('550.00'))
+        session_key = self.client.session.session_key
+        # The first write persisted the cart; later ones only touched the cache
+        guest_row = Cart.objects.get(session_key=session_key)
+        self.assertEqual(dict(guest_row.items.values_list('product_id', 'quantity')), {self.sofa.id: 2})
+
+        response = self.client.post(
+            '/api/users/login/', {'email': self.user.email, 'password': 'StrongPass123!'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        cart = Cart.objects.get(user=self.user)
+        self.assertEqual(
+            dict(cart.items.values_list('product_id', 'quantity')), {self.sofa.id: 3, self.bed.id: 1}
+        )
+        self.assertFalse(Cart.objects.filter(session_key=session_key).exists())
+        self.assertEqual(GuestCart.load(session_key).items, {})
+
+    def test_concurrent_guest_adds_are_not_lost(self):
+        # Persisted just now, so saves stay in the cache (no database from threads)
+        GuestCart('race', persisted_at=time.time()).save()
+        original_add = GuestCart.add
+
+        def slow_add(cart, product_id, quantity):
+            time.sleep(0.05)  # widen the window between load and save
+            original_add(cart, product_id, quantity)
+
+        def add_one(product_id):
+            with guest_cart_lock('race'):
+                cart = GuestCart.load('race')
+                cart.add(product_id, 1)
+                cart.save()
+
+        with patch.object(GuestCart, 'add', slow_add):
+            threads = [threading.Thread(target=add_one, args=(pid,)) for pid in (self.sofa.id, self.bed.id)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(GuestCart.load('race').items, {self.sofa.id: 1, self.bed.id: 1})
+
+    @override_settings(GUEST_CART_PERSIST_INTERVAL=0)
+    def test_guest_cart_survives_cache_loss(self):
+        self.client.post('/api/cart/guest/', {'product_id': self.bed.id, 'quantity': 2}, format='json')
+        cache.clear()
+
+        response = self.client.get('/api/cart/guest/')
+        self.assertEqual(response.data['total_items'], 2)
+        self.assertEqual(response.data['items'][0]['product']['slug'], 'bed')
+
+    def test_compaction_deletes_abandoned_guest_and_empty_carts_only(self):
+        old = timezone.now() - timedelta(days=60)
+        abandoned = Cart.objects.create(session_key='a' * 32)
+        CartItem.objects.create(cart=abandoned, product_id=self.sofa.id)
+        fresh_guest = Cart.objects.create(session_key='b' * 32)
+        empty_user_cart = Cart.objects.create(user=self.user)
+        other = User.objects.create_user(name='Other', email='other@example.com', password='StrongPass123!')
+        user_cart = Cart.objects.create(user=other)
+        CartItem.objects.create(cart=user_cart, product_id=self.bed.id)
+        Cart.objects.filter(pk__in=[abandoned.pk, empty_user_cart.pk, user_cart.pk]).update(updated_at=old)
+
+        cutoff = timezone.now() - timedelta(days=30)
+        self.assertEqual(compact_carts(cutoff, chunk_size=1, dry_run=True), 2)
+        self.assertEqual(compact_carts(cutoff, chunk_size=1), 2)
+
+        self.assertEqual(set(Cart.objects.values_list('pk', flat=True)), {fresh_guest.pk, user_cart.pk})
+        self.assertFalse(CartItem.objects.filter(cart_id=abandoned.pk).exists())
+
+    def test_compaction_keeps_carts_written_to_after_selection(self):
+        old = timezone.now() - timedelta(days=60)
+        cart = Cart.objects.create(user=self.user)
+        Cart.objects.filter(pk=cart.pk).update(updated_at=old)
+        compactable = services.compactable_carts
+        calls = []
+
+        def add_item_before_recheck(cutoff):
+            calls.append(cutoff)
+            if len(calls) == 2:
+                # An item lands between the id scan and the delete
+                CartItem.objects.create(cart=cart, product_id=self.sofa.id)
+            return compactable(cutoff)
+
+        cutoff = timezone.now() - timedelta(days=30)
+        with patch('apps.cart.services.compactable_carts', side_effect=add_item_before_recheck):
+            self.assertEqual(compact_carts(cutoff), 0)
+        self.assertTrue(CartItem.objects.filter(cart=cart).exists())
+
+    def test_item_writes_track_cart_idleness(self):
+        old = timezone.now() - timedelta(days=60)
+        cart = Cart.objects.create(user=self.user)
+        Cart.objects.filter(pk=cart.pk).update(updated_at=old)
+
+        add_quantities(cart, {self.sofa.id: 1})
+
+        cart.refresh_from_db()
+        self.assertGreater(cart.updated_at, timezone.now() - timedelta(minutes=1))
@@ -1,9 +1,11 @@
 from django.urls import path
-from .views import CartView, AddToCartView, CartItemDetailView, MergeCartView
+from .views import CartView, AddToCartView, CartItemDetailView, MergeCartView, CartSummaryView, GuestCartView
 
 urlpatterns = [
     path('', CartView.as_view(), name='cart-detail'),
+    path('summary/', CartSummaryView.as_view(), name='cart-summary'),
     path('add/', AddToCartView.as_view(), name='cart-add'),
     path('item/<int:item_id>/', CartItemDetailView.as_view(), name='cart-item-detail'),
+    path('guest/', GuestCartView.as_view(), name='cart-guest'),
     path('merge/', MergeCartView.as_view(), name='cart-merge'),
 ]
@@ -1,36 +1,65 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from rest_framework import status
-from django.db import transaction
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework import serializers, status
+from django.utils.cache import get_conditional_response, patch_cache_control
+from decimal import Decimal
 from apps.products.models import Product
 
+from .guest import GuestCart, ensure_session_key, guest_cart_lock, merge_guest_cart
 from .models import Cart, CartItem
-from .serializers import CartSerializer, CartItemSerializer
-
-
-def _serialize_cart(cart, request):
-    serializer = CartSerializer(cart, context={'request': request})
-    data = serializer.data
-    items = data.get('items', [])
-    total_items = sum(item.get('quantity', 0) for item in items)
-    total_price = 0
+from .serializers import CART_PRODUCT_FIELDS, CartItemSerializer, load_cart_products
+from .services import (
+    add_quantities,
+    get_cart_summary,
+    get_user_cart,
+    merge_guest_items,
+    refresh_cart_summary_on_commit,
+    touch_cart,
+)
+
+
+def _load_cart(user):
+    """
+    Return ``(cart, items)`` for ``user``.
+
+    Items are read with their cart joined in, so a non-empty cart costs a
+    single query; the cart row is only fetched (or created) on its own when
+    there are no items.
+    """
+    items = list(CartItem.objects.filter(cart__user=user).select_related('cart').order_by('id'))
+    if items:
+        return items[0].cart, items
+    cart, _ = Cart.objects.get_or_create(user=user)
+    return cart, []
+
+
+def _serialize_items(items, request):
+    products = load_cart_products(items)
+    context = {'request': request, 'products': products}
+    item_data = CartItemSerializer(items, many=True, context=context).data
+
+    total_items = 0
+    total_price = Decimal('0.00')
     for item in items:
-        product = item.get('product') or {}
-        price = product.get('price')
-        try:
-            if price is not None:
-                total_price += float(price) * int(item.get('quantity', 0))
-        except Exception:
-            continue
+        total_items += item.quantity
+        product = products.get(item.product_id)
+        if product is not None:
+            total_price += product.price * item.quantity
 
     return {
-        'id': data.get('id'),
-        'items': items,
+        'items': item_data,
         'total_items': total_items,
-        'total_price': round(total_price, 2),
-        'created_at': data.get('created_at'),
-        'updated_at': data.get('updated_at'),
+        'total_price': total_price.quantize(Decimal('0.01')),
+    }
+
+
+def _serialize_cart(cart, items, request):
+    return {
+        'id': cart.id,
+        **_serialize_items(items, request),
+        'created_at': serializers.DateTimeField().to_representation(cart.created_at),
+        'updated_at': serializers.DateTimeField().to_representation(cart.updated_at),
     }
 
 
@@ -38,8 +67,8 @@ class CartView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        cart, _ = Cart.objects.get_or_create(user=request.user)
-        return Response(_serialize_cart(cart, request))
+        cart, items = _load_cart(request.user)
+        return Response(_serialize_cart(cart, items, request))
 
 
 class AddToCartView(APIView):
@@ -47,26 +76,27 @@ class AddToCartView(APIView):
 
     def post(self, request):
         product_id = request.data.get('product_id')
-        quantity = int(request.data.get('quantity', 1))
+        try:
+            quantity = int(request.data.get('quantity', 1))
+        except (TypeError, ValueError):
+            quantity = 0
 
         if not product_id:
             return Response({'error': 'product_id required'}, status=status.HTTP_400_BAD_REQUEST)
+        if quantity <= 0:
+            return Response({'error': 'quantity must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
 
-        cart, _ = Cart.objects.get_or_create(user=request.user)
-
-        with transaction.atomic():
-            try:
-                product = Product.objects.get(id=product_id)
-            except Product.DoesNotExist:
-                return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            product = Product.objects.only(*CART_PRODUCT_FIELDS).get(id=product_id)
+        except (Product.DoesNotExist, ValueError):
+            return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
 
-            item, created = CartItem.objects.get_or_create(cart=cart, product_id=product_id,
-                                                           defaults={'quantity': quantity})
-            if not created:
-                item.quantity = item.quantity + quantity
-                item.save()
+        cart = get_user_cart(request.user)
+        add_quantities(cart, {product.id: quantity}, validate=False)
+        item = CartItem.objects.get(cart=cart, product_id=product.id)
 
-        return Response({'message': 'added', 'item': CartItemSerializer(item, context={'request': request}).data})
+        context = {'request': request, 'products': {product.id: product}}
+        return Response({'message': 'added', 'item': CartItemSerializer(item, context=context).data})
 
 
 class CartItemDetailView(APIView):
@@ -74,28 +104,55 @@ class CartItemDetailView(APIView):
 
     def patch(self, request, item_id):
         try:
-            item = CartItem.objects.get(id=item_id, cart__user=request.user)
+            item = CartItem.objects.select_related('cart').get(id=item_id, cart__user=request.user)
         except CartItem.DoesNotExist:
             return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
 
         quantity = int(request.data.get('quantity', item.quantity))
         if quantity <= 0:
             item.delete()
+            touch_cart(item.cart)
+            refresh_cart_summary_on_commit(item.cart)
             return Response({'message': 'deleted'})
 
         item.quantity = quantity
         item.save()
+        touch_cart(item.cart)
+        refresh_cart_summary_on_commit(item.cart)
         return Response({'item': CartItemSerializer(item, context={'request': request}).data})
 
     def delete(self, request, item_id):
         try:
-            item = CartItem.objects.get(id=item_id, cart__user=request.user)
+            item = CartItem.objects.select_related('cart').get(id=item_id, cart__user=request.user)
             item.delete()
+            touch_cart(item.cart)
+            refresh_cart_summary_on_commit(item.cart)
             return Response({'message': 'deleted'})
         except CartItem.DoesNotExist:
             return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+class CartSummaryView(APIView):
+    """
+    Header badge data: total_items, total_price and a cart version.
+
+    Served from the per-user summary the cart write paths keep up to date, so
+    it loads no products. The version doubles as the ETag; a matching
+    If-None-Match returns 304.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        summary = get_cart_summary(request.user)
+        etag = f'"{summary["version"]}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(summary)
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
 class MergeCartView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -108,20 +165,69 @@ class MergeCartView(APIView):
         if not isinstance(payload_items, list):
             return Response({'error': 'Invalid items'}, status=status.HTTP_400_BAD_REQUEST)
 
-        cart, _ = Cart.objects.get_or_create(user=request.user)
-
-        with transaction.atomic():
-            for it in payload_items:
-                pid = it.get('product_id')
-                qty = int(it.get('quantity', 1))
-                if not pid:
-                    continue
-                if not Product.objects.filter(id=pid).exists():
-                    continue
-                obj, created = CartItem.objects.get_or_create(cart=cart, product_id=pid,
-                                                              defaults={'quantity': qty})
-                if not created:
-                    obj.quantity = obj.quantity + qty
-                    obj.save()
-
-        return Response(_serialize_cart(cart, request))
+        cart = merge_guest_items(request.user, payload_items)
+        merge_guest_cart(request.session.session_key, request.user)
+
+        items = list(cart.items.order_by('id'))
+        return Response(_serialize_cart(cart, items, request))
+
+
+class GuestCartView(APIView):
+    """
+    Server-side cart for anonymous visitors, keyed by the session cookie.
+
+    GET returns the cart, POST adds ``{product_id, quantity}`` and PATCH sets
+    a line's quantity (0 removes it). The cart is merged into the user's cart
+    on login or via ``cart/merge/``.
+    """
+    permission_classes = [AllowAny]
+
+    def _response(self, guest, request):
+        # Unsaved items: guest lines have no database ids
+        items = [CartItem(product_id=pid, quantity=qty) for pid, qty in sorted(guest.items.items())]
+        return Response(_serialize_items(items, request))
+
+    def _parse(self, request, allow_zero):
+        try:
+            product_id = int(request.data.get('product_id') or 0)
+            quantity = int(request.data.get('quantity', 1))
+        except (TypeError, ValueError):
+            return None, None, Response({'error': 'Invalid product_id or quantity'}, status=status.HTTP_400_BAD_REQUEST)
+        if product_id <= 0:
+            return None, None, Response({'error': 'product_id required'}, status=status.HTTP_400_BAD_REQUEST)
+        if quantity < 0 or (quantity == 0 and not allow_zero):
+            return None, None, Response({'error': 'quantity must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        return product_id, quantity, None
+
+    def get(self, request):
+        if not request.session.session_key:
+            return self._response(GuestCart(''), request)
+        return self._response(GuestCart.load(request.session.session_key), request)
+
+    def post(self, request):
+        product_id, quantity, error = self._parse(request, allow_zero=False)
+        if error:
+            return error
+        if not Product.objects.filter(id=product_id).exists():
+            return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        session_key = ensure_session_key(request)
+        with guest_cart_lock(session_key):
+            guest = GuestCart.load(session_key)
+            guest.add(product_id, quantity)
+            guest.save()
+        return self._response(guest, request)
+
+    def patch(self, request):
+        product_id, quantity, error = self._parse(request, allow_zero=True)
+        if error:
+            return error
+
+        session_key = ensure_session_key(request)
+        with guest_cart_lock(session_key):
+            guest = GuestCart.load(session_key)
+            if quantity and product_id not in guest.items:
+                return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
+            guest.set(product_id, quantity)
+            guest.save()
+        return self._response(guest, request)
@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.core.media_utils import canonical_media_path
+from apps.core.response_cache import bump_tags
+from apps.home.models import HomeVideo, SliderImage
+from apps.home.signals import SLIDERS_CACHE_TAG, VIDEOS_CACHE_TAG
+from apps.products.models import Product
+from apps.products.signals import PRODUCTS_CACHE_TAG
+
+logger = logging.getLogger(__name__)
+
+# (model, file fields, JSON list fields, cache tag)
+TARGETS = [
+    (Product, ['main_image'], ['gallery'], PRODUCTS_CACHE_TAG),
+    (SliderImage, ['image'], [], SLIDERS_CACHE_TAG),
+    (HomeVideo, ['video'], [], VIDEOS_CACHE_TAG),
+]
+
+
+def load_checkpoints() -> dict:
+    """``{model label: last committed pk}`` from MEDIA_PATH_CHECKPOINT_FILE."""
+    try:
+        with open(settings.MEDIA_PATH_CHECKPOINT_FILE) as handle:
+            return json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_checkpoints(checkpoints: dict) -> None:
+    """Write the checkpoints atomically (temp file + rename)."""
+    path = settings.MEDIA_PATH_CHECKPOINT_FILE
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as handle:
+        json.dump(checkpoints, handle)
+    os.replace(tmp_path, path)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite stored media references (Product.main_image/gallery, SliderImage.image, "
+        "HomeVideo.video) to canonical storage names. Runs in primary-key chunks and "
+        "resumes from the last committed chunk. Run fix_media_paths first to move files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Rows read and updated per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without writing or saving progress.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore saved progress and start from the first row.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = max(options["chunk_size"], 1)
+        dry_run = options["dry_run"]
+        touched_tags = []
+        checkpoints = {} if options["restart"] else load_checkpoints()
+        if options["restart"] and not dry_run:
+            save_checkpoints(checkpoints)
+
+        for model, file_fields, list_fields, tag in TARGETS:
+            label = model._meta.label_lower
+            last_pk = checkpoints.get(label, 0)
+            if last_pk:
+                self.stdout.write(f"{label}: resuming after id {last_pk}")
+
+            scanned = changed = 0
+            fields = file_fields + list_fields
+            while True:
+                rows = list(
+                    model.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', *fields)[:chunk_size]
+                )
+                if not rows:
+                    break
+
+                updates = [row for row in rows if self._canonicalize(row, file_fields, list_fields)]
+                if updates and not dry_run:
+                    with transaction.atomic():
+                        model.objects.bulk_update(updates, fields)
+                scanned += len(rows)
+                changed += len(updates)
+                last_pk = rows[-1].pk
+                if not dry_run:
+                    # Progress is saved only after the chunk committed
+                    checkpoints[label] = last_pk
+                    save_checkpoints(checkpoints)
+
+            verb = "would rewrite" if dry_run else "rewrote"
+            self.stdout.write(self.style.SUCCESS(f"{label}: scanned {scanned}, {verb} {changed}"))
+            if changed and not dry_run:
+                touched_tags.append(tag)
+
+        if touched_tags:
+            # bulk_update skips save signals, so invalidate cached responses here
+            bump_tags(*touched_tags)
+
+    @staticmethod
+    def _canonicalize(row, file_fields, list_fields) -> bool:
+        dirty = False
+        for field in file_fields:
+            current = getattr(row, field).name or ''
+            canonical = canonical_media_path(current) or ''
+            if canonical != current:
+                setattr(row, field, canonical)
+                dirty = True
+        for field in list_fields:
+            current = getattr(row, field)
+            if not isinstance(current, list):
+                continue
+            canonical = [path for path in map(canonical_media_path, current) if path]
+            if canonical != current:
+                setattr(row, field, canonical)
+                dirty = True
+        return dirty
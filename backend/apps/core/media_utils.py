@@ -8,6 +8,7 @@ CRITICAL: All media must be served with absolute URLs to ensure:
 3. New uploads work immediately in production
 4. No re-deployment required for new media
 """
+from functools import lru_cache
 from django.conf import settings
 import logging
 
@@ -76,3 +77,78 @@ def get_absolute_media_url(media_url):
     except Exception as e:
         logger.error(f"[MediaURL] Error constructing absolute URL for {media_url}: {str(e)}")
         return None
+
+
+_ABSOLUTE_PREFIXES = ('http://', 'https://')
+MEDIA_URL_CACHE_SIZE = 8192
+
+
+def canonical_media_path(value):
+    """
+    Normalize a stored media reference to its canonical storage name.
+
+    Canonical names are relative to the media storage root (MEDIA_ROOT
+    locally, the 'media/' location on S3), with no leading slash and no
+    'media/' prefix, e.g. 'products/main/chair.jpg'. Absolute URLs that point
+    at our own media are reduced to that name; other absolute URLs are kept.
+
+    Canonicalizing never changes the URL clients are served: the old
+    request-time deduplication of '/media/media/' resolved every variant to
+    the same address.
+
+    Examples:
+        'media/media/products/main/a.jpg'              -> 'products/main/a.jpg'
+        '/media/products/main/a.jpg'                   -> 'products/main/a.jpg'
+        'https://cdn.example.com/media/products/a.jpg' -> 'products/a.jpg' (when MEDIA_URL matches)
+    """
+    if not value:
+        return None
+
+    path = str(value).strip()
+    if not path:
+        return None
+
+    if path.startswith(_ABSOLUTE_PREFIXES):
+        media_url = settings.MEDIA_URL
+        backend_media_url = f"{settings.BACKEND_URL.rstrip('/')}/{media_url.lstrip('/')}"
+        for prefix in (media_url, backend_media_url):
+            if prefix.startswith(_ABSOLUTE_PREFIXES) and path.startswith(prefix):
+                path = path[len(prefix):]
+                break
+        else:
+            return path.replace('/media/media/', '/media/', 1)
+
+    path = path.lstrip('/')
+    while path.startswith('media/'):
+        path = path[len('media/'):]
+    return path or None
+
+
+@lru_cache(maxsize=MEDIA_URL_CACHE_SIZE)
+def _absolute_media_url_for(path, media_url, backend_url):
+    name = canonical_media_path(path)
+    if not name:
+        return None
+    if name.startswith(_ABSOLUTE_PREFIXES):
+        return name
+    if media_url.startswith(_ABSOLUTE_PREFIXES):
+        return f"{media_url.rstrip('/')}/{name}"
+    return f"{backend_url.rstrip('/')}/{media_url.strip('/')}/{name}"
+
+
+def absolute_media_url(path):
+    """
+    Absolute URL for a stored media name, memoized by path.
+
+    Serializers call this with FieldFile.name or gallery entries instead of
+    going through storage.url() and string cleanup for every row. Settings
+    are part of the memo key, so override_settings and per-environment
+    MEDIA_URL/BACKEND_URL stay correct.
+    """
+    if not path:
+        return None
+    try:
+        return _absolute_media_url_for(str(path), settings.MEDIA_URL, settings.BACKEND_URL)
+    except Exception as e:
+        logger.error(f"[MediaURL] Error constructing absolute URL for {path}: {str(e)}")
+        return None
@@ -0,0 +1,154 @@
+"""Keyset (cursor) pagination on ``(created_at, id)``.
+
+Offset pagination gets slower with every page because the database still has
+to walk and discard ``offset`` rows, and it runs a ``COUNT(*)`` per page.
+Keyset pagination instead filters on the last row seen::
+
+    created_at < :created_at OR (created_at = :created_at AND id < :id)
+
+which is answered straight from the ``-created_at`` indexes regardless of
+depth.
+
+It is opt-in per request: clients pass ``?cursor=`` (empty for the first page)
+and follow the opaque ``next_cursor``/``previous_cursor`` tokens. Without the
+parameter the view keeps its previous behaviour (``fallback_class``). The
+total count is only computed when asked for with ``?with_count=true``.
+
+In cursor mode results are always ordered newest first; ``?ordering=`` is
+not applied.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+def encode_cursor(created_at: datetime, pk: int, reverse: bool = False) -> str:
+    """Encode a keyset position as an opaque, URL-safe token."""
+    payload = {'t': created_at.isoformat(), 'i': pk}
+    if reverse:
+        payload['r'] = 1
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str):
+    """Return ``(created_at, pk, reverse)`` for a token from ``encode_cursor``."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(payload['t']), int(payload['i']), bool(payload.get('r'))
+    except (TypeError, ValueError, KeyError, binascii.Error, UnicodeEncodeError):
+        raise NotFound('Invalid cursor')
+
+
+class KeysetPagination(BasePagination):
+    """Opt-in ``(created_at, id)`` keyset pagination, newest first."""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'with_count'
+    page_size = 20
+    max_page_size = 100
+    # Paginator used when the client did not ask for a cursor; None disables pagination
+    fallback_class = None
+
+    def __init__(self):
+        self.fallback = self.fallback_class() if self.fallback_class else None
+        self.use_fallback = False
+        self.count = None
+        self.next_cursor = None
+        self.previous_cursor = None
+        self.request = None
+
+    def is_requested(self, request) -> bool:
+        return self.cursor_query_param in request.query_params
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            size = self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None) -> Optional[List[Any]]:
+        if not self.is_requested(request):
+            self.use_fallback = True
+            if self.fallback is None:
+                return None
+            return self.fallback.paginate_queryset(queryset, request, view=view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if request.query_params.get(self.count_query_param, '').lower() in TRUE_VALUES:
+            self.count = queryset.order_by().count()
+
+        token = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        if token:
+            created_at, pk, reverse = decode_cursor(token)
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                ).order_by('created_at', 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                )
+        if not reverse:
+            queryset = queryset.order_by('-created_at', '-id')
+
+        # One extra row tells us whether there is another page in this direction
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        if rows:
+            first, last = rows[0], rows[-1]
+            has_next = has_more if not reverse else True
+            has_previous = has_more if reverse else bool(token)
+            if has_next:
+                self.next_cursor = encode_cursor(last.created_at, last.pk)
+            if has_previous:
+                self.previous_cursor = encode_cursor(first.created_at, first.pk, reverse=True)
+        return rows
+
+    def _link(self, cursor: Optional[str]) -> Optional[str]:
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_cursor_data(self, data) -> Dict[str, Any]:
+        """Pagination envelope for cursor mode, for views that build their own response."""
+        payload = {
+            'next': self._link(self.next_cursor),
+            'previous': self._link(self.previous_cursor),
+            'next_cursor': self.next_cursor,
+            'previous_cursor': self.previous_cursor,
+        }
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return payload
+
+    def get_paginated_response(self, data):
+        if self.use_fallback:
+            return self.fallback.get_paginated_response(data)
+        return Response(self.get_cursor_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response_schema(schema)
+        return super().get_paginated_response_schema(schema)
+
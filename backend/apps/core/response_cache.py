@@ -0,0 +1,522 @@
+"""Tag-versioned, two-tier response caching for read-heavy API endpoints.
+
+Cached payloads are stored under keys that embed the current version of every
+resource tag they depend on (e.g. ``products``, ``product:42``,
+``home:sliders``). A write bumps only the versions of the tags it touches, so
+stale entries simply stop being addressed and age out on their own TTL. This
+replaces ``cache.clear()``, which also wiped unrelated entries such as
+django-ratelimit counters stored in the same cache.
+
+Two tiers back every lookup:
+
+- L1: a small bounded LRU inside each worker process (``LocalLRUCache``).
+- L2: the shared Django ``default`` cache (Redis in production).
+
+Tag bumps are broadcast over Redis pub/sub (``InvalidationBus``) so every
+worker drops its L1 copy of the affected tag versions at the same time. When
+no broadcast channel is available, tag versions are always read from L2 and
+only immutable, version-bound payloads are kept in L1.
+
+Entries are stored as ``CachedPayload`` envelopes carrying a freshness
+deadline, and live in the cache for ``RESPONSE_CACHE_STALE_TTL`` seconds past
+it. ``get_or_set_payload`` uses that window for stale-while-revalidate: an
+expired entry is returned immediately while a single background refresh runs
+on the bounded task pool. On a cold miss, one request recomputes (single
+flight, guarded by a ``cache.add`` lock) while the others wait briefly for its
+result.
+
+``cached_response`` wraps all of this for views and adds a strong ETag derived
+from the cache key, answering ``If-None-Match`` revalidations with ``304``.
+
+Payloads returned from the cache are shared between requests of one worker and
+must be treated as read-only.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.core.tasks import TaskQueueFull, enqueue_bounded_task
+
+logger = logging.getLogger(__name__)
+
+TAG_VERSION_KEY_PREFIX = 'cache-tag-version'
+LOCK_POLL_INTERVAL_SECONDS = 0.05
+
+
+def cache_timeout() -> int:
+    """Return the configured TTL for cached API responses."""
+    return int(getattr(settings, 'API_RESPONSE_CACHE_TTL', 120))
+
+
+def stale_timeout() -> int:
+    """Return how long an expired entry may still be served while refreshing."""
+    return int(getattr(settings, 'RESPONSE_CACHE_STALE_TTL', 60))
+
+
+class CachedPayload(NamedTuple):
+    """Cache envelope: the payload plus the wall-clock time it goes stale."""
+
+    payload: Any
+    fresh_until: float
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+
+class LocalLRUCache:
+    """Bounded, thread-safe in-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 512, default_timeout: int = 30):
+        self.max_entries = max_entries
+        self.default_timeout = default_timeout
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> None:
+        timeout = self.default_timeout if timeout is None else min(timeout, self.default_timeout)
+        if timeout <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class InvalidationBus:
+    """Redis pub/sub channel announcing which cache tags were bumped.
+
+    Each worker runs one daemon listener thread. While the listener is not
+    subscribed (startup, Redis outage) ``is_listening`` is False and callers
+    must not trust L1 copies of tag versions. Every (re)subscription clears
+    L1, because messages published while disconnected are lost.
+    """
+
+    RECONNECT_DELAY_SECONDS = 5
+
+    def __init__(self, url: str, channel: str, local_cache: LocalLRUCache):
+        self.url = url
+        self.channel = channel
+        self.local_cache = local_cache
+        self.is_listening = False
+        self._client = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def start(self) -> None:
+        """Start the listener thread once per process."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._listen_forever,
+                daemon=True,
+                name='response-cache-invalidation',
+            )
+            self._thread.start()
+
+    def publish(self, tags: Iterable[str]) -> None:
+        try:
+            self._get_client().publish(self.channel, json.dumps(sorted(tags)))
+        except Exception:
+            logger.exception("Failed to broadcast cache invalidation for tags %s", sorted(tags))
+
+    def _listen_forever(self) -> None:
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._get_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self.local_cache.clear()
+                self.is_listening = True
+                for message in pubsub.listen():
+                    self._handle_message(message)
+            except Exception:
+                logger.warning("Cache invalidation listener disconnected; retrying", exc_info=True)
+            finally:
+                self.is_listening = False
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(self.RECONNECT_DELAY_SECONDS)
+
+    def _handle_message(self, message: Dict[str, Any]) -> None:
+        if message.get('type') != 'message':
+            return
+        try:
+            tags = json.loads(message['data'])
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed cache invalidation message: %r", message.get('data'))
+            return
+        self.local_cache.delete_many(_tag_version_key(tag) for tag in tags)
+
+
+_local_cache: Optional[LocalLRUCache] = None
+_invalidation_bus: Optional[InvalidationBus] = None
+_tiers_lock = threading.Lock()
+
+
+def get_local_cache() -> LocalLRUCache:
+    """Return this process's L1 cache, creating it on first use."""
+    global _local_cache
+    if _local_cache is None:
+        with _tiers_lock:
+            if _local_cache is None:
+                _local_cache = LocalLRUCache(
+                    max_entries=int(getattr(settings, 'RESPONSE_CACHE_L1_MAX_ENTRIES', 512)),
+                    default_timeout=int(getattr(settings, 'RESPONSE_CACHE_L1_TTL', 30)),
+                )
+    return _local_cache
+
+
+def get_invalidation_bus() -> Optional[InvalidationBus]:
+    """Return the running invalidation bus, or None when Redis is not configured."""
+    global _invalidation_bus
+    redis_url = getattr(settings, 'CACHE_REDIS_URL', '')
+    if not redis_url:
+        return None
+    if _invalidation_bus is None:
+        with _tiers_lock:
+            if _invalidation_bus is None:
+                _invalidation_bus = InvalidationBus(
+                    redis_url,
+                    getattr(settings, 'RESPONSE_CACHE_INVALIDATION_CHANNEL', 'pgf:response-cache:invalidate'),
+                    get_local_cache(),
+                )
+    # Started lazily so the thread lives in the worker, not a preforking master.
+    _invalidation_bus.start()
+    return _invalidation_bus
+
+
+def _tag_version_key(tag: str) -> str:
+    return f"{TAG_VERSION_KEY_PREFIX}:{tag}"
+
+
+def _new_version() -> int:
+    # Time-based versions are never reused, even if a version key is evicted
+    # and re-created later, so old entries can never become addressable again.
+    return time.time_ns()
+
+
+def get_tag_versions(tags: Iterable[str]) -> Dict[str, int]:
+    """Return the current version for each tag, initializing missing ones."""
+    local = get_local_cache()
+    bus = get_invalidation_bus()
+    trust_local = bus is not None and bus.is_listening
+
+    keys = {_tag_version_key(tag): tag for tag in set(tags)}
+    versions = {}
+    if trust_local:
+        for key, tag in keys.items():
+            version = local.get(key)
+            if version is not None:
+                versions[tag] = version
+
+    missing = [key for key, tag in keys.items() if tag not in versions]
+    if missing:
+        found = cache.get_many(missing)
+        for key in missing:
+            version = found.get(key)
+            if version is None:
+                version = _new_version()
+                if not cache.add(key, version, timeout=None):
+                    version = cache.get(key, version)
+            versions[keys[key]] = version
+            if trust_local:
+                local.set(key, version)
+    return versions
+
+
+def bump_tags(*tags: str) -> None:
+    """Invalidate every cached payload that depends on any of ``tags``."""
+    tags = set(tags)
+    cache.set_many({_tag_version_key(tag): _new_version() for tag in tags}, timeout=None)
+    get_local_cache().delete_many(_tag_version_key(tag) for tag in tags)
+
+    bus = get_invalidation_bus()
+    if bus is not None:
+        bus.publish(tags)
+    logger.debug("Bumped cache tags: %s", ", ".join(sorted(tags)))
+
+
+def bump_tags_on_commit(*tags: str) -> None:
+    """Bump ``tags`` once the current transaction commits.
+
+    Bumping before commit would let a concurrent reader re-cache the old rows
+    under the new version.
+    """
+    transaction.on_commit(lambda: bump_tags(*tags))
+
+
+def canonical_query_string(request) -> str:
+    """Return the request query string with parameters sorted by name.
+
+    ``?page=1&category=bed`` and ``?category=bed&page=1`` produce the same
+    string. The order of repeated values for one parameter is preserved.
+    """
+    params = request.GET
+    return urlencode(
+        [(name, value) for name in sorted(params) for value in params.getlist(name)]
+    )
+
+
+def build_cache_key(
+    namespace: str,
+    action_name: str,
+    request,
+    tags: Iterable[str],
+    scope: Optional[str] = None,
+    query: Optional[str] = None,
+) -> str:
+    """Build a cache key for ``request`` bound to the current ``tags`` versions.
+
+    ``query`` replaces the canonical query string, for views that normalize
+    their parameters themselves (e.g. a filter set).
+    """
+    versions = get_tag_versions(tags)
+    version_part = ','.join(f"{tag}={versions[tag]}" for tag in sorted(versions))
+    if query is None:
+        query = canonical_query_string(request)
+    raw = f"{request.path}?{query}|{version_part}"
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    parts = [namespace, action_name]
+    if scope:
+        parts.append(scope)
+    parts.append(digest)
+    return ':'.join(parts)
+
+
+def _lock_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+def get_payload(key: str) -> Optional[CachedPayload]:
+    """Look ``key`` up in L1, then L2, promoting L2 hits into L1.
+
+    A stale L1 entry is only returned when L2 has nothing fresher, so one
+    worker's background refresh becomes visible to the others.
+    """
+    local = get_local_cache()
+    entry = local.get(key)
+    if isinstance(entry, CachedPayload) and entry.is_fresh():
+        return entry
+
+    shared = cache.get(key)
+    if isinstance(shared, CachedPayload):
+        local.set(key, shared)
+        return shared
+    return entry if isinstance(entry, CachedPayload) else None
+
+
+def set_payload(key: str, payload: Any, timeout: Optional[int] = None) -> CachedPayload:
+    """Store ``payload`` in both tiers, fresh for ``timeout`` seconds."""
+    timeout = cache_timeout() if timeout is None else timeout
+    entry = CachedPayload(payload, time.time() + timeout)
+    cache.set(key, entry, timeout=timeout + stale_timeout())
+    get_local_cache().set(key, entry, timeout=timeout + stale_timeout())
+    return entry
+
+
+def _refresh_payload(key: str, fetcher: Callable[[], Any], timeout: Optional[int]) -> None:
+    try:
+        set_payload(key, fetcher(), timeout=timeout)
+    finally:
+        cache.delete(_lock_key(key))
+
+
+def _schedule_refresh(key: str, fetcher: Callable[[], Any], timeout: Optional[int]) -> None:
+    """Refresh ``key`` in the background unless a refresh is already running."""
+    lock_timeout = int(getattr(settings, 'RESPONSE_CACHE_LOCK_TIMEOUT', 10))
+    if not cache.add(_lock_key(key), 1, timeout=lock_timeout):
+        return
+    try:
+        enqueue_bounded_task(_refresh_payload, key, fetcher, timeout)
+    except TaskQueueFull:
+        # Keep serving the stale entry; a later request will retry.
+        cache.delete(_lock_key(key))
+        logger.warning("Skipped background refresh of %s: task pool is full", key)
+    except Exception:
+        cache.delete(_lock_key(key))
+        logger.exception("Failed to schedule background refresh of %s", key)
+
+
+def get_or_set_payload(key: str, fetcher: Callable[[], Any], timeout: Optional[int] = None) -> Any:
+    """Return the cached payload for ``key`` or compute and store it.
+
+    - Fresh hit: returned as-is.
+    - Stale hit: returned as-is while one background refresh is scheduled.
+    - Miss: one caller computes the payload; concurrent callers wait up to
+      ``RESPONSE_CACHE_LOCK_WAIT_MS`` for it before computing it themselves.
+    """
+    entry = get_payload(key)
+    if entry is not None:
+        if not entry.is_fresh():
+            _schedule_refresh(key, fetcher, timeout)
+        return entry.payload
+
+    lock_key = _lock_key(key)
+    lock_timeout = int(getattr(settings, 'RESPONSE_CACHE_LOCK_TIMEOUT', 10))
+    if cache.add(lock_key, 1, timeout=lock_timeout):
+        try:
+            return set_payload(key, fetcher(), timeout=timeout).payload
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + int(getattr(settings, 'RESPONSE_CACHE_LOCK_WAIT_MS', 2000)) / 1000
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL_SECONDS)
+        shared = cache.get(key)
+        if isinstance(shared, CachedPayload):
+            get_local_cache().set(key, shared)
+            return shared.payload
+        if cache.get(lock_key) is None:
+            break
+
+    return set_payload(key, fetcher(), timeout=timeout).payload
+
+
+def get_or_set_many_payloads(
+    keys: Dict[Hashable, str],
+    fetch_missing: Callable[[List[Hashable]], Dict[Hashable, Any]],
+    timeout: Optional[int] = None,
+) -> Dict[Hashable, Any]:
+    """Batch read-through for per-item entries.
+
+    ``keys`` maps item ids to cache keys. Fresh entries come from L1, then one
+    L2 ``get_many``; everything else is loaded with a single
+    ``fetch_missing(ids)`` call and written back with one ``set_many``. Ids
+    that ``fetch_missing`` does not return are left out of the result and
+    not cached. There is no single-flight or stale serving here: a batch
+    miss is one query for all of its items anyway.
+    """
+    local = get_local_cache()
+    result: Dict[Hashable, Any] = {}
+    pending: Dict[str, Hashable] = {}
+    for item_id, key in keys.items():
+        entry = local.get(key)
+        if isinstance(entry, CachedPayload) and entry.is_fresh():
+            result[item_id] = entry.payload
+        else:
+            pending[key] = item_id
+
+    if pending:
+        for key, entry in cache.get_many(list(pending)).items():
+            if isinstance(entry, CachedPayload) and entry.is_fresh():
+                local.set(key, entry)
+                result[pending.pop(key)] = entry.payload
+
+    if pending:
+        fetched = fetch_missing(list(pending.values()))
+        timeout = cache_timeout() if timeout is None else timeout
+        fresh_until = time.time() + timeout
+        entries = {}
+        for key, item_id in pending.items():
+            if item_id in fetched:
+                entries[key] = CachedPayload(fetched[item_id], fresh_until)
+                local.set(key, entries[key], timeout=timeout + stale_timeout())
+                result[item_id] = fetched[item_id]
+        if entries:
+            cache.set_many(entries, timeout=timeout + stale_timeout())
+    return result
+
+
+def etag_for_key(key: str) -> str:
+    """Strong ETag for a cache key.
+
+    Keys already embed the request path, canonical query, scope and tag
+    versions, so the ETag changes exactly when the cached payload would.
+    """
+    return '"%s"' % hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+def cached_response(request, key: str, fetcher: Callable[[], Any], timeout: Optional[int] = None):
+    """Serve ``key`` via ``get_or_set_payload`` with conditional GET support.
+
+    A matching ``If-None-Match`` gets an empty ``304 Not Modified`` without
+    touching the payload cache or serializing anything.
+    """
+    from django.utils.cache import get_conditional_response, patch_cache_control
+    from rest_framework.response import Response
+
+    etag = etag_for_key(key)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is None:
+        response = Response(get_or_set_payload(key, fetcher, timeout))
+    else:
+        response = not_modified
+    response['ETag'] = etag
+    # Let browsers keep the body but revalidate it on every use
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def register_cache_invalidation(
+    model_class: Any,
+    tags_for_instance: Callable[[Any], List[str]],
+) -> None:
+    """Bump the tags returned by ``tags_for_instance`` whenever a row changes.
+
+    Hooks ``post_save`` and ``post_delete`` so every write path (API viewsets,
+    the admin dashboard, Django admin, management commands) invalidates the
+    same entries.
+    """
+    from django.db.models.signals import post_delete, post_save
+
+    label = model_class._meta.label_lower
+
+    def handle_change(sender, instance, **kwargs):
+        try:
+            bump_tags_on_commit(*tags_for_instance(instance))
+        except Exception:
+            # Never let cache bookkeeping break the write itself.
+            logger.exception("Failed to invalidate cache tags for %s(pk=%s)", sender.__name__, instance.pk)
+
+    post_save.connect(handle_change, sender=model_class, weak=False, dispatch_uid=f"cache-tags-save-{label}")
+    post_delete.connect(handle_change, sender=model_class, weak=False, dispatch_uid=f"cache-tags-delete-{label}")
+    logger.info("Registered cache invalidation signals for %s", model_class.__name__)
@@ -2,12 +2,19 @@
 
 This module provides a pluggable interface for async tasks.
 Currently uses threading; can be replaced with Celery without changing views.
+
+A separate bounded thread pool (``enqueue_bounded_task``) is available for
+best-effort work such as cache refreshes, where dropping a task under load is
+preferable to spawning an unbounded number of threads.
 """
 import logging
 import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Any, Dict, Optional
 
+from django.conf import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,6 +56,41 @@ class ThreadingTaskRunner(TaskRunner):
             logger.exception(f"Task failed: {func.__name__}")
 
 
+class TaskQueueFull(RuntimeError):
+    """Raised when a bounded task runner has no free slot."""
+
+
+class ThreadPoolTaskRunner(TaskRunner):
+    """Execute tasks on a fixed-size thread pool with a bounded backlog."""
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 32):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task-pool")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    def enqueue(self, func: Callable, *args, **kwargs) -> str:
+        """Submit task to the pool, raising TaskQueueFull when saturated."""
+        if not self._slots.acquire(blocking=False):
+            raise TaskQueueFull(f"Task pool is full; dropped {func.__name__}")
+        try:
+            future = self._executor.submit(self._run, func, args, kwargs)
+        except Exception:
+            self._slots.release()
+            logger.exception(f"Failed to enqueue task: {func.__name__}")
+            raise
+        logger.debug(f"Task enqueued on pool: {func.__name__}")
+        return str(id(future))
+
+    def _run(self, func: Callable, args: tuple, kwargs: dict) -> None:
+        from django.db import connections
+
+        try:
+            ThreadingTaskRunner._safe_execute(func, args, kwargs)
+        finally:
+            # Pool threads are long-lived; don't leak their DB connections.
+            connections.close_all()
+            self._slots.release()
+
+
 class CeleryTaskRunner(TaskRunner):
     """Execute tasks using Celery (optional production backend)."""
 
@@ -90,6 +132,31 @@ def set_task_runner(runner: TaskRunner) -> None:
     logger.info(f"Task runner set to: {runner.__class__.__name__}")
 
 
+_bounded_task_runner: Optional[ThreadPoolTaskRunner] = None
+_bounded_task_runner_lock = threading.Lock()
+
+
+def get_bounded_task_runner() -> ThreadPoolTaskRunner:
+    """Get the process-wide bounded thread pool."""
+    global _bounded_task_runner
+    if _bounded_task_runner is None:
+        with _bounded_task_runner_lock:
+            if _bounded_task_runner is None:
+                _bounded_task_runner = ThreadPoolTaskRunner(
+                    max_workers=int(getattr(settings, "BACKGROUND_TASK_POOL_SIZE", 4)),
+                    max_pending=int(getattr(settings, "BACKGROUND_TASK_POOL_BACKLOG", 32)),
+                )
+    return _bounded_task_runner
+
+
+def enqueue_bounded_task(func: Callable, *args, **kwargs) -> str:
+    """Enqueue a best-effort task on the bounded pool.
+
+    Raises TaskQueueFull when every worker is busy and the backlog is full.
+    """
+    return get_bounded_task_runner().enqueue(func, *args, **kwargs)
+
+
 def enqueue_task(func: Callable, *args, **kwargs) -> str:
     """Enqueue a background task using the configured runner.
     
@@ -0,0 +1,81 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.core.media_utils import absolute_media_url, canonical_media_path
+from apps.products.models import Product
+
+
+@override_settings(MEDIA_URL='/media/', BACKEND_URL='https://api.example.com')
+class CanonicalMediaPathTests(TestCase):
+    def test_variants_collapse_to_storage_name(self):
+        for stored in (
+            'products/main/chair.jpg',
+            '/products/main/chair.jpg',
+            'media/products/main/chair.jpg',
+            'media/media/products/main/chair.jpg',
+            '/media/products/main/chair.jpg',
+            'https://api.example.com/media/products/main/chair.jpg',
+        ):
+            self.assertEqual(canonical_media_path(stored), 'products/main/chair.jpg', stored)
+
+    def test_foreign_urls_are_kept(self):
+        url = 'https://images.example.org/chair.jpg'
+        self.assertEqual(canonical_media_path(url), url)
+        self.assertEqual(absolute_media_url(url), url)
+
+    def test_absolute_url_for_local_and_s3_media(self):
+        self.assertEqual(
+            absolute_media_url('media/products/main/chair.jpg'),
+            'https://api.example.com/media/products/main/chair.jpg',
+        )
+        with self.settings(MEDIA_URL='https://cdn.example.com/media/'):
+            self.assertEqual(
+                absolute_media_url('products/main/chair.jpg'),
+                'https://cdn.example.com/media/products/main/chair.jpg',
+            )
+
+
+@override_settings(MEDIA_URL='/media/', BACKEND_URL='https://api.example.com')
+class CanonicalizeMediaPathsCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        checkpoint_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(checkpoint_dir.cleanup)
+        checkpoint_file = self.settings(
+            MEDIA_PATH_CHECKPOINT_FILE=os.path.join(checkpoint_dir.name, 'checkpoint.json'),
+        )
+        checkpoint_file.enable()
+        self.addCleanup(checkpoint_file.disable)
+
+    def test_rewrites_in_chunks_and_resumes(self):
+        first = Product.objects.create(
+            name='Chair', slug='chair', price='10.00',
+            main_image='media/media/products/main/chair.jpg',
+            gallery=['/media/products/gallery/a.jpg', '', 'https://images.example.org/b.jpg'],
+        )
+        second = Product.objects.create(name='Desk', slug='desk', price='10.00', main_image='products/main/desk.jpg')
+
+        call_command('canonicalize_media_paths', chunk_size=1, stdout=StringIO())
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.main_image.name, 'products/main/chair.jpg')
+        self.assertEqual(first.gallery, ['products/gallery/a.jpg', 'https://images.example.org/b.jpg'])
+        self.assertEqual(second.main_image.name, 'products/main/desk.jpg')
+
+        # A rerun resumes after the last processed id and scans nothing,
+        # even when the cache was flushed in between
+        Product.objects.filter(pk=first.pk).update(main_image='media/products/main/chair.jpg')
+        cache.clear()
+        out = StringIO()
+        call_command('canonicalize_media_paths', stdout=out)
+        self.assertIn('products.product: scanned 0', out.getvalue())
+
+        call_command('canonicalize_media_paths', restart=True, stdout=StringIO())
+        first.refresh_from_db()
+        self.assertEqual(first.main_image.name, 'products/main/chair.jpg')
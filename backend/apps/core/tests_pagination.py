@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.pagination import decode_cursor, encode_cursor
+from apps.products.models import Product
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for index in range(5):
+            Product.objects.create(name=f'Chair {index}', slug=f'chair-{index}', price='10.00')
+        # Identical timestamps force the id tiebreaker to do its job
+        Product.objects.update(created_at=timezone.now())
+        self.expected = list(Product.objects.order_by('-created_at', '-id').values_list('slug', flat=True))
+
+    def _slugs(self, response):
+        return [item['slug'] for item in response.data['results']]
+
+    def test_cursor_walks_forward_and_back_without_gaps(self):
+        first = self.client.get('/api/products/', {'cursor': '', 'page_size': 2})
+        self.assertEqual(self._slugs(first), self.expected[:2])
+        self.assertIsNone(first.data['previous_cursor'])
+        self.assertNotIn('count', first.data)
+
+        second = self.client.get('/api/products/', {'cursor': first.data['next_cursor'], 'page_size': 2})
+        third = self.client.get('/api/products/', {'cursor': second.data['next_cursor'], 'page_size': 2})
+        self.assertEqual(self._slugs(second) + self._slugs(third), self.expected[2:])
+        self.assertIsNone(third.data['next_cursor'])
+
+        back = self.client.get('/api/products/', {'cursor': third.data['previous_cursor'], 'page_size': 2})
+        self.assertEqual(self._slugs(back), self.expected[2:4])
+
+    def test_count_is_opt_in_and_default_stays_unpaginated(self):
+        response = self.client.get('/api/products/', {'cursor': '', 'with_count': 'true'})
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(self.client.get('/api/products/').data), 5)
+
+    def test_invalid_cursor_is_rejected(self):
+        self.assertEqual(self.client.get('/api/products/', {'cursor': 'not-a-cursor'}).status_code, 404)
+
+    def test_cursor_round_trip(self):
+        now = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(now, 7, reverse=True)), (now, 7, True))
@@ -0,0 +1,128 @@
+import time
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIClient
+
+from apps.core.response_cache import (
+    CachedPayload,
+    LocalLRUCache,
+    build_cache_key,
+    bump_tags,
+    get_or_set_payload,
+)
+from apps.products.models import Product
+
+
+class ResponseCacheKeyTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_query_parameter_order_does_not_change_key(self):
+        first = self.factory.get('/api/products/', {'page': 1, 'category': 'bed'})
+        second = self.factory.get('/api/products/?category=bed&page=1')
+
+        self.assertEqual(
+            build_cache_key('products', 'list', first, tags=['products']),
+            build_cache_key('products', 'list', second, tags=['products']),
+        )
+
+    def test_bumping_a_tag_only_changes_dependent_keys(self):
+        request = self.factory.get('/api/products/')
+        products_key = build_cache_key('products', 'list', request, tags=['products'])
+        sliders_key = build_cache_key('home:sliders', 'list', request, tags=['home:sliders'])
+
+        bump_tags('products')
+
+        self.assertNotEqual(products_key, build_cache_key('products', 'list', request, tags=['products']))
+        self.assertEqual(sliders_key, build_cache_key('home:sliders', 'list', request, tags=['home:sliders']))
+
+
+class LocalLRUCacheTests(TestCase):
+    def test_evicts_least_recently_used_entry(self):
+        local = LocalLRUCache(max_entries=2, default_timeout=30)
+        local.set('a', 1)
+        local.set('b', 2)
+        local.get('a')
+        local.set('c', 3)
+
+        self.assertEqual(local.get('a'), 1)
+        self.assertIsNone(local.get('b'))
+        self.assertEqual(local.get('c'), 3)
+
+    def test_zero_timeout_is_not_stored(self):
+        local = LocalLRUCache(max_entries=2, default_timeout=30)
+        local.set('a', 1, timeout=0)
+
+        self.assertIsNone(local.get('a'))
+
+
+class StaleWhileRevalidateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('apps.core.response_cache.enqueue_bounded_task')
+    def test_stale_entry_is_served_while_one_refresh_is_scheduled(self, mock_enqueue):
+        cache.set('swr-key', CachedPayload(['stale'], time.time() - 1), timeout=60)
+
+        first = get_or_set_payload('swr-key', lambda: ['fresh'])
+        second = get_or_set_payload('swr-key', lambda: ['fresh'])
+
+        self.assertEqual(first, ['stale'])
+        self.assertEqual(second, ['stale'])
+        self.assertEqual(mock_enqueue.call_count, 1)
+
+    @patch('apps.core.response_cache.LOCK_POLL_INTERVAL_SECONDS', 0.001)
+    def test_miss_waits_for_in_flight_computation(self):
+        # Another request holds the lock and publishes its result while we wait.
+        cache.add('miss-key:lock', 1, timeout=10)
+        calls = []
+
+        def fetcher():
+            calls.append(1)
+            return ['computed here']
+
+        with patch('apps.core.response_cache.cache.get', side_effect=[
+            None,
+            CachedPayload(['computed elsewhere'], time.time() + 60),
+        ]):
+            payload = get_or_set_payload('miss-key', fetcher)
+
+        self.assertEqual(payload, ['computed elsewhere'])
+        self.assertEqual(calls, [])
+
+
+class ProductCacheInvalidationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+
+    def test_product_write_invalidates_list_but_keeps_unrelated_entries(self):
+        cache.set('unrelated-entry', 'kept')
+        Product.objects.create(name='Oak Bed', price=Decimal('100.00'), category='bed')
+        self.assertEqual(len(self.client.get('/api/products/').json()), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name='Pine Bed', price=Decimal('80.00'), category='bed')
+
+        self.assertEqual(len(self.client.get('/api/products/').json()), 2)
+        self.assertEqual(cache.get('unrelated-entry'), 'kept')
+
+    def test_conditional_get_returns_304_until_products_change(self):
+        product = Product.objects.create(name='Oak Bed', price=Decimal('100.00'), category='bed')
+        first = self.client.get(f'/api/products/{product.slug}/')
+        etag = first['ETag']
+        self.assertEqual(first.status_code, 200)
+
+        revalidated = self.client.get(f'/api/products/{product.slug}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b'')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=product.pk).first().save()
+
+        changed = self.client.get(f'/api/products/{product.slug}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
@@ -8,5 +8,6 @@ class HomeConfig(AppConfig):
 
     def ready(self):
         # Cleanup signals are registered centrally by apps.core.apps.CoreConfig.
-        # Keep this hook available for future home-specific startup logic.
-        return
+        from .signals import register_home_cache_signals
+
+        register_home_cache_signals()
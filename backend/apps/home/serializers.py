@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from apps.core.media_utils import get_absolute_media_url
+from apps.core.media_utils import absolute_media_url
 from .models import SliderImage, HomeVideo
 import logging
 
@@ -19,11 +19,7 @@ class SliderImageSerializer(serializers.ModelSerializer):
         """Return absolute URL for image. Always absolute for S3 CORS compliance."""
         if not obj.image:
             return None
-        try:
-            return get_absolute_media_url(obj.image.url)
-        except Exception as e:
-            logger.error(f"[SliderImageSerializer] Error getting image URL for slider {obj.id}: {str(e)}")
-            return None
+        return absolute_media_url(obj.image.name)
 
 
 class HomeVideoSerializer(serializers.ModelSerializer):
@@ -39,8 +35,4 @@ class HomeVideoSerializer(serializers.ModelSerializer):
         """Return absolute URL for video. Always absolute for S3 CORS compliance."""
         if not obj.video:
             return None
-        try:
-            return get_absolute_media_url(obj.video.url)
-        except Exception as e:
-            logger.error(f"[HomeVideoSerializer] Error getting video URL for video {obj.id}: {str(e)}")
-            return None
+        return absolute_media_url(obj.video.name)
@@ -1,15 +1,27 @@
-"""Example Home cleanup signal registration.
+"""Home app signal registration.
 
-The production cleanup system is registered centrally by
-apps.core.apps.CoreConfig. This module is kept as a manual example for
-projects that want per-app registration instead.
+``register_home_cache_signals`` is called from HomeConfig.ready and keeps
+cached slider/video responses in sync with writes.
+
+The cleanup helpers below are kept as a manual example: the production
+cleanup system is registered centrally by apps.core.apps.CoreConfig.
 """
 
 from django.db.models.signals import pre_delete, pre_save
 
+from apps.core.response_cache import register_cache_invalidation
 from apps.core.s3_cleanup import cleanup_model_files_on_delete, cleanup_replaced_files_on_save
 from .models import SliderImage, HomeVideo
 
+SLIDERS_CACHE_TAG = "home:sliders"
+VIDEOS_CACHE_TAG = "home:videos"
+
+
+def register_home_cache_signals() -> None:
+    """Invalidate cached home responses whenever a slider or video changes."""
+    register_cache_invalidation(SliderImage, lambda instance: [SLIDERS_CACHE_TAG])
+    register_cache_invalidation(HomeVideo, lambda instance: [VIDEOS_CACHE_TAG])
+
 
 def register_home_cleanup_signals() -> None:
     """Manually register Home app cleanup signals."""
@@ -1,11 +1,10 @@
-from django.conf import settings
-from django.core.cache import cache
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from rest_framework.response import Response
 from apps.core.db import ensure_db_connection
+from apps.core.response_cache import build_cache_key, cached_response
 from .models import SliderImage, HomeVideo
 from .serializers import SliderImageSerializer, HomeVideoSerializer
+from .signals import SLIDERS_CACHE_TAG, VIDEOS_CACHE_TAG
 
 
 class SliderImageViewSet(viewsets.ModelViewSet):
@@ -16,12 +15,12 @@ class SliderImageViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = None  # Disable pagination for sliders
 
-    def _cache_timeout(self):
-        return int(getattr(settings, 'API_RESPONSE_CACHE_TTL', 120))
-
     def _cache_key(self, action_name, request):
         user_scope = 'staff' if request.user.is_staff else 'public'
-        return f"home:sliders:{action_name}:{user_scope}:{request.get_full_path()}"
+        return build_cache_key('home:sliders', action_name, request, tags=[SLIDERS_CACHE_TAG], scope=user_scope)
+
+    def _cache_response_or_fetch(self, key, fetcher):
+        return cached_response(self.request, key, fetcher)
     
     def get_queryset(self):
         """Show all sliders to staff, only active to public."""
@@ -32,25 +31,12 @@ class SliderImageViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         cache_key = self._cache_key('list', request)
-        cached_payload = cache.get(cache_key)
-        if cached_payload is not None:
-            return Response(cached_payload)
-
-        response = super().list(request, *args, **kwargs)
-        cache.set(cache_key, response.data, timeout=self._cache_timeout())
-        return response
-
-    def perform_create(self, serializer):
-        super().perform_create(serializer)
-        cache.clear()
 
-    def perform_update(self, serializer):
-        super().perform_update(serializer)
-        cache.clear()
+        def fetch_payload():
+            response = super(SliderImageViewSet, self).list(request, *args, **kwargs)
+            return response.data
 
-    def perform_destroy(self, instance):
-        super().perform_destroy(instance)
-        cache.clear()
+        return self._cache_response_or_fetch(cache_key, fetch_payload)
 
 
 class HomeVideoViewSet(viewsets.ModelViewSet):
@@ -61,12 +47,12 @@ class HomeVideoViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = None  # Disable pagination for videos
 
-    def _cache_timeout(self):
-        return int(getattr(settings, 'API_RESPONSE_CACHE_TTL', 120))
-
     def _cache_key(self, action_name, request):
         user_scope = 'staff' if request.user.is_staff else 'public'
-        return f"home:videos:{action_name}:{user_scope}:{request.get_full_path()}"
+        return build_cache_key('home:videos', action_name, request, tags=[VIDEOS_CACHE_TAG], scope=user_scope)
+
+    def _cache_response_or_fetch(self, key, fetcher):
+        return cached_response(self.request, key, fetcher)
     
     def get_queryset(self):
         """Show all videos to staff, only active to public."""
@@ -77,22 +63,9 @@ class HomeVideoViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         cache_key = self._cache_key('list', request)
-        cached_payload = cache.get(cache_key)
-        if cached_payload is not None:
-            return Response(cached_payload)
-
-        response = super().list(request, *args, **kwargs)
-        cache.set(cache_key, response.data, timeout=self._cache_timeout())
-        return response
-
-    def perform_create(self, serializer):
-        super().perform_create(serializer)
-        cache.clear()
 
-    def perform_update(self, serializer):
-        super().perform_update(serializer)
-        cache.clear()
+        def fetch_payload():
+            response = super(HomeVideoViewSet, self).list(request, *args, **kwargs)
+            return response.data
 
-    def perform_destroy(self, instance):
-        super().perform_destroy(instance)
-        cache.clear()
+        return self._cache_response_or_fetch(cache_key, fetch_payload)
@@ -3,6 +3,7 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.db.models import Q
 from .models import Notification, NotificationPreference, NotificationLog
+from .counters import recount_unread
 
 
 @admin.register(Notification)
@@ -124,6 +125,7 @@ class NotificationAdmin(admin.ModelAdmin):
             is_read=True,
             read_at=timezone.now()
         )
+        recount_unread(queryset.values_list('user_id', flat=True).distinct().order_by())
         self.message_user(request, f'{count} notification(s) marked as read.')
     
     mark_as_read.short_description = "Mark selected as read"
@@ -131,6 +133,7 @@ class NotificationAdmin(admin.ModelAdmin):
     def mark_as_unread(self, request, queryset):
         """Bulk action: Mark selected notifications as unread."""
         count = queryset.filter(is_read=True).update(is_read=False, read_at=None)
+        recount_unread(queryset.values_list('user_id', flat=True).distinct().order_by())
         self.message_user(request, f'{count} notification(s) marked as unread.')
     
     mark_as_unread.short_description = "Mark selected as unread"
@@ -142,6 +145,7 @@ class NotificationAdmin(admin.ModelAdmin):
             is_deleted=True,
             updated_at=timezone.now()
         )
+        recount_unread(queryset.values_list('user_id', flat=True).distinct().order_by())
         self.message_user(request, f'{count} notification(s) deleted.')
     
     delete_notifications.short_description = "Delete selected notifications"
@@ -17,6 +17,7 @@ import json
 import logging
 
 from .models import Notification
+from .counters import get_unread_count
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -187,9 +188,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         Database operation: Get current unread count.
         Called from async context via @database_sync_to_async.
         """
-        return Notification.get_unread_count(
-            User.objects.get(id=self.user_id)
-        )
+        return get_unread_count(self.user_id)
 
     async def send_unread_count(self):
         """
@@ -0,0 +1,166 @@
+"""Maintained unread-notification counters for the badge.
+
+Badge reads (the ``unread-count`` endpoint, WebSocket connects and
+``update_unread_count_async``) used to run a filtered ``COUNT(*)`` over
+``Notification``. They now read ``NotificationCounter.unread_count`` through
+the shared cache, so a badge read is a cache hit or one primary-key lookup.
+
+A notification counts while it is unread and not soft deleted. ``mark_read``,
+``mark_unread`` and ``soft_delete`` change that state with conditional
+updates, whose row counts stay exact under concurrent requests. In the same
+transaction they adjust the counter with ``UPDATE ... SET unread_count =
+unread_count + n``. The cached copy is dropped once the transaction commits.
+
+Expired notifications stay counted until ``cleanup_expired_notifications``
+soft deletes them, so that sweep runs every few minutes. Writes that bypass
+these helpers (admin bulk actions, hard deletes) are repaired by
+``recount_unread`` for the affected users. ``reconcile_unread_counts`` checks
+every user periodically.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Notification, NotificationCounter
+
+UNREAD_CACHE_TIMEOUT = 60 * 60
+RECONCILE_CHUNK_SIZE = 1000
+
+
+def unread_cache_key(user_id) -> str:
+    return f"notifications:unread:{user_id}"
+
+
+def get_unread_count(user_id) -> int:
+    """The badge count for ``user_id``, without touching the notifications table."""
+    key = unread_cache_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = (
+            NotificationCounter.objects.filter(user_id=user_id)
+            .values_list('unread_count', flat=True)
+            .first()
+        ) or 0
+        cache.set(key, count, UNREAD_CACHE_TIMEOUT)
+    return max(count, 0)
+
+
+def _invalidate_on_commit(user_ids: Iterable) -> None:
+    keys = [unread_cache_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def adjust_unread_counts(deltas: Dict[int, int]) -> None:
+    """Add ``deltas`` (user id -> change) to the counters, creating missing rows first."""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    # One UPDATE per distinct delta, so a broadcast chunk is a single statement
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        by_delta[delta].append(user_id)
+    now = timezone.now()
+    with transaction.atomic():
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id) for user_id in deltas],
+            ignore_conflicts=True,
+        )
+        for delta, user_ids in by_delta.items():
+            NotificationCounter.objects.filter(user_id__in=user_ids).update(
+                unread_count=F('unread_count') + delta, updated_at=now,
+            )
+        _invalidate_on_commit(deltas)
+
+
+def mark_read(notifications, user_id) -> int:
+    """Mark ``notifications`` (all owned by ``user_id``) read; returns the rows changed."""
+    now = timezone.now()
+    with transaction.atomic():
+        unread = notifications.filter(is_read=False)
+        counted = unread.filter(is_deleted=False).update(is_read=True, read_at=now, updated_at=now)
+        others = unread.update(is_read=True, read_at=now, updated_at=now)
+        adjust_unread_counts({user_id: -counted})
+    return counted + others
+
+
+def mark_unread(notifications, user_id) -> int:
+    """Mark ``notifications`` (all owned by ``user_id``) unread; returns the rows changed."""
+    now = timezone.now()
+    with transaction.atomic():
+        read = notifications.filter(is_read=True)
+        counted = read.filter(is_deleted=False).update(is_read=False, read_at=None, updated_at=now)
+        others = read.update(is_read=False, read_at=None, updated_at=now)
+        adjust_unread_counts({user_id: counted})
+    return counted + others
+
+
+def soft_delete(notifications, user_id) -> int:
+    """Soft delete ``notifications`` (all owned by ``user_id``); returns the rows changed."""
+    now = timezone.now()
+    with transaction.atomic():
+        live = notifications.filter(is_deleted=False)
+        counted = live.filter(is_read=False).update(is_deleted=True, updated_at=now)
+        others = live.update(is_deleted=True, updated_at=now)
+        adjust_unread_counts({user_id: -counted})
+    return counted + others
+
+
+def recount_unread(user_ids: Iterable[int]) -> int:
+    """
+    Recompute the counters of ``user_ids`` from the notifications table.
+
+    Counter rows are locked first, so concurrent adjustments wait and are
+    then applied on top of the recount. Returns the counters corrected.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return 0
+    with transaction.atomic():
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+        stored = dict(
+            NotificationCounter.objects.select_for_update()
+            .filter(user_id__in=user_ids)
+            .values_list('user_id', 'unread_count')
+        )
+        actual = dict(
+            Notification.objects.filter(user_id__in=user_ids, is_read=False, is_deleted=False)
+            .values('user_id')
+            .annotate(n=Count('id'))
+            .values_list('user_id', 'n')
+            .order_by()
+        )
+        drifted = [user_id for user_id in user_ids if stored.get(user_id) != actual.get(user_id, 0)]
+        now = timezone.now()
+        for user_id in drifted:
+            NotificationCounter.objects.filter(user_id=user_id).update(
+                unread_count=actual.get(user_id, 0), updated_at=now,
+            )
+        _invalidate_on_commit(drifted)
+    return len(drifted)
+
+
+def recount_unread_in_chunks(user_ids: Iterable, chunk_size: int = RECONCILE_CHUNK_SIZE) -> int:
+    """``recount_unread`` over ``user_ids``, one chunk (and transaction) at a time."""
+    corrected = 0
+    chunk = []
+    for user_id in user_ids:
+        chunk.append(user_id)
+        if len(chunk) >= chunk_size:
+            corrected += recount_unread(chunk)
+            chunk = []
+    return corrected + recount_unread(chunk)
+
+
+def reconcile_unread_counts(chunk_size: int = RECONCILE_CHUNK_SIZE) -> int:
+    """Recount every user's counter in chunks; returns the counters corrected."""
+    user_ids = get_user_model().objects.order_by('pk').values_list('pk', flat=True)
+    return recount_unread_in_chunks(user_ids.iterator(chunk_size=chunk_size), chunk_size)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.notifications.counters import RECONCILE_CHUNK_SIZE, reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount every user's unread notification counter from the notifications table "
+        "and correct the ones that drifted (e.g. after bulk updates or hard deletes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=RECONCILE_CHUNK_SIZE,
+            help="Users recounted per query.",
+        )
+
+    def handle(self, *args, **options):
+        corrected = reconcile_unread_counts(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Corrected {corrected} unread counters"))
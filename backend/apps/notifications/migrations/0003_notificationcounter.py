@@ -0,0 +1,46 @@
+# Generated by Django 5.1.4 on 2026-10-17 02:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    """Start every counter from the current unread, non-deleted notifications."""
+    Notification = apps.get_model('notifications', 'Notification')
+    NotificationCounter = apps.get_model('notifications', 'NotificationCounter')
+    rows = (
+        Notification.objects.filter(is_read=False, is_deleted=False)
+        .values('user_id')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=row['user_id'], unread_count=row['n']) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_rename_notification_user_created_idx_notificatio_user_id_05b4bc_idx_and_more'),
+        ('users', '0005_alter_user_managers_user_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(help_text='User whose notifications are counted', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread_count', models.IntegerField(default=0, help_text='Unread, non-deleted notifications (expired ones until the expiry sweep)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Notification Counter',
+                'verbose_name_plural': 'Notification Counters',
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
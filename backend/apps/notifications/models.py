@@ -164,9 +164,10 @@ class Notification(models.Model):
     def mark_as_read(self):
         """Mark this notification as read and record the time."""
         if not self.is_read:
+            from .counters import mark_read
+            mark_read(Notification.objects.filter(pk=self.pk), self.user_id)
             self.is_read = True
             self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at', 'updated_at'])
 
     def is_expired(self):
         """Check if notification has expired."""
@@ -204,15 +205,29 @@ class Notification(models.Model):
     def get_unread_count(cls, user):
         """
         Get unread notification count for real-time badge.
-        Highly optimized - uses .count() directly on database.
+        Read from the maintained per-user counter, never from this table.
         """
-        return cls.objects.filter(
-            user=user,
-            is_deleted=False,
-            is_read=False
-        ).exclude(
-            expires_at__lt=timezone.now()
-        ).count()
+        from .counters import get_unread_count
+        return get_unread_count(user.pk)
+
+
+# NotificationPreference toggle that governs each notification type
+PREFERENCE_FIELD_BY_TYPE = {
+    NotificationType.ORDER_CONFIRMED: 'order_notifications',
+    NotificationType.PAYMENT_RECEIVED: 'order_notifications',
+    NotificationType.ORDER_SHIPPED: 'order_notifications',
+    NotificationType.DELIVERY_UPDATE: 'order_notifications',
+    NotificationType.DELIVERED: 'order_notifications',
+    NotificationType.DELIVERY_FAILED: 'order_notifications',
+    NotificationType.ADMIN_MESSAGE: 'admin_notifications',
+    NotificationType.WARRANTY_UPDATE: 'support_notifications',
+    NotificationType.REFUND_STATUS: 'order_notifications',
+    NotificationType.LOYALTY_POINTS: 'promotional_notifications',
+    NotificationType.RESTOCKED_ITEM: 'promotional_notifications',
+    NotificationType.REVIEW_REMINDER: 'promotional_notifications',
+    NotificationType.INVOICE_READY: 'order_notifications',
+    NotificationType.DELIVERY_ETA: 'order_notifications',
+}
 
 
 class NotificationPreference(models.Model):
@@ -280,27 +295,41 @@ class NotificationPreference(models.Model):
         Determine if user should receive this notification type
         based on preferences.
         """
-        type_to_preference = {
-            NotificationType.ORDER_CONFIRMED: 'order_notifications',
-            NotificationType.PAYMENT_RECEIVED: 'order_notifications',
-            NotificationType.ORDER_SHIPPED: 'order_notifications',
-            NotificationType.DELIVERY_UPDATE: 'order_notifications',
-            NotificationType.DELIVERED: 'order_notifications',
-            NotificationType.DELIVERY_FAILED: 'order_notifications',
-            NotificationType.ADMIN_MESSAGE: 'admin_notifications',
-            NotificationType.WARRANTY_UPDATE: 'support_notifications',
-            NotificationType.REFUND_STATUS: 'order_notifications',
-            NotificationType.LOYALTY_POINTS: 'promotional_notifications',
-            NotificationType.RESTOCKED_ITEM: 'promotional_notifications',
-            NotificationType.REVIEW_REMINDER: 'promotional_notifications',
-            NotificationType.INVOICE_READY: 'order_notifications',
-            NotificationType.DELIVERY_ETA: 'order_notifications',
-        }
-        
-        pref_field = type_to_preference.get(notification_type, 'order_notifications')
+        pref_field = PREFERENCE_FIELD_BY_TYPE.get(notification_type, 'order_notifications')
         return getattr(self, pref_field, True)
 
 
+class NotificationCounter(models.Model):
+    """
+    Per-user unread notification count behind the badge.
+
+    Maintained by ``apps.notifications.counters``: every write that changes
+    whether a notification counts as unread (created, read, unread, soft
+    deleted, expired) adjusts this row in the same transaction, and
+    ``reconcile_unread_counts`` repairs drift from writes that bypass it.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_counter',
+        help_text='User whose notifications are counted'
+    )
+    unread_count = models.IntegerField(
+        default=0,
+        help_text='Unread, non-deleted notifications (expired ones until the expiry sweep)'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Notification Counter'
+        verbose_name_plural = 'Notification Counters'
+
+    def __str__(self):
+        return f"{self.unread_count} unread for user {self.user_id}"
+
+
 class NotificationLog(models.Model):
     """
     Optional model for audit logging of notification delivery.
@@ -10,6 +10,7 @@ This service handles:
 """
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils import timezone
 from django.db.models import Prefetch
 from datetime import timedelta
@@ -20,7 +21,9 @@ from .models import (
     NotificationType,
     NotificationPriority,
     NotificationPreference,
+    PREFERENCE_FIELD_BY_TYPE,
 )
+from .counters import adjust_unread_counts
 
 User = get_user_model()
 
@@ -31,6 +34,9 @@ class NotificationService:
     Coordinates between models, WebSocket consumers, and async tasks.
     """
 
+    # Recipients inserted and delivered per broadcast chunk
+    BROADCAST_CHUNK_SIZE = 1000
+
     # Default priority mapping for notification types
     DEFAULT_PRIORITY_MAP = {
         NotificationType.ORDER_CONFIRMED: NotificationPriority.NORMAL,
@@ -93,17 +99,19 @@ class NotificationService:
                 NotificationPriority.NORMAL
             )
         
-        # Create notification
-        notification = Notification.objects.create(
-            user=user,
-            title=title,
-            message=message,
-            notification_type=notification_type,
-            priority=priority,
-            action_url=action_url,
-            metadata=metadata or {},
-            expires_at=expires_at,
-        )
+        # Create notification and count it in the same transaction
+        with transaction.atomic():
+            notification = Notification.objects.create(
+                user=user,
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                priority=priority,
+                action_url=action_url,
+                metadata=metadata or {},
+                expires_at=expires_at,
+            )
+            adjust_unread_counts({user.pk: 1})
         
         return notification
 
@@ -164,7 +172,12 @@ class NotificationService:
     ):
         """
         Broadcast notification to single user, multiple users, or all users.
-        Efficient bulk creation with minimal database queries.
+
+        Recipient ids are streamed from the database in chunks of
+        BROADCAST_CHUNK_SIZE. For 'all', users who turned this notification
+        type off are filtered out in SQL. Each chunk is one bulk insert plus one
+        counter update, and is handed to a single Celery task for WebSocket
+        delivery once committed, so memory stays bounded by the chunk size.
         
         Args:
             recipient_type: 'single', 'multiple', or 'all'
@@ -183,8 +196,7 @@ class NotificationService:
         
         # Determine recipients
         if recipient_type == 'single':
-            user_ids = user_ids or []
-            recipients = User.objects.filter(id=user_ids[0])
+            recipients = User.objects.filter(id__in=(user_ids or [])[:1])
         elif recipient_type == 'multiple':
             recipients = User.objects.filter(id__in=user_ids or [])
         elif recipient_type == 'all':
@@ -192,37 +204,63 @@ class NotificationService:
             recipients = User.objects.filter(is_active=True)
         else:
             return 0
-        
-        # Bulk create notifications
-        notifications = [
-            Notification(
-                user=user,
-                title=title,
-                message=message,
-                notification_type=notification_type,
-                priority=priority or NotificationService.DEFAULT_PRIORITY_MAP.get(
-                    notification_type,
-                    NotificationPriority.NORMAL
-                ),
-                action_url=action_url,
-                metadata=metadata or {},
-                expires_at=expires_at,
-            )
-            for user in recipients
-        ]
-        
-        created_notifications = Notification.objects.bulk_create(
-            notifications,
-            batch_size=100,  # Create in batches for memory efficiency
-        )
-        
-        # Broadcast via WebSocket to connected users (via Celery task)
-        from apps.notifications.tasks import broadcast_notification_async
-        broadcast_notification_async.delay(
-            [n.id for n in created_notifications]
+
+        if recipient_type == 'all':
+            # Broadcasts skip users who opted out of this type; users without
+            # a preference row get the defaults (allow all). Directly targeted
+            # messages are always delivered.
+            pref_field = PREFERENCE_FIELD_BY_TYPE.get(notification_type, 'order_notifications')
+            recipients = recipients.exclude(**{f'notification_preference__{pref_field}': False})
+        recipient_ids = recipients.order_by('pk').values_list('pk', flat=True)
+
+        priority = priority or NotificationService.DEFAULT_PRIORITY_MAP.get(
+            notification_type,
+            NotificationPriority.NORMAL
         )
-        
-        return len(created_notifications)
+        chunk_size = NotificationService.BROADCAST_CHUNK_SIZE
+        created = 0
+        chunk = []
+        for user_id in recipient_ids.iterator(chunk_size=chunk_size):
+            chunk.append(user_id)
+            if len(chunk) >= chunk_size:
+                created += NotificationService._create_broadcast_chunk(
+                    chunk, title, message, notification_type, priority, action_url, metadata, expires_at,
+                )
+                chunk = []
+        if chunk:
+            created += NotificationService._create_broadcast_chunk(
+                chunk, title, message, notification_type, priority, action_url, metadata, expires_at,
+            )
+        return created
+
+    @staticmethod
+    def _create_broadcast_chunk(
+        user_ids, title, message, notification_type, priority, action_url, metadata, expires_at,
+    ):
+        """Insert and count one chunk of a broadcast, then queue its delivery on commit."""
+        from apps.notifications.tasks import send_notification_batch
+
+        with transaction.atomic():
+            created_notifications = Notification.objects.bulk_create(
+                [
+                    Notification(
+                        user_id=user_id,
+                        title=title,
+                        message=message,
+                        notification_type=notification_type,
+                        priority=priority,
+                        action_url=action_url,
+                        metadata=metadata or {},
+                        expires_at=expires_at,
+                    )
+                    for user_id in user_ids
+                ],
+                batch_size=len(user_ids),
+            )
+            adjust_unread_counts(dict.fromkeys(user_ids, 1))
+            notification_ids = [n.id for n in created_notifications]
+            transaction.on_commit(lambda: send_notification_batch.delay(notification_ids))
+        return len(notification_ids)
 
     @staticmethod
     def broadcast_notification(notification):
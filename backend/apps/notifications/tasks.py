@@ -17,6 +17,7 @@ import logging
 import json
 
 from .models import Notification, NotificationLog
+from .counters import get_unread_count, reconcile_unread_counts, recount_unread_in_chunks
 from .notification_service import NotificationService
 
 User = get_user_model()
@@ -134,18 +135,12 @@ def update_unread_count_async(user_id):
         user_id: ID of user to update
     """
     try:
-        user = User.objects.get(id=user_id)
-    except User.DoesNotExist:
-        logger.error(f"User {user_id} not found for unread count update")
-        return
-    
-    try:
-        # Get current unread count
-        unread_count = Notification.get_unread_count(user)
+        # Get current unread count from the maintained counter
+        unread_count = get_unread_count(user_id)
         
         # Send to user's WebSocket group
         async_to_sync(channel_layer.group_send)(
-            f'user_{user.id}',
+            f'user_{user_id}',
             {
                 'type': 'unread_count_update',
                 'unread_count': unread_count,
@@ -153,7 +148,7 @@ def update_unread_count_async(user_id):
         )
         
         logger.debug(
-            f"Unread count {unread_count} sent to user {user.id}"
+            f"Unread count {unread_count} sent to user {user_id}"
         )
         
     except Exception as exc:
@@ -163,32 +158,64 @@ def update_unread_count_async(user_id):
         )
 
 
+@shared_task
+def send_notification_batch(notification_ids):
+    """
+    Async task to deliver one broadcast chunk via WebSocket.
+
+    Loads the chunk in one query, pushes each notification to its user's
+    group and records every delivery with a single log insert, instead of
+    one task and log round trip per notification.
+
+    Args:
+        notification_ids: IDs of one chunk of notifications
+    """
+    notifications = Notification.objects.filter(id__in=notification_ids)
+    logs = []
+    failed = 0
+
+    for notification in notifications:
+        log = NotificationLog(notification_id=notification.id, delivery_attempts=1)
+        try:
+            async_to_sync(channel_layer.group_send)(
+                f'user_{notification.user_id}',
+                {
+                    'type': 'notification_message',
+                    'notification': NotificationService.get_formatted_notification(notification),
+                }
+            )
+            log.delivery_status = 'DELIVERED'
+            log.websocket_delivered = True
+        except Exception as exc:
+            failed += 1
+            log.delivery_status = 'FAILED'
+            log.last_error = str(exc)
+        logs.append(log)
+
+    NotificationLog.objects.bulk_create(logs, ignore_conflicts=True)
+
+    if failed:
+        logger.warning(f"Batch delivery: {failed} of {len(logs)} notifications failed")
+    logger.info(f"Delivered batch of {len(logs) - failed} notifications")
+    return {'delivered': len(logs) - failed, 'failed': failed}
+
+
 @shared_task
 def broadcast_notification_async(notification_ids):
     """
     Async task to broadcast multiple notifications to connected users.
     
-    Used after bulk operations to efficiently send all notifications.
+    Used after bulk operations; queues one send_notification_batch task per
+    chunk of BROADCAST_CHUNK_SIZE notifications.
     
     Args:
         notification_ids: List of notification IDs to broadcast
     """
-    try:
-        notifications = Notification.objects.filter(
-            id__in=notification_ids
-        ).select_related('user')
-        
-        for notification in notifications:
-            # Queue each notification separately for reliability
-            send_notification_via_websocket.delay(notification.id)
-        
-        logger.info(f"Queued {len(notification_ids)} notifications for broadcast")
-        
-    except Exception as exc:
-        logger.error(
-            f"Error broadcasting notifications: {str(exc)}",
-            exc_info=True
-        )
+    chunk_size = NotificationService.BROADCAST_CHUNK_SIZE
+    for start in range(0, len(notification_ids), chunk_size):
+        send_notification_batch.delay(notification_ids[start:start + chunk_size])
+    
+    logger.info(f"Queued {len(notification_ids)} notifications for broadcast")
 
 
 @shared_task
@@ -219,12 +246,12 @@ def schedule_review_reminder(order_id):
 
 
 @shared_task
-def cleanup_expired_notifications():
+def cleanup_expired_notifications(chunk_size=1000):
     """
     Scheduled periodic task to clean up expired notifications.
     
-    Runs via Celery beat (e.g., daily).
-    Soft deletes notifications that have passed their expiration date.
+    Runs via Celery beat every few minutes: expired notifications stay in
+    the unread counters until this soft deletes them.
     """
     now = timezone.now()
     
@@ -234,11 +261,14 @@ def cleanup_expired_notifications():
             expires_at__lt=now,
             is_deleted=False
         )
+        user_ids = list(expired.values_list('user_id', flat=True).distinct().order_by())
         
         count = expired.update(
             is_deleted=True,
             updated_at=now
         )
+        # Chunked so a large expired broadcast never locks every counter at once
+        recount_unread_in_chunks(user_ids, chunk_size)
         
         logger.info(f"Cleaned up {count} expired notifications")
         return count
@@ -247,6 +277,22 @@ def cleanup_expired_notifications():
         logger.error(f"Error cleaning up expired notifications: {str(exc)}", exc_info=True)
 
 
+@shared_task
+def reconcile_notification_counters():
+    """
+    Scheduled periodic task to recount every user's unread counter.
+
+    Repairs drift from writes that bypass ``apps.notifications.counters``.
+    """
+    try:
+        corrected = reconcile_unread_counts()
+        if corrected:
+            logger.warning(f"Corrected {corrected} drifted unread notification counters")
+        return corrected
+    except Exception as exc:
+        logger.error(f"Error reconciling unread counters: {str(exc)}", exc_info=True)
+
+
 @shared_task
 def cleanup_old_notification_logs():
     """
@@ -0,0 +1,82 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.notifications.models import (
+    Notification, NotificationLog, NotificationPreference, NotificationType,
+)
+from apps.notifications.notification_service import NotificationService
+from apps.notifications.tasks import send_notification_batch
+from apps.users.models import User
+
+
+class BroadcastFanOutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(name=f'User {index}', email=f'user{index}@example.com', password='StrongPass123!')
+            for index in range(6)
+        ]
+        User.objects.filter(pk=self.users[0].pk).update(is_active=False)
+        NotificationPreference.objects.update_or_create(user=self.users[1], defaults={'admin_notifications': False})
+        NotificationPreference.objects.update_or_create(
+            user=self.users[2], defaults={'promotional_notifications': False},
+        )
+
+    def broadcast(self, **kwargs):
+        with patch.object(NotificationService, 'BROADCAST_CHUNK_SIZE', 2), \
+                patch('apps.notifications.tasks.send_notification_batch.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            created = NotificationService.broadcast_to_users(
+                title='Sale', message='Everything must go',
+                notification_type=NotificationType.ADMIN_MESSAGE, **kwargs,
+            )
+        return created, delay
+
+    def test_all_users_are_streamed_in_chunks_and_filtered_by_preference(self):
+        created, delay = self.broadcast(recipient_type='all')
+
+        recipients = sorted(user.pk for user in self.users[2:])
+        self.assertEqual(created, 4)
+        self.assertEqual(
+            sorted(Notification.objects.values_list('user_id', flat=True)), recipients,
+        )
+        # One delivery task per committed chunk, not per notification
+        self.assertEqual(
+            [sorted(call.args[0]) for call in delay.call_args_list],
+            [
+                sorted(Notification.objects.filter(user_id__in=recipients[:2]).values_list('id', flat=True)),
+                sorted(Notification.objects.filter(user_id__in=recipients[2:]).values_list('id', flat=True)),
+            ],
+        )
+        self.assertEqual([Notification.get_unread_count(user) for user in self.users], [0, 0, 1, 1, 1, 1])
+
+    def test_explicit_recipients_ignore_broadcast_opt_out(self):
+        # users[1] turned admin notifications off, but was targeted directly
+        created, delay = self.broadcast(recipient_type='multiple', user_ids=[self.users[1].pk, self.users[3].pk])
+
+        self.assertEqual(created, 2)
+        self.assertEqual(
+            sorted(Notification.objects.values_list('user_id', flat=True)),
+            sorted([self.users[1].pk, self.users[3].pk]),
+        )
+        self.assertEqual(delay.call_count, 1)
+
+        created, _ = self.broadcast(recipient_type='single', user_ids=[self.users[1].pk])
+        self.assertEqual(created, 1)
+
+    def test_batch_delivery_is_one_query_and_one_log_insert(self):
+        created, _ = self.broadcast(recipient_type='all')
+        ids = list(Notification.objects.values_list('id', flat=True))
+        layer = MagicMock(group_send=AsyncMock())
+
+        with patch('apps.notifications.tasks.channel_layer', layer), self.assertNumQueries(2):
+            result = send_notification_batch(ids)
+
+        self.assertEqual(result, {'delivered': created, 'failed': 0})
+        self.assertEqual(
+            sorted(call.args[0] for call in layer.group_send.call_args_list),
+            sorted(f'user_{user.pk}' for user in self.users[2:]),
+        )
+        self.assertEqual(NotificationLog.objects.filter(delivery_status='DELIVERED').count(), created)
@@ -0,0 +1,92 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.notifications import counters
+from apps.notifications.models import Notification, NotificationCounter, NotificationType
+from apps.notifications.notification_service import NotificationService
+from apps.notifications.tasks import cleanup_expired_notifications
+from apps.users.models import User
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(name='Badge User', email='badge@example.com', password='StrongPass123!')
+        self.other = User.objects.create_user(name='Other User', email='other@example.com', password='StrongPass123!')
+
+    def notify(self, user=None, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return NotificationService.create_notification(
+                user=user or self.user, title='Hello', message='Body',
+                notification_type=NotificationType.ADMIN_MESSAGE, **kwargs,
+            )
+
+    def unread(self):
+        return Notification.get_unread_count(self.user)
+
+    def test_badge_reads_never_touch_notifications(self):
+        self.notify()
+        self.notify()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.unread(), 2)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('notifications_notification"', queries[0]['sql'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unread(), 2)
+
+    def test_state_changes_move_the_counter_once(self):
+        first, second = self.notify(), self.notify()
+        self.notify()
+        self.notify(user=self.other)
+        mine = Notification.objects.filter(user=self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.mark_as_read()
+            # A stale copy marking the same row again must not decrement twice
+            Notification.objects.get(pk=first.pk).mark_as_read()
+            counters.mark_read(mine.filter(pk=first.pk), self.user.pk)
+        self.assertEqual(self.unread(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(counters.mark_unread(mine, self.user.pk), 1)
+            self.assertEqual(counters.soft_delete(mine.filter(pk__in=[first.pk, second.pk]), self.user.pk), 2)
+        self.assertEqual(self.unread(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            # Deleted rows change state but are no longer counted
+            self.assertEqual(counters.mark_read(mine, self.user.pk), 3)
+        self.assertEqual(self.unread(), 0)
+        self.assertEqual(Notification.get_unread_count(self.other), 1)
+
+    def test_expiry_sweep_and_reconciliation(self):
+        self.notify(expires_at=timezone.now() - timedelta(minutes=1))
+        self.notify(user=self.other, expires_at=timezone.now() - timedelta(minutes=1))
+        self.notify()
+        self.assertEqual(self.unread(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch.object(counters, 'recount_unread', wraps=counters.recount_unread) as recount:
+            self.assertEqual(cleanup_expired_notifications(chunk_size=1), 2)
+        self.assertEqual(self.unread(), 1)
+        self.assertEqual(Notification.get_unread_count(self.other), 0)
+        # One recount (and one row-lock transaction) per chunk of users
+        self.assertEqual([len(call.args[0]) for call in recount.call_args_list], [1, 1, 0])
+
+        # Writes that bypass the helpers drift until the next reconciliation
+        Notification.objects.filter(user=self.other).delete()
+        Notification.objects.create(user=self.other, title='Raw', message='Body',
+                                    notification_type=NotificationType.ADMIN_MESSAGE)
+        NotificationCounter.objects.filter(user=self.user).update(unread_count=7)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_notification_counters', chunk_size=1, stdout=StringIO())
+        self.assertEqual(self.unread(), 1)
+        self.assertEqual(Notification.get_unread_count(self.other), 1)
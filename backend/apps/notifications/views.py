@@ -18,8 +18,10 @@ from .serializers import (
     AdminBroadcastNotificationSerializer,
 )
 from .notification_service import NotificationService
+from . import counters
 from .permissions import IsOwnerOrReadOnly, IsAdminOrReadOnly
 from core.response_helpers import success_response, error_response
+from apps.core.pagination import KeysetPagination
 
 
 class NotificationPagination(PageNumberPagination):
@@ -32,6 +34,14 @@ class NotificationPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class NotificationCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for the notification feed (?cursor=).
+    Falls back to page numbers when no cursor is requested.
+    """
+    fallback_class = NotificationPagination
+
+
 class NotificationViewSet(viewsets.ModelViewSet):
     """
     API ViewSet for managing user notifications.
@@ -52,7 +62,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
     """
     
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = NotificationPagination
+    pagination_class = NotificationCursorPagination
     search_fields = ['title', 'message', 'notification_type']
     filterset_fields = ['notification_type', 'priority', 'is_read']
     ordering_fields = ['created_at', 'priority', 'is_read']
@@ -101,7 +111,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
         GET /api/notifications/unread-count/
         
         Return current unread notification count for badge.
-        Lightweight query - only COUNT(*) on database.
+        Served from the maintained counter; never counts notifications.
         
         Response:
         {
@@ -161,25 +171,17 @@ class NotificationViewSet(viewsets.ModelViewSet):
         }
         """
         user = request.user
-        now = timezone.now()
         
         # Get all unread, non-deleted notifications
         unread_notifications = Notification.objects.filter(
             user=user,
-            is_read=False,
             is_deleted=False
         ).exclude(
-            expires_at__lt=now
+            expires_at__lt=timezone.now()
         )
         
-        count = unread_notifications.count()
-        
-        # Bulk update for efficiency
-        unread_notifications.update(
-            is_read=True,
-            read_at=now,
-            updated_at=now
-        )
+        # Bulk update for efficiency; the row count comes from the UPDATE
+        count = counters.mark_read(unread_notifications, user.pk)
         
         # Broadcast to WebSocket
         NotificationService.broadcast_unread_count_update(user)
@@ -223,30 +225,18 @@ class NotificationViewSet(viewsets.ModelViewSet):
             is_deleted=False
         )
         
-        now = timezone.now()
         affected_count = 0
         
         if action == 'mark_read':
-            affected_count = notifications.update(
-                is_read=True,
-                read_at=now,
-                updated_at=now
-            )
+            affected_count = counters.mark_read(notifications, user.pk)
             message = f'{affected_count} notifications marked as read'
         
         elif action == 'mark_unread':
-            affected_count = notifications.update(
-                is_read=False,
-                read_at=None,
-                updated_at=now
-            )
+            affected_count = counters.mark_unread(notifications, user.pk)
             message = f'{affected_count} notifications marked as unread'
         
         elif action == 'delete':
-            affected_count = notifications.update(
-                is_deleted=True,
-                updated_at=now
-            )
+            affected_count = counters.soft_delete(notifications, user.pk)
             message = f'{affected_count} notifications deleted'
         
         # Broadcast update
@@ -273,8 +263,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
                 status.HTTP_403_FORBIDDEN
             )
         
-        notification.is_deleted = True
-        notification.save(update_fields=['is_deleted', 'updated_at'])
+        counters.soft_delete(Notification.objects.filter(pk=notification.pk), request.user.pk)
         
         NotificationService.broadcast_unread_count_update(request.user)
         
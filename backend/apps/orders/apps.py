@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class OrdersConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.orders'
+
+    def ready(self):
+        from .signals import register_order_rollup_signals, register_order_stock_signals
+
+        register_order_rollup_signals()
+        register_order_stock_signals()
@@ -0,0 +1,112 @@
+"""Streaming order exports for accounting.
+
+Orders are read with ``.iterator(chunk_size=...)`` (a server-side cursor on
+PostgreSQL) and every ``Order.items`` entry becomes one output row, so an
+export holds at most one chunk of orders in memory no matter how long the
+date range is. The same generators back the admin
+``orders/export`` endpoint and the ``export_orders`` management command.
+"""
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Order
+from .order_lines import build_order_lines
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+EXPORT_CHUNK_SIZE = 2000
+
+COLUMNS = [
+    'order_id', 'created_at', 'status', 'paid', 'payment_method',
+    'customer_name', 'email', 'phone', 'city', 'order_total',
+    'product_id', 'product_name', 'price', 'qty', 'line_total',
+]
+ORDER_FIELDS = (
+    'id', 'created_at', 'status', 'paid', 'payment_method',
+    'name', 'email', 'phone', 'city', 'total_amount', 'items',
+)
+# Spreadsheet apps evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_queryset(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    statuses: Optional[List[str]] = None,
+):
+    """Orders placed from ``start`` to ``end`` (inclusive local dates), oldest first."""
+    orders = Order.objects.only(*ORDER_FIELDS).order_by('created_at', 'id')
+    tz = timezone.get_current_timezone()
+    if start is not None:
+        orders = orders.filter(created_at__gte=datetime.combine(start, time.min, tzinfo=tz))
+    if end is not None:
+        orders = orders.filter(created_at__lt=datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz))
+    if statuses:
+        orders = orders.filter(status__in=statuses)
+    return orders
+
+
+def iter_rows(orders, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """One dict per order line; orders without valid items yield one row without line fields."""
+    for order in orders.iterator(chunk_size=chunk_size):
+        base = {
+            'order_id': order.id,
+            'created_at': timezone.localtime(order.created_at).isoformat(),
+            'status': order.status,
+            'paid': order.paid,
+            'payment_method': order.payment_method,
+            'customer_name': order.name,
+            'email': order.email,
+            'phone': order.phone,
+            'city': order.city,
+            'order_total': order.total_amount,
+        }
+        lines = build_order_lines(order)
+        if not lines:
+            yield {**base, 'product_id': None, 'product_name': '', 'price': None, 'qty': None, 'line_total': None}
+        for line in lines:
+            yield {
+                **base,
+                'product_id': line.product_id,
+                'product_name': line.name,
+                'price': line.price,
+                'qty': line.qty,
+                'line_total': line.line_total,
+            }
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow([_csv_cell(row[column]) for column in COLUMNS])
+
+
+def iter_jsonl(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def iter_export(fmt: str, orders, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """Encoded export lines for ``orders`` in ``fmt`` (``csv`` or ``jsonl``)."""
+    rows = iter_rows(orders, chunk_size=chunk_size)
+    return iter_csv(rows) if fmt == 'csv' else iter_jsonl(rows)
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.orders.models import Order, OrderLine
+from apps.orders.order_lines import build_order_lines
+
+
+class Command(BaseCommand):
+    help = (
+        "Create OrderLine rows from Order.items for orders that have none yet. "
+        "Runs in primary-key chunks, one transaction per chunk, so it can be "
+        "interrupted and re-run safely."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Orders read and written per transaction.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Replace the lines of every order instead of only filling missing ones.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be written without writing.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = max(options["chunk_size"], 1)
+        rebuild = options["rebuild"]
+        dry_run = options["dry_run"]
+
+        last_pk = 0
+        scanned = filled = written = 0
+        while True:
+            orders = list(Order.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'items')[:chunk_size])
+            if not orders:
+                break
+            last_pk = orders[-1].pk
+            scanned += len(orders)
+
+            ids = [order.pk for order in orders]
+            if not rebuild:
+                done = set(OrderLine.objects.filter(order_id__in=ids).values_list('order_id', flat=True).distinct())
+                orders = [order for order in orders if order.pk not in done]
+            lines = [line for order in orders for line in build_order_lines(order)]
+            filled += len(orders)
+            written += len(lines)
+
+            if dry_run:
+                continue
+            with transaction.atomic():
+                if rebuild:
+                    OrderLine.objects.filter(order_id__in=ids).delete()
+                OrderLine.objects.bulk_create(lines)
+
+        verb = "would write" if dry_run else "wrote"
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} orders, {verb} {written} lines for {filled} orders"
+        ))
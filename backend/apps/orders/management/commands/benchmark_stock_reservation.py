@@ -0,0 +1,91 @@
+import statistics
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections
+
+from apps.products.inventory import InsufficientStock, reserve_stock
+from apps.products.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one product with concurrent single-unit reservations and check that "
+        "exactly --stock succeed, stock never goes negative and no reservation fails "
+        "on a lock. Meaningful on PostgreSQL; SQLite serializes all writers. The "
+        "benchmark product is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stock", type=int, default=500, help="Units of the hot product.")
+        parser.add_argument("--threads", type=int, default=32, help="Concurrent buyers.")
+        parser.add_argument(
+            "--attempts", type=int, default=None,
+            help="Reservations per thread (default: enough to oversubscribe stock 2x).",
+        )
+
+    def handle(self, *args, **options):
+        if connection.in_atomic_block:
+            raise CommandError("Run outside a transaction: worker threads need committed rows.")
+        threads = options["threads"]
+        attempts = options["attempts"] or max(1, (2 * options["stock"]) // threads)
+        product = Product.objects.create(
+            name="Benchmark hot product", slug=f"benchmark-hot-{uuid.uuid4().hex[:12]}",
+            price=Decimal("1.00"), stock=options["stock"],
+        )
+        results = {"reserved": 0, "sold_out": 0, "errors": 0}
+        latencies_ms = []
+        lock = threading.Lock()
+        start = threading.Barrier(threads)
+
+        def buyer():
+            local = {"reserved": 0, "sold_out": 0, "errors": 0}
+            timings = []
+            try:
+                start.wait()
+                for _ in range(attempts):
+                    began = time.perf_counter()
+                    try:
+                        reserve_stock({product.pk: 1})
+                        local["reserved"] += 1
+                    except InsufficientStock:
+                        local["sold_out"] += 1
+                    except DatabaseError:
+                        local["errors"] += 1
+                    timings.append((time.perf_counter() - began) * 1000)
+            finally:
+                connections.close_all()
+                with lock:
+                    for key, value in local.items():
+                        results[key] += value
+                    latencies_ms.extend(timings)
+
+        try:
+            started = time.perf_counter()
+            workers = [threading.Thread(target=buyer) for _ in range(threads)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+            product.refresh_from_db(fields=["stock"])
+        finally:
+            Product.objects.filter(pk=product.pk).delete()
+
+        latencies_ms.sort()
+        p99 = latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.99))] if latencies_ms else 0.0
+        self.stdout.write(
+            f"{threads} threads x {attempts} attempts on {options['stock']} units in {elapsed:.2f} s: "
+            f"{results['reserved']} reserved, {results['sold_out']} sold out, {results['errors']} DB errors"
+        )
+        self.stdout.write(
+            f"latency p50 {statistics.median(latencies_ms) if latencies_ms else 0.0:.2f} ms  "
+            f"p99 {p99:.2f} ms  final stock {product.stock}"
+        )
+        expected = min(options["stock"], threads * attempts)
+        if results["reserved"] != expected or product.stock != options["stock"] - expected:
+            raise CommandError(f"Oversell check failed: expected {expected} reservations.")
+        self.stdout.write(self.style.SUCCESS("No oversells."))
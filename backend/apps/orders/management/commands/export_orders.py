@@ -0,0 +1,63 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.orders.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_queryset, iter_export
+from apps.orders.models import Order
+
+
+def _parse_date(value, name):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"--{name} must be a date in YYYY-MM-DD format")
+
+
+class Command(BaseCommand):
+    help = (
+        "Export orders as CSV or JSON lines, one row per line item. Streams from a "
+        "server-side cursor, so memory use does not grow with the date range."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", help="First order date (YYYY-MM-DD), inclusive.")
+        parser.add_argument("--to", dest="end", help="Last order date (YYYY-MM-DD), inclusive.")
+        parser.add_argument(
+            "--status",
+            action="append",
+            default=[],
+            help="Only orders with this status. May be repeated.",
+        )
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--output", help="File to write to (default: stdout).")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Orders fetched per round trip.",
+        )
+
+    def handle(self, *args, **options):
+        statuses = options["status"]
+        invalid = [value for value in statuses if value not in dict(Order.STATUS_CHOICES)]
+        if invalid:
+            raise CommandError(f"Unknown status: {', '.join(invalid)}")
+
+        orders = export_queryset(_parse_date(options["start"], "from"), _parse_date(options["end"], "to"), statuses)
+        chunks = iter_export(options["format"], orders, chunk_size=max(options["chunk_size"], 1))
+
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        rows = 0
+        with open(options["output"], "w", encoding="utf-8", newline="") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+                rows += 1
+        if options["format"] == "csv":
+            rows -= 1  # header
+        self.stderr.write(self.style.SUCCESS(f"Wrote {rows} rows to {options['output']}"))
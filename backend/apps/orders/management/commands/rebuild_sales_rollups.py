@@ -0,0 +1,30 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.orders.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute DailySalesRollup rows from the orders. Needed after bulk order "
+        "changes that bypass save signals. Run backfill_order_lines first so units are complete."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="Only rebuild dates from this day on (YYYY-MM-DD).",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = date.fromisoformat(options["since"])
+            except ValueError:
+                raise CommandError("--since must be a date in YYYY-MM-DD format")
+
+        written = rebuild_rollups(since)
+        scope = f"since {since}" if since else "for all dates"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup rows {scope}"))
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-17 01:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_alter_order_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.PositiveIntegerField()),
+                ('name', models.CharField(blank=True, max_length=200)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('qty', models.PositiveIntegerField()),
+                ('line_total', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('order', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='orders.order')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product_id'], name='orderline_product_idx'), models.Index(fields=['order', 'product_id'], name='orderline_order_product_idx')],
+            },
+        ),
+    ]
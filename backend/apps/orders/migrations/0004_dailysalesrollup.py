@@ -0,0 +1,60 @@
+# Generated by Django 5.1.4 on 2026-10-17 02:01
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def seed_rollups(apps, schema_editor):
+    """Fill the new table from existing orders; later changes are incremental."""
+    Order = apps.get_model('orders', 'Order')
+    DailySalesRollup = apps.get_model('orders', 'DailySalesRollup')
+
+    buckets = defaultdict(lambda: [0, Decimal('0'), 0])
+    orders = Order.objects.only('created_at', 'status', 'paid', 'total_amount', 'items')
+    for order in orders.iterator(chunk_size=2000):
+        bucket = buckets[(timezone.localdate(order.created_at), order.status, order.paid)]
+        bucket[0] += 1
+        bucket[1] += order.total_amount or 0
+        for item in order.items if isinstance(order.items, list) else []:
+            try:
+                qty = int(item.get('qty', 0) or 0) if int(item.get('product_id') or 0) > 0 else 0
+            except (AttributeError, TypeError, ValueError):
+                continue
+            bucket[2] += max(qty, 0)
+
+    DailySalesRollup.objects.bulk_create(
+        [
+            DailySalesRollup(date=day, status=status, paid=paid, order_count=count, revenue=revenue, units=units)
+            for (day, status, paid), (count, revenue, units) in buckets.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_orderline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('received', 'Received'), ('confirmed', 'Confirmed'), ('processing', 'Processing'), ('shipped', 'Shipped'), ('out_for_delivery', 'Out for Delivery'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('paid', models.BooleanField(default=False)),
+                ('order_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('units', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'status', 'paid'), name='sales_rollup_bucket_uniq')],
+            },
+        ),
+        migrations.RunPython(seed_rollups, migrations.RunPython.noop),
+    ]
@@ -49,6 +49,8 @@ class Order(models.Model):
     )
     paid = models.BooleanField(default=False, db_index=True)
     payment_method = models.CharField(max_length=50, blank=True)
+    # True while the order holds stock (see apps.products.inventory); cleared when released
+    stock_reserved = models.BooleanField(default=False)
     
     # Tracking
     notes = models.TextField(blank=True)
@@ -70,7 +72,7 @@ class Order(models.Model):
 
     @property
     def item_count(self) -> int:
-        """Total number of items in order."""
+        """Total number of items in order (from the JSON snapshot, no query)."""
         if not self.items:
             return 0
         return sum(item.get('qty', 0) for item in self.items)
@@ -94,3 +96,52 @@ class Order(models.Model):
     def is_in_transit(self) -> bool:
         """Check if order is out for delivery."""
         return self.status in {'shipped', 'out_for_delivery'}
+
+
+class OrderLine(models.Model):
+    """One row per ``Order.items`` entry, so sales can be aggregated in SQL.
+
+    Written from the JSON snapshot when the order is created (see
+    ``apps.orders.order_lines``); the snapshot stays the source of truth.
+    """
+
+    # Covered by the (order, product_id) index below
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='lines', db_index=False)
+    product_id = models.PositiveIntegerField()
+    name = models.CharField(max_length=200, blank=True)
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    qty = models.PositiveIntegerField()
+    line_total = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product_id'], name='orderline_product_idx'),
+            models.Index(fields=['order', 'product_id'], name='orderline_order_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"OrderLine(order={self.order_id}, product={self.product_id}, qty={self.qty})"
+
+
+class DailySalesRollup(models.Model):
+    """Per-day order totals for one (status, paid) bucket.
+
+    Kept up to date incrementally as orders are created, change status or
+    paid state, or are deleted (see ``apps.orders.rollups``);
+    ``rebuild_sales_rollups`` recomputes them from the orders.
+    """
+
+    date = models.DateField()
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    paid = models.BooleanField(default=False)
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    units = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'status', 'paid'], name='sales_rollup_bucket_uniq'),
+        ]
+
+    def __str__(self):
+        return f"DailySalesRollup({self.date}, {self.status}, paid={self.paid}, orders={self.order_count})"
@@ -0,0 +1,104 @@
+"""Normalized order lines and the sales queries built on them.
+
+``Order.items`` is a JSON snapshot, which is fine for showing one order but
+forces any per-product statistic to load every order into Python. Each
+snapshot entry is therefore also written as an ``OrderLine`` row when the
+order is created, and older orders are filled in by the
+``backfill_order_lines`` command.
+
+Sales figures are then plain ``GROUP BY product_id`` aggregates over the
+``orderline_product_idx`` index, joined to the order only for its status.
+"""
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Order, OrderLine
+
+# Orders whose lines count as sold
+SALES_STATUSES = ('delivered',)
+
+
+def build_order_lines(order: Order) -> List[OrderLine]:
+    """Unsaved ``OrderLine`` rows for ``order.items``; malformed entries are skipped."""
+    lines = []
+    for item in order.items or []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            product_id = int(item.get('product_id') or 0)
+            qty = int(item.get('qty', 0) or 0)
+        except (TypeError, ValueError):
+            continue
+        if product_id <= 0 or qty <= 0:
+            continue
+        try:
+            price = Decimal(str(item.get('price', 0) or 0)).quantize(Decimal('0.01'))
+        except (InvalidOperation, ValueError):
+            price = Decimal('0.00')
+        lines.append(OrderLine(
+            order=order,
+            product_id=product_id,
+            name=str(item.get('name') or '')[:200],
+            price=price,
+            qty=qty,
+            line_total=price * qty,
+        ))
+    return lines
+
+
+def item_quantities(items) -> Dict[int, int]:
+    """``product_id -> total qty`` for a list of ``Order.items`` entries."""
+    quantities: Dict[int, int] = {}
+    for line in build_order_lines(Order(items=items)):
+        quantities[line.product_id] = quantities.get(line.product_id, 0) + line.qty
+    return quantities
+
+
+def create_order_lines(order: Order) -> List[OrderLine]:
+    """Write the lines of a newly created ``order`` in one insert."""
+    return OrderLine.objects.bulk_create(build_order_lines(order))
+
+
+def product_sales_map(product_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Decimal]]:
+    """``product_id -> {'units_sold', 'revenue'}`` over sold orders, in one query."""
+    lines = OrderLine.objects.filter(order__status__in=SALES_STATUSES)
+    if product_ids is not None:
+        lines = lines.filter(product_id__in=list(product_ids))
+    rows = lines.values('product_id').annotate(units_sold=Sum('qty'), revenue=Sum('line_total')).order_by()
+    return {
+        row['product_id']: {'units_sold': row['units_sold'], 'revenue': row['revenue']}
+        for row in rows
+    }
+
+
+def top_selling(limit: int) -> List[Dict]:
+    """The ``limit`` best-selling product ids by units, with revenue."""
+    return list(
+        OrderLine.objects.filter(order__status__in=SALES_STATUSES)
+        .values('product_id')
+        .annotate(units_sold=Sum('qty'), revenue=Sum('line_total'))
+        .order_by('-units_sold', 'product_id')[:limit]
+    )
+
+
+def with_line_counts(queryset):
+    """
+    Annotate orders with ``line_count`` and ``unit_count`` from their lines.
+
+    Each is a correlated subquery on the ``(order, product_id)`` index, so
+    list views can skip loading the ``items`` JSON altogether.
+    """
+    per_order = OrderLine.objects.filter(order=OuterRef('pk')).values('order')
+    return queryset.annotate(
+        line_count=Coalesce(
+            Subquery(per_order.annotate(n=Count('id')).values('n')[:1], output_field=IntegerField()),
+            Value(0),
+        ),
+        unit_count=Coalesce(
+            Subquery(per_order.annotate(n=Sum('qty')).values('n')[:1], output_field=IntegerField()),
+            Value(0),
+        ),
+    )
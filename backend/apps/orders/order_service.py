@@ -5,6 +5,9 @@ from decimal import Decimal
 from django.db import transaction
 
 from apps.orders.models import Order
+from apps.orders.order_lines import create_order_lines, item_quantities
+from apps.orders.pricing import price_items
+from apps.products.inventory import reserve_stock
 from apps.core.audit import AuditLogger, extract_client_ip
 from apps.core.email_service import EmailService, AdminNotificationEmail
 from apps.core.tasks import BackgroundTaskMixin
@@ -36,8 +39,9 @@ class OrderService(BackgroundTaskMixin):
             email: Customer email
             phone: Customer phone
             address: Shipping address
-            items: List of order items (with product_id, name, price, qty)
-            total_amount: Total order amount
+            items: List of order items (with product_id, name, price, qty);
+                names and prices are re-read from the catalogue
+            total_amount: Total order amount; must match the priced items
             city: City
             postal_code: Postal code
             payment_method: Payment method used
@@ -45,8 +49,17 @@ class OrderService(BackgroundTaskMixin):
             
         Returns:
             Created Order instance
+
+        Raises:
+            PricingError: an item is unknown or its price has changed
+            ValueError: total_amount does not match the priced items
+            InsufficientStock: an item is out of stock; nothing is written
         """
         try:
+            items, items_total = price_items(items)
+            if Decimal(total_amount).quantize(Decimal("0.01")) != items_total:
+                raise ValueError(f"Order total {total_amount} does not match the items ({items_total})")
+            reserve_stock(item_quantities(items))
             order = Order.objects.create(
                 name=name,
                 email=email,
@@ -59,7 +72,9 @@ class OrderService(BackgroundTaskMixin):
                 status="pending",
                 paid=False,
                 payment_method=payment_method or "",
+                stock_reserved=True,
             )
+            create_order_lines(order)
 
             logger.info(f"Order created: {order.id} from {email} (${total_amount})")
 
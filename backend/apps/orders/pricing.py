@@ -0,0 +1,59 @@
+"""Server-side pricing of submitted order items.
+
+The client sends ``product_id``, ``name``, ``price`` and ``qty`` per line, but
+only ``product_id`` and ``qty`` are trusted. ``price_items`` loads every
+product of the order in one query and rebuilds the ``Order.items`` snapshot
+from the current ``Product`` rows, so line and order totals are computed in
+``Decimal`` from database prices whatever the number of lines.
+"""
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from django.utils.html import escape
+
+from apps.products.models import Product
+
+CENT = Decimal('0.01')
+
+
+class PricingError(Exception):
+    """Raised when submitted items do not match the current catalogue."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+def price_items(items: List[Dict]) -> Tuple[List[Dict], Decimal]:
+    """
+    The ``Order.items`` snapshot for ``items`` at current prices, and its total.
+
+    ``items`` must already be structurally valid (integer ``product_id`` and
+    ``qty``). Raises ``PricingError`` for unknown products and for
+    lines whose submitted price differs from the current one.
+    """
+    product_ids = {int(item['product_id']) for item in items}
+    products = Product.objects.filter(pk__in=product_ids).only('id', 'name', 'price').in_bulk()
+
+    snapshot, errors = [], []
+    total = Decimal('0.00')
+    for idx, item in enumerate(items):
+        product = products.get(int(item['product_id']))
+        if product is None:
+            errors.append(f"Item {idx}: product is no longer available.")
+            continue
+        price = product.price.quantize(CENT)
+        if Decimal(str(item['price'])).quantize(CENT) != price:
+            errors.append(f"Item {idx}: price of {product.name} is now {price}.")
+            continue
+        qty = int(item['qty'])
+        snapshot.append({
+            'product_id': product.pk,
+            'name': escape(product.name[:200]),
+            'price': str(price),
+            'qty': qty,
+        })
+        total += price * qty
+    if errors:
+        raise PricingError(errors)
+    return snapshot, total
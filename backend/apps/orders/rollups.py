@@ -0,0 +1,139 @@
+"""Daily sales rollups for the admin dashboard.
+
+``DailySalesRollup`` holds, per local date and ``(status, paid)`` bucket, the
+number of orders, their revenue (``total_amount``) and units. Dashboard totals
+then sum a few dozen rollup rows instead of scanning ``Order``.
+
+Rows are maintained incrementally by the signal handlers in
+``apps.orders.signals``: creating an order adds it to its bucket, and a save
+that changes its status, paid flag, amount or items moves its contribution
+from the old bucket to the new one. Each delta is an ``UPDATE ... SET
+order_count = order_count + n`` so concurrent writes never lose counts.
+
+``queryset.update()`` and raw SQL bypass the signals; run
+``rebuild_sales_rollups`` after bulk changes.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailySalesRollup, Order, OrderLine
+from .order_lines import build_order_lines
+
+RollupKey = Tuple[date, str, bool]
+# (orders, revenue, units)
+RollupDelta = Tuple[int, Decimal, int]
+
+# Fields whose change moves an order between buckets or changes its totals
+ROLLUP_FIELDS = ('created_at', 'status', 'paid', 'total_amount', 'items')
+
+
+def order_contribution(order: Order) -> Tuple[RollupKey, Decimal, int]:
+    """The bucket ``order`` counts towards, with its revenue and units."""
+    key = (timezone.localdate(order.created_at), order.status, bool(order.paid))
+    units = sum(line.qty for line in build_order_lines(order))
+    return key, Decimal(order.total_amount or 0), units
+
+
+def apply_rollup_deltas(deltas: Dict[RollupKey, RollupDelta]) -> None:
+    """Add ``deltas`` to their rollup rows, creating missing rows first."""
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+    with transaction.atomic():
+        DailySalesRollup.objects.bulk_create(
+            [DailySalesRollup(date=day, status=status, paid=paid) for day, status, paid in deltas],
+            ignore_conflicts=True,
+        )
+        for (day, status, paid), (orders, revenue, units) in deltas.items():
+            DailySalesRollup.objects.filter(date=day, status=status, paid=paid).update(
+                order_count=F('order_count') + orders,
+                revenue=F('revenue') + revenue,
+                units=F('units') + units,
+            )
+
+
+def record_order_change(previous: Optional[Order], current: Optional[Order]) -> None:
+    """Move an order's contribution from its ``previous`` to its ``current`` state."""
+    deltas: Dict[RollupKey, list] = defaultdict(lambda: [0, Decimal('0'), 0])
+    for order, sign in ((previous, -1), (current, 1)):
+        if order is None:
+            continue
+        key, revenue, units = order_contribution(order)
+        delta = deltas[key]
+        delta[0] += sign
+        delta[1] += sign * revenue
+        delta[2] += sign * units
+    apply_rollup_deltas({key: tuple(delta) for key, delta in deltas.items()})
+
+
+def rebuild_rollups(since: Optional[date] = None) -> int:
+    """
+    Recompute rollups from the orders (all dates, or from ``since`` on).
+
+    Units come from ``OrderLine``; run ``backfill_order_lines`` first on
+    databases with orders older than that table. Returns the rows written.
+    """
+    orders = Order.objects.all()
+    lines = OrderLine.objects.all()
+    if since is not None:
+        orders = orders.filter(created_at__date__gte=since)
+        lines = lines.filter(order__created_at__date__gte=since)
+
+    rows: Dict[RollupKey, DailySalesRollup] = {}
+    totals = (
+        orders.annotate(day=TruncDate('created_at'))
+        .values('day', 'status', 'paid')
+        .annotate(order_count=Count('id'), revenue=Sum('total_amount'))
+        .order_by()
+    )
+    for row in totals:
+        key = (row['day'], row['status'], row['paid'])
+        rows[key] = DailySalesRollup(
+            date=row['day'], status=row['status'], paid=row['paid'],
+            order_count=row['order_count'], revenue=row['revenue'] or Decimal('0'),
+        )
+    units = (
+        lines.annotate(day=TruncDate('order__created_at'))
+        .values('day', 'order__status', 'order__paid')
+        .annotate(units=Sum('qty'))
+        .order_by()
+    )
+    for row in units:
+        rollup = rows.get((row['day'], row['order__status'], row['order__paid']))
+        if rollup is not None:
+            rollup.units = row['units']
+
+    with transaction.atomic():
+        stale = DailySalesRollup.objects.all()
+        if since is not None:
+            stale = stale.filter(date__gte=since)
+        stale.delete()
+        DailySalesRollup.objects.bulk_create(rows.values())
+    return len(rows)
+
+
+def status_totals(today: date, month_start: date) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-status ``orders``, ``revenue_total``, ``revenue_today`` and
+    ``revenue_month``.
+
+    One aggregate over the rollup table, grouped by status.
+    """
+    rows = (
+        DailySalesRollup.objects.values('status')
+        .annotate(
+            orders=Sum('order_count'),
+            revenue_total=Sum('revenue'),
+            revenue_today=Sum('revenue', filter=Q(date=today)),
+            revenue_month=Sum('revenue', filter=Q(date__gte=month_start)),
+        )
+        .order_by()
+    )
+    return {row['status']: row for row in rows}
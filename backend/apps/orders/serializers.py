@@ -1,8 +1,12 @@
 from rest_framework import serializers
+from django.db import transaction
 from django.utils.html import escape
 from decimal import Decimal, InvalidOperation
 import re
-from .models import Order
+from .models import Order, OrderLine
+from apps.products.inventory import release_stock, reserve_stock
+from .order_lines import create_order_lines, item_quantities
+from .pricing import CENT, PricingError, price_items
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -91,12 +95,74 @@ class OrderSerializer(serializers.ModelSerializer):
             except (InvalidOperation, ValueError, TypeError):
                 raise serializers.ValidationError(f"Item {idx}: price must be a valid number.")
             
-            # Sanitize item name
-            if 'name' in item:
-                item['name'] = escape(str(item['name'])[:200])
-        
+            try:
+                if int(item['product_id']) <= 0:
+                    raise ValueError
+            except (ValueError, TypeError):
+                raise serializers.ValidationError(f"Item {idx}: invalid product.")
+
+            item['name'] = escape(str(item['name'])[:200])
+
+        if self.instance is not None:
+            # Admin edits keep the order's historical snapshot prices
+            self._items_total = sum(
+                (Decimal(str(item['price'])).quantize(CENT) * int(item['qty']) for item in value),
+                Decimal('0.00'),
+            )
+            return value
+
+        # New orders take names and prices from the catalogue, not the client
+        try:
+            value, self._items_total = price_items(value)
+        except PricingError as exc:
+            raise serializers.ValidationError(exc.errors)
         return value
+
+    def validate(self, attrs):
+        """Reject totals that do not match the server-side priced items."""
+        items_total = getattr(self, '_items_total', None)
+        if items_total is not None and 'total_amount' in attrs:
+            if Decimal(attrs['total_amount']).quantize(Decimal('0.01')) != items_total:
+                raise serializers.ValidationError({
+                    'total_amount': f"Order total does not match the items; expected {items_total}."
+                })
+        return attrs
     
+    def create(self, validated_data):
+        """Create the order, its lines and its stock reservation atomically.
+
+        Raises ``InsufficientStock`` (nothing is written) when any line
+        cannot be covered.
+        """
+        with transaction.atomic():
+            reserve_stock(item_quantities(validated_data['items']))
+            order = super().create({**validated_data, 'stock_reserved': True})
+            create_order_lines(order)
+        return order
+
+    def update(self, instance, validated_data):
+        """Update the order; item edits move its stock reservation, lines and total with it.
+
+        Raises ``InsufficientStock`` (nothing is written) when added units
+        cannot be covered.
+        """
+        if 'items' not in validated_data:
+            return super().update(instance, validated_data)
+
+        validated_data['total_amount'] = self._items_total
+        with transaction.atomic():
+            # Diff against the stored items, not the possibly stale instance
+            current = Order.objects.select_for_update().only('items', 'stock_reserved').get(pk=instance.pk)
+            if current.stock_reserved:
+                old = item_quantities(current.items)
+                new = item_quantities(validated_data['items'])
+                reserve_stock({pid: qty - old.get(pid, 0) for pid, qty in new.items() if qty > old.get(pid, 0)})
+                release_stock({pid: qty - new.get(pid, 0) for pid, qty in old.items() if qty > new.get(pid, 0)})
+            order = super().update(instance, validated_data)
+            OrderLine.objects.filter(order=order).delete()
+            create_order_lines(order)
+        return order
+
     def validate_phone(self, value):
         """Validate and sanitize phone number."""
         if not value or len(value) < 8:
@@ -119,5 +185,7 @@ class OrderListSerializer(serializers.ModelSerializer):
         ]
     
     def get_item_count(self, obj):
-        """Calculate total items in order."""
+        """Number of lines in the order (annotated by ``with_line_counts``)."""
+        if hasattr(obj, 'line_count'):
+            return obj.line_count
         return len(obj.items) if obj.items else 0
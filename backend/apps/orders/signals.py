@@ -0,0 +1,83 @@
+"""Order signal registration.
+
+``register_order_rollup_signals`` is called from OrdersConfig.ready and keeps
+``DailySalesRollup`` in step with order writes (see ``apps.orders.rollups``).
+``register_order_stock_signals`` returns reserved stock when an order is
+cancelled, whichever endpoint changed its status.
+"""
+import logging
+
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from apps.products.inventory import release_stock
+from .models import Order
+from .order_lines import item_quantities
+from .rollups import ROLLUP_FIELDS, record_order_change
+
+logger = logging.getLogger(__name__)
+
+
+def _remember_previous(sender, instance, update_fields=None, **kwargs):
+    instance._rollup_previous = None
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(ROLLUP_FIELDS):
+        instance._rollup_skip = True
+        return
+    instance._rollup_previous = Order.objects.filter(pk=instance.pk).only(*ROLLUP_FIELDS).first()
+
+
+def _apply_save(sender, instance, created, **kwargs):
+    if getattr(instance, '_rollup_skip', False):
+        instance._rollup_skip = False
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    try:
+        record_order_change(None if created else previous, instance)
+    except Exception:
+        # Never let rollup bookkeeping break the order write; rebuild_sales_rollups repairs it
+        logger.exception("Failed to update sales rollups for Order(pk=%s)", instance.pk)
+    finally:
+        instance._rollup_previous = None
+
+
+def _apply_delete(sender, instance, **kwargs):
+    try:
+        record_order_change(instance, None)
+    except Exception:
+        logger.exception("Failed to update sales rollups for deleted Order(pk=%s)", instance.pk)
+
+
+def register_order_rollup_signals() -> None:
+    """Maintain daily sales rollups on every order create, update and delete."""
+    pre_save.connect(_remember_previous, sender=Order, weak=False, dispatch_uid="orders.order.pre_save.rollups")
+    post_save.connect(_apply_save, sender=Order, weak=False, dispatch_uid="orders.order.post_save.rollups")
+    post_delete.connect(_apply_delete, sender=Order, weak=False, dispatch_uid="orders.order.post_delete.rollups")
+
+
+def _remember_cancellation(sender, instance, **kwargs):
+    instance._stock_cancelling = (
+        instance.status == 'cancelled'
+        and not instance._state.adding
+        and Order.objects.filter(pk=instance.pk).exclude(status='cancelled').exists()
+    )
+
+
+def _release_cancelled_stock(sender, instance, **kwargs):
+    cancelling = getattr(instance, '_stock_cancelling', False)
+    instance._stock_cancelling = False
+    if instance.status != 'cancelled' or not (cancelling or instance.stock_reserved):
+        return
+    # Only the save that flips the flag releases, so racing cancellations
+    # cannot return the stock twice. A stale copy that writes the flag back
+    # onto an already cancelled order just has it cleared again.
+    released = Order.objects.filter(pk=instance.pk, stock_reserved=True).update(stock_reserved=False)
+    if released and cancelling:
+        release_stock(item_quantities(instance.items))
+    instance.stock_reserved = False
+
+
+def register_order_stock_signals() -> None:
+    """Release an order's stock reservation when it becomes cancelled."""
+    pre_save.connect(_remember_cancellation, sender=Order, weak=False, dispatch_uid="orders.order.pre_save.stock")
+    post_save.connect(_release_cancelled_stock, sender=Order, weak=False, dispatch_uid="orders.order.post_save.stock")
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.orders.models import Order
+from apps.users.models import User
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin = User.objects.create_superuser(email='admin@example.com', password='StrongPass123!', name='Admin')
+        self.client.force_authenticate(admin)
+        self.delivered = Order.objects.create(
+            name='=HYPERLINK("x")', email='jane@example.com', phone='0712345678', address='Nairobi',
+            items=[
+                {'product_id': 1, 'name': 'Sofa', 'price': '100.00', 'qty': 2},
+                {'product_id': 2, 'name': 'Bed', 'price': '250.00', 'qty': 1},
+            ],
+            total_amount=Decimal('450.00'), status='delivered',
+        )
+        Order.objects.create(
+            name='John', email='john@example.com', phone='0712345678', address='Mombasa',
+            items=[{'product_id': 3, 'name': 'Lamp', 'price': '20.00', 'qty': 1}],
+            total_amount=Decimal('20.00'), status='pending',
+        )
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_export_streams_one_row_per_line(self):
+        response = self.client.get('/api/admin/dashboard/orders/export/?format=csv&status=delivered')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual([(row['product_name'], row['qty'], row['line_total']) for row in rows], [
+            ('Sofa', '2', '200.00'), ('Bed', '1', '250.00'),
+        ])
+        # Formula-looking values are neutralized for spreadsheet apps
+        self.assertEqual(rows[0]['customer_name'], '\'=HYPERLINK("x")')
+
+    def test_jsonl_export_and_bad_parameters(self):
+        response = self.client.get('/api/admin/dashboard/orders/export/?format=jsonl')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row['product_id'] for row in rows], [1, 2, 3])
+        self.assertEqual(rows[2]['status'], 'pending')
+
+        # DRF content negotiation rejects unknown formats
+        self.assertEqual(self.client.get('/api/admin/dashboard/orders/export/?format=xlsx').status_code, 404)
+        self.assertEqual(self.client.get('/api/admin/dashboard/orders/export/?format=json').status_code, 400)
+        self.assertEqual(self.client.get('/api/admin/dashboard/orders/export/?format=csv&from=May').status_code, 400)
+
+    def test_management_command_matches_endpoint(self):
+        out = io.StringIO()
+        call_command('export_orders', format='jsonl', status=['pending'], stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row['product_name'] for row in rows], ['Lamp'])
@@ -0,0 +1,72 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.orders.models import Order, OrderLine
+from apps.orders.order_lines import product_sales_map
+from apps.products.models import Product
+from apps.users.models import User
+
+
+def make_order(items, status='delivered'):
+    total = sum(Decimal(str(item['price'])) * item['qty'] for item in items)
+    return Order.objects.create(
+        name='Jane', email='jane@example.com', phone='0712345678', address='Nairobi',
+        items=items, total_amount=total, status=status,
+    )
+
+
+class OrderLineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.sofa = Product.objects.create(name='Sofa', slug='sofa', price=Decimal('100.00'), stock=5)
+        self.bed = Product.objects.create(name='Bed', slug='bed', price=Decimal('250.00'), stock=5)
+
+    def test_order_create_writes_lines(self):
+        response = self.client.post('/api/orders/', {
+            'name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '0712345678', 'address': 'Nairobi',
+            'total_amount': '450.00',
+            'items': [
+                {'product_id': self.sofa.id, 'name': 'Sofa', 'price': '100.00', 'qty': 2},
+                {'product_id': self.bed.id, 'name': 'Bed', 'price': '250.00', 'qty': 1},
+            ],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        lines = OrderLine.objects.filter(order_id=response.data['order']['id']).order_by('product_id')
+        self.assertEqual(
+            [(line.product_id, line.qty, line.line_total) for line in lines],
+            [(self.sofa.id, 2, Decimal('200.00')), (self.bed.id, 1, Decimal('250.00'))],
+        )
+
+    def test_backfill_and_sales_are_grouped_in_sql(self):
+        make_order([{'product_id': self.sofa.id, 'name': 'Sofa', 'price': '100.00', 'qty': 2}])
+        make_order([
+            {'product_id': self.sofa.id, 'name': 'Sofa', 'price': '90.00', 'qty': 1},
+            {'product_id': self.bed.id, 'name': 'Bed', 'price': '250.00', 'qty': 1},
+            {'product_id': 'bad', 'name': 'Broken', 'price': '1.00', 'qty': 1},
+        ])
+        make_order([{'product_id': self.bed.id, 'name': 'Bed', 'price': '250.00', 'qty': 5}], status='pending')
+
+        call_command('backfill_order_lines', chunk_size=2, stdout=StringIO())
+        call_command('backfill_order_lines', stdout=StringIO())  # idempotent
+        self.assertEqual(OrderLine.objects.count(), 4)
+
+        with self.assertNumQueries(1):
+            sales = product_sales_map()
+        self.assertEqual(sales[self.sofa.id], {'units_sold': 3, 'revenue': Decimal('290.00')})
+        self.assertEqual(sales[self.bed.id], {'units_sold': 1, 'revenue': Decimal('250.00')})
+
+        admin = User.objects.create_superuser(email='admin@example.com', password='StrongPass123!', name='Admin')
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/admin/dashboard/top-products/?limit=1')
+        self.assertEqual(response.data, [{'id': self.sofa.id, 'name': 'Sofa', 'units_sold': 3, 'revenue': 290.0}])
+
+        # Lists count the normalized lines; the malformed entry has none
+        response = self.client.get('/api/orders/')
+        self.assertEqual(sorted(order['item_count'] for order in response.data), [1, 1, 2])
@@ -0,0 +1,78 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.orders.models import DailySalesRollup, Order
+from apps.orders.order_lines import create_order_lines
+
+
+def make_order(amount, qty=1, status='pending'):
+    order = Order.objects.create(
+        name='Jane', email='jane@example.com', phone='0712345678', address='Nairobi',
+        items=[{'product_id': 1, 'name': 'Sofa', 'price': str(amount / qty), 'qty': qty}],
+        total_amount=amount, status=status,
+    )
+    create_order_lines(order)
+    return order
+
+
+def snapshot():
+    return sorted(
+        DailySalesRollup.objects.exclude(order_count=0)
+        .values_list('status', 'paid', 'order_count', 'revenue', 'units')
+    )
+
+
+class DailySalesRollupTests(TestCase):
+    def test_rollups_follow_creates_status_changes_and_deletes(self):
+        first = make_order(Decimal('100.00'), qty=2)
+        second = make_order(Decimal('50.00'))
+        self.assertEqual(snapshot(), [('pending', False, 2, Decimal('150.00'), 3)])
+
+        first.status = 'delivered'
+        first.save()
+        first.paid = True
+        first.save(update_fields=['paid', 'updated_at'])
+        second.notes = 'Call first'
+        second.save(update_fields=['notes'])
+        self.assertEqual(snapshot(), [
+            ('delivered', True, 1, Decimal('100.00'), 2),
+            ('pending', False, 1, Decimal('50.00'), 1),
+        ])
+
+        second.delete()
+        self.assertEqual(snapshot(), [('delivered', True, 1, Decimal('100.00'), 2)])
+
+    def test_rebuild_matches_incremental_rollups(self):
+        make_order(Decimal('100.00'), qty=2, status='delivered')
+        make_order(Decimal('40.00'), status='cancelled')
+        expected = snapshot()
+
+        DailySalesRollup.objects.all().delete()
+        Order.objects.update(notes='bulk edit')  # bypasses signals
+        call_command('rebuild_sales_rollups', stdout=StringIO())
+        self.assertEqual(snapshot(), expected)
+
+    def test_summary_reads_rollups(self):
+        make_order(Decimal('100.00'), status='delivered')
+        make_order(Decimal('300.00'), status='delivered')
+        make_order(Decimal('20.00'))
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com', password='StrongPass123!', name='Admin'
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        response = client.get('/api/admin/dashboard/summary/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_orders'], 3)
+        self.assertEqual(response.data['delivered_orders'], 2)
+        self.assertEqual(response.data['pending_orders'], 1)
+        self.assertEqual(response.data['revenue_today'], '400.00')
+        self.assertEqual(response.data['revenue_all_time'], '400.00')
+        self.assertEqual(response.data['average_order_value'], '140.00')
@@ -0,0 +1,206 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.core.response_cache import get_tag_versions
+from apps.orders.models import Order, OrderLine
+from apps.products.inventory import InsufficientStock, flush_stock_cache_tag, release_stock, reserve_stock
+from apps.products.models import Product
+from apps.products.signals import product_cache_tag
+from apps.users.models import User
+
+
+class StockReservationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.sofa = Product.objects.create(name='Sofa', slug='sofa', price=Decimal('100.00'), stock=3)
+        self.bed = Product.objects.create(name='Bed', slug='bed', price=Decimal('250.00'), stock=1)
+
+    def stock(self):
+        return dict(Product.objects.filter(pk__in=[self.sofa.pk, self.bed.pk]).values_list('pk', 'stock'))
+
+    def order_payload(self, sofas, beds):
+        return {
+            'name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '0712345678', 'address': 'Nairobi',
+            'total_amount': str(100 * sofas + 250 * beds),
+            'items': [
+                {'product_id': self.sofa.id, 'name': 'Sofa', 'price': '100.00', 'qty': sofas},
+                {'product_id': self.bed.id, 'name': 'Bed', 'price': '250.00', 'qty': beds},
+            ],
+        }
+
+    def test_reservation_is_all_or_nothing(self):
+        # One conditional UPDATE inside a savepoint
+        with self.assertNumQueries(3):
+            reserve_stock({self.sofa.pk: 2, self.bed.pk: 1})
+        self.assertEqual(self.stock(), {self.sofa.pk: 1, self.bed.pk: 0})
+
+        with self.assertRaises(InsufficientStock) as raised:
+            reserve_stock({self.sofa.pk: 1, self.bed.pk: 1})
+        self.assertEqual(raised.exception.shortfalls, {self.bed.pk: {'requested': 1, 'available': 0}})
+        self.assertEqual(self.stock(), {self.sofa.pk: 1, self.bed.pk: 0})
+
+        release_stock({self.sofa.pk: 2, self.bed.pk: 1})
+        self.assertEqual(self.stock(), {self.sofa.pk: 3, self.bed.pk: 1})
+
+    def test_order_create_reserves_stock_or_conflicts(self):
+        response = self.client.post('/api/orders/', self.order_payload(2, 1), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Order.objects.get(pk=response.data['order']['id']).stock_reserved)
+        self.assertEqual(self.stock(), {self.sofa.pk: 1, self.bed.pk: 0})
+
+        response = self.client.post('/api/orders/', self.order_payload(1, 1), format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(
+            response.data['items'], [{'product_id': self.bed.pk, 'requested': 1, 'available': 0}],
+        )
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(self.stock(), {self.sofa.pk: 1, self.bed.pk: 0})
+
+    def test_stock_moves_bump_only_product_tags(self):
+        tags = ['products', 'products-stock', product_cache_tag(self.sofa.pk), product_cache_tag(self.bed.pk)]
+        batch_params = {'ids': f'{self.sofa.pk},{self.bed.pk}'}
+        self.client.get('/api/products/batch/', batch_params)
+        before = get_tag_versions(tags)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/orders/', self.order_payload(2, 1), format='json')
+        self.assertEqual(response.status_code, 201)
+        after = get_tag_versions(tags)
+
+        self.assertEqual(after['products'], before['products'])
+        self.assertEqual(after['products-stock'], before['products-stock'])
+        self.assertNotEqual(after[product_cache_tag(self.sofa.pk)], before[product_cache_tag(self.sofa.pk)])
+        self.assertNotEqual(after[product_cache_tag(self.bed.pk)], before[product_cache_tag(self.bed.pk)])
+
+        batch = self.client.get('/api/products/batch/', batch_params)
+        self.assertEqual([item['stock'] for item in batch.data['results']], [1, 0])
+
+    def test_stock_flush_rekeys_listings_once_per_batch(self):
+        listing = self.client.get('/api/products/')
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_stock({self.sofa.pk: 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_stock({self.bed.pk: 1})
+        self.assertEqual(self.client.get('/api/products/')['ETag'], listing['ETag'])
+
+        self.assertTrue(flush_stock_cache_tag())
+        self.assertFalse(flush_stock_cache_tag())
+        refreshed = self.client.get('/api/products/')
+        self.assertNotEqual(refreshed['ETag'], listing['ETag'])
+        self.assertEqual({item['slug']: item['stock'] for item in refreshed.data}, {'sofa': 2, 'bed': 0})
+
+    def test_cancel_releases_stock_once(self):
+        response = self.client.post('/api/orders/', self.order_payload(2, 1), format='json')
+        order = Order.objects.get(pk=response.data['order']['id'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = 'cancelled'
+            order.save()
+        self.assertFalse(order.stock_reserved)
+        self.assertEqual(self.stock(), {self.sofa.pk: 3, self.bed.pk: 1})
+
+    def test_stale_cancellation_releases_once(self):
+        response = self.client.post('/api/orders/', self.order_payload(2, 1), format='json')
+        first = Order.objects.get(pk=response.data['order']['id'])
+        stale = Order.objects.get(pk=first.pk)
+
+        for order in (first, stale):
+            order.status = 'cancelled'
+            order.save()
+        self.assertEqual(self.stock(), {self.sofa.pk: 3, self.bed.pk: 1})
+        self.assertFalse(Order.objects.get(pk=first.pk).stock_reserved)
+
+    def test_admin_item_edit_moves_reservation_and_keeps_snapshot_prices(self):
+        response = self.client.post('/api/orders/', self.order_payload(1, 1), format='json')
+        order_id = response.data['order']['id']
+        Product.objects.filter(pk=self.sofa.pk).update(price=Decimal('120.00'))
+        admin = User.objects.create_user(name='Admin', email='admin@example.com', password='StrongPass123!',
+                                         is_staff=True)
+        self.client.force_authenticate(admin)
+
+        items = [{'product_id': self.sofa.id, 'name': '<b>Sofa</b>', 'price': '100.00', 'qty': 3}]
+        response = self.client.patch(f'/api/orders/{order_id}/', {'items': items}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stock(), {self.sofa.pk: 0, self.bed.pk: 1})
+        order = Order.objects.get(pk=order_id)
+        self.assertEqual(order.items[0]['price'], '100.00')
+        self.assertEqual(order.items[0]['name'], '&lt;b&gt;Sofa&lt;/b&gt;')
+        self.assertEqual(order.total_amount, Decimal('300.00'))
+        self.assertEqual(
+            list(OrderLine.objects.filter(order_id=order_id).values_list('product_id', 'qty')), [(self.sofa.pk, 3)],
+        )
+
+        items[0]['qty'] = 4
+        response = self.client.patch(f'/api/orders/{order_id}/', {'items': items}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.stock(), {self.sofa.pk: 0, self.bed.pk: 1})
+        self.assertEqual(Order.objects.get(pk=order_id).items[0]['qty'], 3)
+
+        items[0]['qty'] = 2
+        response = self.client.patch(
+            f'/api/orders/{order_id}/', {'items': items, 'total_amount': '300.00'}, format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('total_amount', response.data)
+        self.assertEqual(Order.objects.get(pk=order_id).total_amount, Decimal('300.00'))
+
+
+class OrderPricingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.products = [
+            Product.objects.create(name=f'Chair {index}', slug=f'chair-{index}', price=Decimal('10.00'), stock=10)
+            for index in range(4)
+        ]
+
+    def payload(self, products, price='10.00', total=None):
+        items = [
+            {'product_id': product.id, 'name': 'Anything', 'price': price, 'qty': 2}
+            for product in products
+        ]
+        return {
+            'name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '0712345678', 'address': 'Nairobi',
+            'total_amount': total or str(20 * len(products)),
+            'items': items,
+        }
+
+    def test_snapshot_uses_catalogue_names_and_prices(self):
+        response = self.client.post('/api/orders/', self.payload(self.products[:1], price='10'), format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            Order.objects.get().items,
+            [{'product_id': self.products[0].id, 'name': 'Chair 0', 'price': '10.00', 'qty': 2}],
+        )
+
+    def test_price_and_total_mismatches_are_rejected(self):
+        response = self.client.post('/api/orders/', self.payload(self.products[:2], price='1.00', total='4.00'),
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Chair 0 is now 10.00', str(response.data['items']))
+
+        response = self.client.post('/api/orders/', self.payload(self.products[:2], total='1.00'), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('expected 40.00', str(response.data['total_amount']))
+
+        response = self.client.post('/api/orders/', {**self.payload(self.products[:1]), 'items': [
+            {'product_id': 999999, 'name': 'Ghost', 'price': '10.00', 'qty': 1},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_create_query_count_does_not_grow_with_lines(self):
+        counts = []
+        for products in (self.products[:1], self.products):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post('/api/orders/', self.payload(products), format='json')
+            self.assertEqual(response.status_code, 201)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
@@ -6,7 +6,10 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from django_ratelimit.decorators import ratelimit
 from django.utils.decorators import method_decorator
+from apps.core.pagination import KeysetPagination
+from apps.products.inventory import InsufficientStock
 from .models import Order
+from .order_lines import with_line_counts
 from .serializers import OrderSerializer, OrderListSerializer
 
 
@@ -23,6 +26,8 @@ class OrderViewSet(viewsets.ModelViewSet):
     """
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    # Unpaginated by default; ?cursor= opts into keyset pages
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['status', 'paid']
     ordering_fields = ['created_at', 'total_amount']
@@ -34,6 +39,13 @@ class OrderViewSet(viewsets.ModelViewSet):
             return []
         return [IsAdminUser()]
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # The list serializer only needs the line count, not the JSON items
+            queryset = with_line_counts(queryset.defer('items'))
+        return queryset
+
     def get_serializer_class(self):
         """Use lightweight serializer for lists."""
         if self.action == 'list':
@@ -44,7 +56,10 @@ class OrderViewSet(viewsets.ModelViewSet):
         """Create a new order."""
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
+        try:
+            self.perform_create(serializer)
+        except InsufficientStock as exc:
+            return self.insufficient_stock_response(exc)
         
         return Response(
             {
@@ -54,6 +69,26 @@ class OrderViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED
         )
     
+    def update(self, request, *args, **kwargs):
+        """Update an order; item edits that exceed stock return 409."""
+        try:
+            return super().update(request, *args, **kwargs)
+        except InsufficientStock as exc:
+            return self.insufficient_stock_response(exc)
+
+    @staticmethod
+    def insufficient_stock_response(exc):
+        return Response(
+            {
+                'error': 'Some items are no longer available in the requested quantity.',
+                'items': [
+                    {'product_id': product_id, **shortfall}
+                    for product_id, shortfall in sorted(exc.shortfalls.items())
+                ],
+            },
+            status=status.HTTP_409_CONFLICT
+        )
+
     @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
     def update_status(self, request, pk=None):
         """Update order status."""
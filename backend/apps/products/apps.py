@@ -8,5 +8,7 @@ class ProductsConfig(AppConfig):
 
     def ready(self):
         # Cleanup signals are registered centrally by apps.core.apps.CoreConfig.
-        # Keep this hook available for future product-specific startup logic.
-        return
+        from .signals import register_product_cache_signals, register_product_suggest_signals
+
+        register_product_cache_signals()
+        register_product_suggest_signals()
@@ -0,0 +1,271 @@
+"""Catalog filter state and facet counts.
+
+The storefront filters on category, material, color, tag (each accepting
+several comma-separated or repeated values), a price range and the
+featured/on_sale flags. ``ProductFilter`` applies them to listings and
+``facet_counts`` returns, for the same filter state, how many products each
+facet value would match.
+
+All counts come from one aggregate query: every facet value is a
+``COUNT(*) FILTER (WHERE ...)`` over the search-filtered catalog. A facet
+ignores its own dimension's selection (selecting ``sofa`` still shows how
+many beds there are) but honours every other filter.
+
+Material, color and tag values are open-ended, so the candidate values are the
+``FACET_VALUE_LIMIT`` most common ones in the catalog. That vocabulary is
+cached against the ``products`` cache tag and only recomputed after writes.
+"""
+import json
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+
+import django_filters
+from django.db import connection
+from django.db.models import Count, Q
+
+from apps.core.response_cache import get_or_set_payload, get_tag_versions
+from .models import Product
+from .signals import PRODUCTS_CACHE_TAG
+
+FACET_VALUE_LIMIT = 50
+MULTI_VALUE_PARAMS = ('category', 'material', 'color', 'tag')
+FLAG_PARAMS = ('featured', 'on_sale')
+TRUE_VALUES = ('1', 'true', 'yes')
+FALSE_VALUES = ('0', 'false', 'no')
+
+# (key, lower bound inclusive, upper bound exclusive), in KSh
+PRICE_BUCKETS = [
+    ('under-10000', None, Decimal('10000')),
+    ('10000-25000', Decimal('10000'), Decimal('25000')),
+    ('25000-50000', Decimal('25000'), Decimal('50000')),
+    ('50000-100000', Decimal('50000'), Decimal('100000')),
+    ('100000-plus', Decimal('100000'), None),
+]
+
+
+def _split_values(params, name: str) -> List[str]:
+    values = set()
+    for raw in params.getlist(name):
+        values.update(part.strip() for part in raw.split(',') if part.strip())
+    return sorted(values)
+
+
+def _parse_decimal(value: Optional[str]) -> Optional[Decimal]:
+    if value in (None, ''):
+        return None
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+
+
+def parse_filter_state(params) -> Dict[str, Any]:
+    """Normalize query parameters into a filter state dict.
+
+    Unknown parameters and unparsable values are dropped; list values are
+    de-duplicated and sorted so equivalent requests share one state.
+    """
+    state: Dict[str, Any] = {}
+    for name in MULTI_VALUE_PARAMS:
+        values = _split_values(params, name)
+        if values:
+            state[name] = values
+    for name in ('min_price', 'max_price'):
+        value = _parse_decimal(params.get(name))
+        if value is not None:
+            state[name] = value
+    for name in FLAG_PARAMS:
+        value = (params.get(name) or '').lower()
+        if value in TRUE_VALUES:
+            state[name] = True
+        elif value in FALSE_VALUES:
+            state[name] = False
+    search = (params.get('search') or '').strip()
+    if search:
+        state['search'] = search
+    return state
+
+
+def normalized_query(state: Dict[str, Any]) -> str:
+    """Stable query string for a filter state, used as the cache key."""
+    pairs = []
+    for name in sorted(state):
+        value = state[name]
+        if isinstance(value, list):
+            pairs.extend((name, item) for item in value)
+        else:
+            pairs.append((name, str(value).lower() if isinstance(value, bool) else str(value)))
+    return urlencode(pairs)
+
+
+def tag_q(tag: str) -> Q:
+    """Match products whose ``tags`` list contains ``tag``."""
+    if connection.vendor == 'postgresql':
+        # jsonb @> uses the product_tags_gin index (migration 0004)
+        return Q(tags__contains=[tag])
+    # SQLite has no JSON containment lookup; match the serialized element.
+    return Q(tags__icontains=json.dumps(tag))
+
+
+def dimension_q(dimension: str, values: List[str]) -> Q:
+    """OR of the selected values of one facet dimension."""
+    if dimension == 'tag':
+        condition = Q()
+        for tag in values:
+            condition |= tag_q(tag)
+        return condition
+    return Q(**{f"{dimension}__in": values})
+
+
+def filter_q(state: Dict[str, Any], exclude: Optional[str] = None) -> Q:
+    """Combined condition for ``state``, optionally ignoring one dimension."""
+    condition = Q()
+    for dimension in MULTI_VALUE_PARAMS:
+        if dimension != exclude and state.get(dimension):
+            condition &= dimension_q(dimension, state[dimension])
+    if exclude != 'price':
+        if 'min_price' in state:
+            condition &= Q(price__gte=state['min_price'])
+        if 'max_price' in state:
+            condition &= Q(price__lte=state['max_price'])
+    for name in FLAG_PARAMS:
+        if name in state:
+            condition &= Q(**{name: state[name]})
+    return condition
+
+
+def _price_bucket_q(lower: Optional[Decimal], upper: Optional[Decimal]) -> Q:
+    condition = Q()
+    if lower is not None:
+        condition &= Q(price__gte=lower)
+    if upper is not None:
+        condition &= Q(price__lt=upper)
+    return condition
+
+
+def _count(condition: Q) -> Count:
+    # An empty Q() would render as an empty FILTER (WHERE) clause
+    return Count('id', filter=condition) if condition else Count('id')
+
+
+def _top_values(field: str) -> List[str]:
+    return list(
+        Product.objects.exclude(**{field: ''})
+        .values_list(field, flat=True)
+        .annotate(n=Count('id'))
+        .order_by('-n', field)[:FACET_VALUE_LIMIT]
+    )
+
+
+def _top_tags() -> List[str]:
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT tag, COUNT(*) AS n
+                FROM products_product, jsonb_array_elements_text(tags) AS tag
+                WHERE jsonb_typeof(tags) = 'array'
+                GROUP BY tag
+                ORDER BY n DESC, tag
+                LIMIT %s
+                """,
+                [FACET_VALUE_LIMIT],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    counts = Counter()
+    for tags in Product.objects.exclude(tags__isnull=True).values_list('tags', flat=True).iterator():
+        if isinstance(tags, list):
+            counts.update({str(tag) for tag in tags if tag})
+    return [tag for tag, _n in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:FACET_VALUE_LIMIT]]
+
+
+def facet_vocabulary() -> Dict[str, List[str]]:
+    """Candidate values for the open-ended facets, cached until products change."""
+    version = get_tag_versions([PRODUCTS_CACHE_TAG])[PRODUCTS_CACHE_TAG]
+
+    def fetch_payload():
+        return {
+            'material': _top_values('material'),
+            'color': _top_values('color'),
+            'tag': _top_tags(),
+        }
+
+    return get_or_set_payload(f"products:facet-vocabulary:{version}", fetch_payload)
+
+
+def facet_counts(queryset, state: Dict[str, Any]) -> Dict[str, Any]:
+    """Facet counts for ``state`` over ``queryset`` in a single aggregate query.
+
+    ``queryset`` should already be narrowed by ``state['search']``.
+    """
+    vocabulary = facet_vocabulary()
+    candidates = {
+        'category': [value for value, _label in Product.CATEGORY_CHOICES],
+        'material': vocabulary['material'],
+        'color': vocabulary['color'],
+        'tag': vocabulary['tag'],
+    }
+    # Selected values always get a count, even when outside the top values
+    for dimension in ('material', 'color', 'tag'):
+        extra = [value for value in state.get(dimension, []) if value not in candidates[dimension]]
+        candidates[dimension] = candidates[dimension] + extra
+
+    aggregates = {'total': _count(filter_q(state))}
+    aliases = []
+    for dimension, values in candidates.items():
+        base = filter_q(state, exclude=dimension)
+        for value in values:
+            alias = f"f{len(aliases)}"
+            value_q = tag_q(value) if dimension == 'tag' else Q(**{dimension: value})
+            aggregates[alias] = _count(base & value_q)
+            aliases.append((dimension, value, alias))
+    price_base = filter_q(state, exclude='price')
+    for key, lower, upper in PRICE_BUCKETS:
+        alias = f"f{len(aliases)}"
+        aggregates[alias] = _count(price_base & _price_bucket_q(lower, upper))
+        aliases.append(('price', key, alias))
+
+    counts = queryset.order_by().aggregate(**aggregates)
+
+    category_labels = dict(Product.CATEGORY_CHOICES)
+    buckets = {key: (lower, upper) for key, lower, upper in PRICE_BUCKETS}
+    result: Dict[str, Any] = {'total': counts['total']}
+    for dimension in ('category', 'material', 'color', 'tag', 'price'):
+        result[dimension] = []
+    for dimension, value, alias in aliases:
+        count = counts[alias]
+        if dimension == 'price':
+            lower, upper = buckets[value]
+            result['price'].append({'key': value, 'min': lower, 'max': upper, 'count': count})
+            continue
+        if not count and value not in state.get(dimension, []):
+            continue
+        entry = {'value': value, 'count': count}
+        if dimension == 'category':
+            entry['label'] = category_labels[value]
+        result[dimension].append(entry)
+    return result
+
+
+class ProductFilter(django_filters.FilterSet):
+    """Listing filters sharing their conditions with ``facet_counts``."""
+
+    category = django_filters.CharFilter(method='filter_dimension')
+    material = django_filters.CharFilter(method='filter_dimension')
+    color = django_filters.CharFilter(method='filter_dimension')
+    tag = django_filters.CharFilter(method='filter_dimension')
+    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
+
+    class Meta:
+        model = Product
+        fields = ['featured', 'on_sale']
+
+    def filter_dimension(self, queryset, name, value):
+        values = _split_values(self.data, name)
+        if not values:
+            return queryset
+        return queryset.filter(dimension_q(name, values))
@@ -0,0 +1,103 @@
+"""Stock reservation for orders.
+
+Stock for every product of an order is taken with one conditional statement::
+
+    UPDATE products_product
+    SET stock = stock - CASE id WHEN ... END
+    WHERE id IN (...) AND stock >= CASE id WHEN ... END
+
+The database checks and decrements each row atomically, so two orders racing
+for the last unit can never both succeed, and no ``SELECT ... FOR UPDATE``
+round trips hold row locks while Python runs. If fewer rows were updated than
+requested, the savepoint is rolled back and nothing is reserved.
+
+``queryset.update()`` skips save signals, so the per-product cache tags are
+bumped here once the transaction commits. The catalog-wide tag is left alone:
+stock moves with every order, and bumping it would drop every listing, facet
+and cart summary cache. Instead the move marks PRODUCTS_STOCK_CACHE_TAG dirty,
+and ``flush_stock_cache_tag`` (a periodic task) bumps it once for every
+batch of moves, so listings that embed stock are re-keyed at most once per
+flush interval and only when stock actually changed.
+"""
+from typing import Dict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from apps.core.response_cache import bump_tags, bump_tags_on_commit
+from .models import Product
+from .signals import PRODUCTS_STOCK_CACHE_TAG, product_cache_tag
+
+STOCK_DIRTY_KEY = 'products:stock-dirty'
+
+
+class InsufficientStock(Exception):
+    """Raised when an order asks for more units than are in stock."""
+
+    def __init__(self, shortfalls: Dict[int, Dict[str, int]]):
+        self.shortfalls = shortfalls
+        super().__init__(f"Insufficient stock for products {sorted(shortfalls)}")
+
+
+class _Shortfall(Exception):
+    pass
+
+
+def _per_product(quantities: Dict[int, int]) -> Case:
+    return Case(
+        *[When(pk=product_id, then=Value(qty)) for product_id, qty in quantities.items()],
+        output_field=IntegerField(),
+    )
+
+
+def _bump_stock_tags(product_ids) -> None:
+    bump_tags_on_commit(*[product_cache_tag(product_id) for product_id in product_ids])
+    transaction.on_commit(lambda: cache.set(STOCK_DIRTY_KEY, 1, timeout=None))
+
+
+def flush_stock_cache_tag() -> bool:
+    """Bump PRODUCTS_STOCK_CACHE_TAG if stock moved since the last flush; returns whether it did."""
+    # Deleting first means a move landing mid-flush marks the tag dirty again
+    if not cache.delete(STOCK_DIRTY_KEY):
+        return False
+    bump_tags(PRODUCTS_STOCK_CACHE_TAG)
+    return True
+
+
+def reserve_stock(quantities: Dict[int, int]) -> None:
+    """
+    Take ``quantities`` (product id -> units) out of stock, all or nothing.
+
+    Raises ``InsufficientStock`` with ``{product_id: {'requested', 'available'}}``
+    for every product that could not be covered (missing products count as
+    zero stock).
+    """
+    quantities = {product_id: qty for product_id, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return
+    amount = _per_product(quantities)
+    try:
+        with transaction.atomic():
+            updated = Product.objects.filter(pk__in=list(quantities), stock__gte=amount).update(
+                stock=F('stock') - amount
+            )
+            if updated != len(quantities):
+                raise _Shortfall()
+    except _Shortfall:
+        available = dict(Product.objects.filter(pk__in=list(quantities)).values_list('pk', 'stock'))
+        raise InsufficientStock({
+            product_id: {'requested': qty, 'available': available.get(product_id, 0)}
+            for product_id, qty in quantities.items()
+            if available.get(product_id, 0) < qty
+        })
+    _bump_stock_tags(quantities)
+
+
+def release_stock(quantities: Dict[int, int]) -> None:
+    """Put ``quantities`` back into stock (e.g. when an order is cancelled)."""
+    quantities = {product_id: qty for product_id, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return
+    Product.objects.filter(pk__in=list(quantities)).update(stock=F('stock') + _per_product(quantities))
+    _bump_stock_tags(quantities)
@@ -0,0 +1,70 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.products.suggest import SuggestionIndex
+
+WORDS = [
+    "oak", "pine", "walnut", "leather", "velvet", "corner", "sofa", "sectional",
+    "bed", "king", "queen", "wardrobe", "sliding", "dining", "table", "chair",
+    "office", "desk", "outdoor", "lounge", "storage", "cabinet", "shelf", "ottoman",
+    "recliner", "bench", "mirror", "dresser", "nightstand", "bookcase",
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the in-memory product suggestion index on a synthetic catalog (no database access)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=5000, help="Synthetic catalog size.")
+        parser.add_argument("--queries", type=int, default=5000, help="Number of queries to time.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        product_count = options["products"]
+
+        rows = [
+            {
+                "id": product_id,
+                "name": " ".join(rng.sample(WORDS, 3)).title(),
+                "slug": f"product-{product_id}",
+                "sku": f"PGF-{product_id:06d}",
+                "tags": rng.sample(WORDS, 2),
+            }
+            for product_id in range(1, product_count + 1)
+        ]
+
+        index = SuggestionIndex(max_products=product_count)
+        build_started = time.perf_counter()
+        index.build_from_rows(rows)
+        build_ms = (time.perf_counter() - build_started) * 1000
+
+        queries = []
+        for _ in range(options["queries"]):
+            word = rng.choice(WORDS)
+            kind = rng.random()
+            if kind < 0.5:
+                queries.append(word[: rng.randint(1, len(word))])  # typing a prefix
+            elif kind < 0.8:
+                queries.append(f"{rng.choice(WORDS)} {word[:3]}")  # two terms
+            else:
+                pos = rng.randrange(len(word) - 1)
+                queries.append(word[:pos] + word[pos + 1] + word[pos] + word[pos + 2:])  # transposition typo
+
+        timings_us = []
+        for query in queries:
+            started = time.process_time()
+            index.search(query, limit=8)
+            timings_us.append((time.process_time() - started) * 1_000_000)
+
+        timings_us.sort()
+        p50 = timings_us[len(timings_us) // 2]
+        p99 = timings_us[int(len(timings_us) * 0.99) - 1]
+        self.stdout.write(f"Indexed {len(index)} products in {build_ms:.1f} ms")
+        self.stdout.write(
+            f"{len(queries)} queries: mean {statistics.mean(timings_us):.1f} us, "
+            f"p50 {p50:.1f} us, p99 {p99:.1f} us CPU per query"
+        )
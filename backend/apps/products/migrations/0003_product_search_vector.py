@@ -0,0 +1,62 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Weighted document: name (A) > short_description (B) > description (C).
+# SKUs use the 'simple' config so codes are not stemmed.
+CREATE_SEARCH_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION products_product_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.sku, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.short_description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS products_product_search_vector_trigger ON products_product;
+CREATE TRIGGER products_product_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, sku, short_description, description
+    ON products_product
+    FOR EACH ROW EXECUTE FUNCTION products_product_search_vector_update();
+
+CREATE INDEX IF NOT EXISTS product_search_vector_gin ON products_product USING GIN (search_vector);
+
+UPDATE products_product SET name = name;
+"""
+
+DROP_SEARCH_TRIGGER_SQL = """
+DROP INDEX IF EXISTS product_search_vector_gin;
+DROP TRIGGER IF EXISTS products_product_search_vector_trigger ON products_product;
+DROP FUNCTION IF EXISTS products_product_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_SEARCH_TRIGGER_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(DROP_SEARCH_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_alter_product_category_alter_product_featured_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
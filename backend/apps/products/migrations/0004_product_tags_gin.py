@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# jsonb_path_ops only supports containment (@>), which is exactly what tag
+# filters use (tags__contains=[tag]); it is smaller and faster than the
+# default jsonb_ops opclass.
+CREATE_TAGS_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS product_tags_gin ON products_product USING GIN (tags jsonb_path_ops);
+"""
+
+DROP_TAGS_INDEX_SQL = """
+DROP INDEX IF EXISTS product_tags_gin;
+"""
+
+
+def create_tags_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_TAGS_INDEX_SQL)
+
+
+def drop_tags_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(DROP_TAGS_INDEX_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_tags_index, drop_tags_index),
+    ]
@@ -1,9 +1,16 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
 
+class ProductManager(models.Manager):
+    def get_queryset(self):
+        # The search document is only used inside SQL; never load it into Python.
+        return super().get_queryset().defer('search_vector')
+
+
 class Product(models.Model):
     """Furniture product with images and inventory."""
     
@@ -74,6 +81,13 @@ class Product(models.Model):
     meta_title = models.CharField(max_length=70, blank=True)
     meta_description = models.CharField(max_length=160, blank=True)
     
+    # Full-text search document, maintained by a PostgreSQL trigger (see
+    # migration 0003). Its GIN index is created there as well so SQLite never
+    # sees PostgreSQL-only DDL; on SQLite the column simply stays NULL.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProductManager()
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,85 @@
+"""Product search backend.
+
+On PostgreSQL, products are matched against the trigger-maintained
+``search_vector`` column (GIN indexed) with prefix matching on every term and
+ranked by field weight (name > short_description > description). Other
+databases (SQLite in development) fall back to the previous ``icontains``
+behaviour: every term must appear in at least one searchable field.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Q
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+SEARCH_FIELDS = ('name', 'description', 'short_description', 'sku')
+SEARCH_CONFIG = 'english'
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def uses_full_text_search() -> bool:
+    """Return True when the database supports the tsvector search path."""
+    return connection.vendor == 'postgresql'
+
+
+def _prefix_tsquery(term: str) -> str:
+    """Turn free text into a raw tsquery matching every word as a prefix.
+
+    Only word characters survive, so user input can never inject tsquery
+    operators.
+    """
+    return ' & '.join(f"{word}:*" for word in _TERM_RE.findall(term))
+
+
+def _icontains_filter(queryset, term: str):
+    for word in term.split():
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f"{field}__icontains": word})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def search_products(queryset, term: str, rank: bool = True):
+    """Filter ``queryset`` to products matching ``term``.
+
+    With ``rank=True`` on PostgreSQL, results are annotated with
+    ``search_rank`` and ordered best match first.
+    """
+    term = (term or '').strip()
+    if not term:
+        return queryset
+
+    if not uses_full_text_search():
+        return _icontains_filter(queryset, term)
+
+    raw_query = _prefix_tsquery(term)
+    if not raw_query:
+        return _icontains_filter(queryset, term)
+
+    query = SearchQuery(raw_query, search_type='raw', config=SEARCH_CONFIG)
+    queryset = queryset.filter(Q(search_vector=query) | Q(sku__iexact=term))
+    if rank:
+        queryset = queryset.annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', '-created_at')
+    return queryset
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """DRF filter backend delegating ``?search=`` to ``search_products``.
+
+    Results are ranked by relevance unless the client asked for an explicit
+    ``?ordering=``. Place it after OrderingFilter so the rank ordering is not
+    replaced by the view's default ordering.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '')
+        if not term.strip():
+            return queryset
+        rank = not request.query_params.get(api_settings.ORDERING_PARAM)
+        return search_products(queryset, term, rank=rank)
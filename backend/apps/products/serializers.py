@@ -1,6 +1,5 @@
 from rest_framework import serializers
-from django.conf import settings
-from apps.core.media_utils import get_absolute_media_url
+from apps.core.media_utils import absolute_media_url
 from .models import Product
 import logging
 
@@ -33,52 +32,13 @@ class ProductSerializer(serializers.ModelSerializer):
         """Return absolute URL for main image. Always returns absolute URL for S3 CORS compliance."""
         if not obj.main_image:
             return None
-        try:
-            raw_url = str(obj.main_image.url)
-            sanitized = self._sanitize_media_url(raw_url)
-            return get_absolute_media_url(sanitized)
-        except Exception as e:
-            logger.error(f"[ProductSerializer] Error getting image URL for product {obj.id}: {str(e)}")
-            return None
+        return absolute_media_url(obj.main_image.name)
     
     def get_gallery(self, obj):
         """Return absolute URLs for gallery images"""
         if not obj.gallery or not isinstance(obj.gallery, list):
             return []
-        
-        gallery_urls = []
-        for image_path in obj.gallery:
-            if image_path:
-                try:
-                    sanitized = self._sanitize_media_url(image_path)
-                    if not sanitized:
-                        continue
-
-                    if sanitized.startswith('http://') or sanitized.startswith('https://'):
-                        absolute_url = sanitized
-                    else:
-                        # gallery items are stored as relative paths
-                        gallery_url = f"{settings.MEDIA_URL.rstrip('/')}/{sanitized.lstrip('/')}"
-                        absolute_url = get_absolute_media_url(gallery_url)
-
-                    if absolute_url:
-                        gallery_urls.append(absolute_url)
-                except Exception as e:
-                    logger.error(f"[ProductSerializer] Error processing gallery image {image_path}: {str(e)}")
-                    continue
-        
-        return gallery_urls
-
-    @staticmethod
-    def _sanitize_media_url(url_value: str):
-        """Normalize stored media paths to avoid double /media/ prefixes."""
-        if not url_value:
-            return None
-        url_str = str(url_value)
-        # Deduplicate a single extra media/ prefix
-        url_str = url_str.replace('/media/media/', '/media/', 1)
-        url_str = url_str.replace('media/media/', 'media/', 1)
-        return url_str
+        return [url for url in map(absolute_media_url, obj.gallery) if url]
     
     def validate_price(self, value):
         """Ensure price is positive."""
@@ -119,8 +79,4 @@ class ProductListSerializer(serializers.ModelSerializer):
         """Return absolute URL for main image. Always returns absolute URL for S3 CORS compliance."""
         if not obj.main_image:
             return None
-        try:
-            return get_absolute_media_url(obj.main_image.url)
-        except Exception as e:
-            logger.error(f"[ProductListSerializer] Error getting image URL for product {obj.id}: {str(e)}")
-            return None
+        return absolute_media_url(obj.main_image.name)
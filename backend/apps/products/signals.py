@@ -1,15 +1,66 @@
-"""Example Product cleanup signal registration.
+"""Product signal registration.
 
-The production cleanup system is registered centrally by
-apps.core.apps.CoreConfig. This module is kept as a manual example for
-projects that want per-app registration instead.
+``register_product_cache_signals`` and ``register_product_suggest_signals``
+are called from ProductsConfig.ready and keep cached catalog responses and
+the suggestion index in sync with product writes.
+
+The cleanup helpers below are kept as a manual example: the production
+cleanup system is registered centrally by apps.core.apps.CoreConfig.
 """
 
-from django.db.models.signals import pre_delete, pre_save
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 
+from apps.core.response_cache import register_cache_invalidation
 from apps.core.s3_cleanup import cleanup_model_files_on_delete, cleanup_replaced_files_on_save
 from .models import Product
 
+logger = logging.getLogger(__name__)
+
+# Cache tags: every catalog listing depends on PRODUCTS_CACHE_TAG, while
+# per-product payloads depend on product_cache_tag(pk). Listings that embed
+# stock also depend on PRODUCTS_STOCK_CACHE_TAG, which stock moves bump in
+# debounced batches (see apps.products.inventory).
+PRODUCTS_CACHE_TAG = "products"
+PRODUCTS_STOCK_CACHE_TAG = "products-stock"
+
+
+def product_cache_tag(product_id) -> str:
+    """Return the cache tag for a single product."""
+    return f"product:{product_id}"
+
+
+def product_cache_tags(product) -> list:
+    """Return every cache tag invalidated by a write to ``product``."""
+    return [PRODUCTS_CACHE_TAG, product_cache_tag(product.pk)]
+
+
+def register_product_cache_signals() -> None:
+    """Invalidate cached product responses whenever a product changes."""
+    register_cache_invalidation(Product, product_cache_tags)
+
+
+def register_product_suggest_signals() -> None:
+    """Log saved and deleted product ids for the suggestion index once the write commits."""
+    from .suggest import record_product_changes
+
+    def log_change(sender, instance, **kwargs):
+        # Deletion clears instance.pk after the signal, so capture it now
+        product_id = instance.pk
+
+        def record():
+            try:
+                record_product_changes([product_id])
+            except Exception:
+                logger.exception("Failed to log product %s for the suggestion index", product_id)
+
+        transaction.on_commit(record)
+
+    post_save.connect(log_change, sender=Product, weak=False, dispatch_uid="products.product.post_save.suggest")
+    post_delete.connect(log_change, sender=Product, weak=False, dispatch_uid="products.product.post_delete.suggest")
+
 
 def register_product_cleanup_signals() -> None:
     """Manually register Product cleanup signals."""
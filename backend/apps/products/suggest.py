@@ -0,0 +1,396 @@
+"""In-memory, typo-tolerant product autocomplete index.
+
+Each worker keeps one ``SuggestionIndex`` over ``Product.name``, ``sku`` and
+``tags``. It is built in the background when the WSGI/ASGI application starts
+(``warm_suggestion_index``), or on first use if a request gets there first,
+and capped at ``PRODUCT_SUGGEST_MAX_PRODUCTS`` products.
+
+Freshness comes from a change log in the shared cache: product saves and
+deletes append the product id under an increasing sequence number (see
+``register_product_suggest_signals``). Before answering, the index compares
+the sequence with the one it last applied and re-reads only the logged ids.
+If log entries are missing (evicted, or too many to replay), it rebuilds.
+
+Matching per query term:
+
+- prefix match on any indexed token (score 1.0)
+- trigram similarity against the token vocabulary for typos (score scaled
+  by overlap), for terms of at least ``FUZZY_MIN_TERM_LENGTH`` characters
+
+Terms shorter than ``MIN_TERM_LENGTH`` are ignored, and every other term
+must match. Results are ranked by total score, then by whether the name
+starts with the query, then by shorter names.
+
+Postings are kept sorted by that static name order (shorter names first), so
+candidates for the most selective term are produced best first: names that
+start with it, then any other prefix match, then typo matches. They are
+checked against the remaining terms, and collection stops after
+``limit * CANDIDATE_POOL_FACTOR`` candidates without missing better ones.
+"""
+import heapq
+import logging
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+MIN_TERM_LENGTH = 2
+MAX_PREFIX_LENGTH = 10
+CANDIDATE_POOL_FACTOR = 8
+FUZZY_MIN_TERM_LENGTH = 3
+FUZZY_MIN_SIMILARITY = 0.4
+FUZZY_SCORE_WEIGHT = 0.8
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text: Any) -> List[str]:
+    """Lowercase word tokens of ``text``."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+def trigrams(token: str) -> Set[str]:
+    """pg_trgm-style trigrams of a single token (padded with spaces)."""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Document:
+    __slots__ = ('product_id', 'name', 'slug', 'sku', 'name_lower', 'tokens', 'leading', 'rank')
+
+    def __init__(self, product_id: int, name: str, slug: str, sku: Optional[str], tags: Any):
+        self.product_id = product_id
+        self.name = name
+        self.slug = slug
+        self.sku = sku
+        self.name_lower = (name or '').lower()
+
+        tag_values = tags if isinstance(tags, list) else []
+        name_tokens = tokenize(name)
+        tokens = set(name_tokens) | set(tokenize(sku))
+        for tag in tag_values:
+            tokens.update(tokenize(tag))
+        self.tokens = tokens
+        self.leading = name_tokens[0] if name_tokens else None
+        # Static part of the ranking: shorter names first, then alphabetical
+        self.rank = (len(self.name_lower), self.name_lower, product_id)
+
+    def as_suggestion(self) -> Dict[str, Any]:
+        return {'id': self.product_id, 'name': self.name, 'slug': self.slug, 'sku': self.sku}
+
+
+class SuggestionIndex:
+    """Prefix + trigram index over product names, SKUs and tags.
+
+    Prefixes and trigrams point at distinct tokens rather than products, so
+    fuzzy matching scans the (small) vocabulary and only the matched tokens
+    are expanded to product ids. Postings are ``(rank, product_id)`` lists
+    kept in ``_Document.rank`` order.
+    """
+
+    def __init__(self, max_products: int = 50000):
+        self.max_products = max_products
+        self._documents: Dict[int, _Document] = {}
+        self._token_ids: Dict[str, List[Tuple[tuple, int]]] = {}
+        # Postings of each name's first token, for "name starts with" matches
+        self._leading_ids: Dict[str, List[Tuple[tuple, int]]] = {}
+        self._building = False
+        self._prefixes: Dict[str, Set[str]] = defaultdict(set)
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.RLock()
+        self.is_built = False
+        # Change-log sequence this index reflects
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _post(self, table: Dict[str, list], token: str, entry: Tuple[tuple, int]) -> bool:
+        """Add ``entry`` to ``table[token]``; returns True if the posting is new."""
+        postings = table.get(token)
+        created = postings is None
+        if created:
+            postings = table[token] = []
+        if self._building:
+            postings.append(entry)  # sorted once the build finishes
+        else:
+            insort(postings, entry)
+        return created
+
+    @staticmethod
+    def _unpost(table: Dict[str, list], token: str, entry: Tuple[tuple, int]) -> bool:
+        """Remove ``entry`` from ``table[token]``; returns True if the posting is now gone."""
+        postings = table.get(token)
+        if postings is None:
+            return False
+        position = bisect_left(postings, entry)
+        if position < len(postings) and postings[position] == entry:
+            del postings[position]
+        if postings:
+            return False
+        del table[token]
+        return True
+
+    def _add_token(self, token: str, document: _Document) -> None:
+        if self._post(self._token_ids, token, (document.rank, document.product_id)):
+            for length in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1):
+                self._prefixes[token[:length]].add(token)
+            for gram in trigrams(token):
+                self._trigrams[gram].add(token)
+
+    def _remove_token(self, token: str, document: _Document) -> None:
+        if not self._unpost(self._token_ids, token, (document.rank, document.product_id)):
+            return
+        for length in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1):
+            self._discard(self._prefixes, token[:length], token)
+        for gram in trigrams(token):
+            self._discard(self._trigrams, gram, token)
+
+    @staticmethod
+    def _discard(table: Dict[str, Set[str]], key: str, token: str) -> None:
+        tokens = table.get(key)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del table[key]
+
+    def _add(self, document: _Document) -> None:
+        self._documents[document.product_id] = document
+        for token in document.tokens:
+            self._add_token(token, document)
+        if document.leading:
+            self._post(self._leading_ids, document.leading, (document.rank, document.product_id))
+
+    def _remove(self, product_id: int) -> None:
+        document = self._documents.pop(product_id, None)
+        if document is None:
+            return
+        for token in document.tokens:
+            self._remove_token(token, document)
+        if document.leading:
+            self._unpost(self._leading_ids, document.leading, (document.rank, product_id))
+
+    def upsert_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Add or replace products from dicts with id/name/slug/sku/tags."""
+        with self._lock:
+            for row in rows:
+                product_id = row['id']
+                if product_id not in self._documents and len(self._documents) >= self.max_products:
+                    logger.warning("Product suggestion index is full (%s products); skipping the rest", self.max_products)
+                    break
+                self._remove(product_id)
+                self._add(_Document(product_id, row['name'], row['slug'], row.get('sku'), row.get('tags')))
+
+    def remove_ids(self, product_ids: Iterable[int]) -> None:
+        """Drop ``product_ids`` from the index."""
+        with self._lock:
+            for product_id in product_ids:
+                self._remove(product_id)
+
+    def build_from_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Replace the whole index with ``rows``."""
+        with self._lock:
+            self._documents = {}
+            self._token_ids = {}
+            self._leading_ids = {}
+            self._prefixes = defaultdict(set)
+            self._trigrams = defaultdict(set)
+            self._building = True
+            try:
+                self.upsert_rows(rows)
+            finally:
+                self._building = False
+                for postings in (*self._token_ids.values(), *self._leading_ids.values()):
+                    postings.sort()
+            self.is_built = True
+
+    def _fuzzy_tokens(self, term: str) -> Dict[str, float]:
+        """Typo matches for one query term: tokens it is not a prefix of, by trigram overlap."""
+        matches: Dict[str, float] = {}
+        if len(term) < FUZZY_MIN_TERM_LENGTH:
+            return matches
+        term_grams = trigrams(term)
+        overlap: Dict[str, int] = defaultdict(int)
+        for gram in term_grams:
+            for token in self._trigrams.get(gram, ()):
+                overlap[token] += 1
+        for token, shared in overlap.items():
+            if token.startswith(term):
+                continue
+            similarity = shared / len(term_grams)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                matches[token] = FUZZY_SCORE_WEIGHT * similarity
+        return matches
+
+    def _prefix_tokens(self, term: str) -> Set[str]:
+        """Indexed tokens starting with ``term`` (a superset for terms over MAX_PREFIX_LENGTH)."""
+        return self._prefixes.get(term[:MAX_PREFIX_LENGTH], set())
+
+    def _candidates(self, term: str, fuzzy: Dict[str, float]) -> Iterator[Tuple[int, float]]:
+        """Yield ``(product_id, score)`` for one term in ranking order.
+
+        Names starting with ``term`` come first, then every other prefix
+        match, then typo matches by similarity; each group is merged in
+        ``_Document.rank`` order. A product may be yielded more than once;
+        its first score is its best.
+        """
+        prefix_tokens = [token for token in self._prefix_tokens(term) if token.startswith(term)]
+        leading = [self._leading_ids[token] for token in prefix_tokens if token in self._leading_ids]
+        for _rank, product_id in heapq.merge(*leading):
+            yield product_id, 1.0
+        for _rank, product_id in heapq.merge(*[self._token_ids[token] for token in prefix_tokens]):
+            yield product_id, 1.0
+        for token, score in sorted(fuzzy.items(), key=lambda item: -item[1]):
+            for _rank, product_id in self._token_ids[token]:
+                yield product_id, score
+
+    def _term_score(self, term: str, fuzzy: Dict[str, float], tokens: Set[str]) -> float:
+        """Best score of ``term`` against one product's tokens (0.0 for no match)."""
+        if len(term) <= MAX_PREFIX_LENGTH:
+            if not tokens.isdisjoint(self._prefix_tokens(term)):
+                return 1.0
+        elif any(token.startswith(term) for token in tokens):
+            return 1.0
+        if not fuzzy:
+            return 0.0
+        return max(fuzzy.get(token, 0.0) for token in tokens)
+
+    def search(self, query: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` ranked suggestions for ``query``."""
+        terms = [term for term in dict.fromkeys(tokenize(query)) if len(term) >= MIN_TERM_LENGTH]
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            # The most selective (longest) term supplies the candidates
+            terms.sort(key=len, reverse=True)
+            fuzzy = {term: self._fuzzy_tokens(term) for term in terms}
+            lead, others = terms[0], terms[1:]
+            documents = self._documents
+            pool_size = limit * CANDIDATE_POOL_FACTOR
+
+            scores: Dict[int, float] = {}
+            seen: Set[int] = set()
+            for product_id, score in self._candidates(lead, fuzzy[lead]):
+                if product_id in seen:
+                    continue
+                seen.add(product_id)
+                tokens = documents[product_id].tokens
+                for term in others:
+                    term_score = self._term_score(term, fuzzy[term], tokens)
+                    if not term_score:
+                        break
+                    score += term_score
+                else:
+                    scores[product_id] = score
+                    if len(scores) >= pool_size:
+                        break
+
+            query_lower = ' '.join(tokenize(query))
+            ranked = heapq.nsmallest(
+                limit,
+                scores.items(),
+                key=lambda item: (
+                    -item[1],
+                    not documents[item[0]].name_lower.startswith(query_lower),
+                    documents[item[0]].rank,
+                ),
+            )
+            return [documents[product_id].as_suggestion() for product_id, _score in ranked]
+
+
+CHANGE_LOG_KEY = 'products:suggest:changes'
+CHANGE_LOG_TIMEOUT = 60 * 60 * 24
+# Replaying more logged changes than this is slower than rebuilding
+CHANGE_LOG_MAX_REPLAY = 1000
+
+_index: Optional[SuggestionIndex] = None
+_index_lock = threading.Lock()
+
+
+def _change_key(sequence: int) -> str:
+    return f"{CHANGE_LOG_KEY}:{sequence}"
+
+
+def current_change_sequence() -> int:
+    """Sequence number of the latest logged product change (0 when none)."""
+    return cache.get(CHANGE_LOG_KEY) or 0
+
+
+def record_product_changes(product_ids: Iterable[int]) -> None:
+    """Log saved or deleted ``product_ids`` for every worker's index to re-read."""
+    for product_id in product_ids:
+        cache.add(CHANGE_LOG_KEY, 0, timeout=None)
+        sequence = cache.incr(CHANGE_LOG_KEY)
+        cache.set(_change_key(sequence), product_id, timeout=CHANGE_LOG_TIMEOUT)
+
+
+def read_product_changes(after: int) -> Optional[Tuple[int, Set[int]]]:
+    """
+    Return ``(sequence, product_ids)`` for changes logged after ``after``.
+
+    Returns None when the log cannot be replayed (entries expired or evicted,
+    the sequence went backwards after a cache flush, or too many changes),
+    in which case the caller rebuilds.
+    """
+    sequence = current_change_sequence()
+    if sequence < after or sequence - after > CHANGE_LOG_MAX_REPLAY:
+        return None
+    if sequence == after:
+        return sequence, set()
+    entries = cache.get_many([_change_key(seq) for seq in range(after + 1, sequence + 1)])
+    if len(entries) != sequence - after:
+        return None
+    return sequence, set(entries.values())
+
+
+def _product_rows(queryset):
+    return queryset.values('id', 'name', 'slug', 'sku', 'tags')
+
+
+def warm_suggestion_index() -> None:
+    """Build this worker's index in the background, so no request pays for the build."""
+    from apps.core.tasks import enqueue_task
+
+    enqueue_task(get_suggestion_index)
+
+
+def get_suggestion_index() -> SuggestionIndex:
+    """Return this worker's index, building or incrementally syncing it first."""
+    global _index
+    from .models import Product
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SuggestionIndex(
+                    max_products=int(getattr(settings, 'PRODUCT_SUGGEST_MAX_PRODUCTS', 50000))
+                )
+
+    index = _index
+    if index.is_built and index.version == current_change_sequence():
+        return index
+
+    with _index_lock:
+        changes = read_product_changes(index.version) if index.is_built else None
+        if changes is None:
+            # Changes logged while building are replayed by the next sync
+            sequence = current_change_sequence()
+            index.build_from_rows(_product_rows(Product.objects.order_by('-created_at')))
+            logger.info("Built product suggestion index with %s products", len(index))
+        else:
+            sequence, product_ids = changes
+            if product_ids:
+                rows = list(_product_rows(Product.objects.filter(id__in=product_ids)))
+                index.upsert_rows(rows)
+                index.remove_ids(product_ids - {row['id'] for row in rows})
+        index.version = sequence
+    return index
@@ -0,0 +1,12 @@
+"""
+Celery tasks for product caches.
+"""
+from celery import shared_task
+
+from .inventory import flush_stock_cache_tag as _flush_stock_cache_tag
+
+
+@shared_task
+def flush_stock_cache_tag():
+    """Refresh cached listings after stock moves (see CELERY_BEAT_SCHEDULE)."""
+    return _flush_stock_cache_tag()
@@ -0,0 +1,34 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.products.models import Product
+from apps.products.search import _prefix_tsquery, search_products
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Product.objects.create(name='Oak Dining Table', price=Decimal('300.00'), category='dining', sku='TBL-1')
+        Product.objects.create(
+            name='Corner Sofa',
+            price=Decimal('900.00'),
+            category='sofa',
+            short_description='Oak legs',
+        )
+        Product.objects.create(name='Wardrobe', price=Decimal('500.00'), category='wardrobe')
+
+    def test_prefix_tsquery_strips_operators(self):
+        self.assertEqual(_prefix_tsquery("oak & !so'fa"), 'oak:* & so:* & fa:*')
+
+    def test_every_term_must_match_some_field(self):
+        names = set(search_products(Product.objects.all(), 'oak table').values_list('name', flat=True))
+        self.assertEqual(names, {'Oak Dining Table'})
+
+    def test_search_endpoint_uses_search_backend(self):
+        response = APIClient().get('/api/products/', {'search': 'oak'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({item['name'] for item in response.json()}, {'Oak Dining Table', 'Corner Sofa'})
@@ -0,0 +1,115 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.products import suggest
+from apps.products.models import Product
+from apps.products.suggest import SuggestionIndex
+
+
+def _row(product_id, name, sku=None, tags=None):
+    return {'id': product_id, 'name': name, 'slug': f'p-{product_id}', 'sku': sku, 'tags': tags or []}
+
+
+class SuggestionIndexTests(TestCase):
+    def setUp(self):
+        self.index = SuggestionIndex()
+        self.index.build_from_rows([
+            _row(1, 'Walnut Dining Table', sku='PGF-001'),
+            _row(2, 'Leather Corner Sofa', tags=['lounge']),
+            _row(3, 'Oak Dining Chair'),
+        ])
+
+    def _names(self, query):
+        return [item['name'] for item in self.index.search(query)]
+
+    def test_prefix_match_on_every_term(self):
+        self.assertEqual(self._names('din tab'), ['Walnut Dining Table'])
+        self.assertEqual(self._names('loun'), ['Leather Corner Sofa'])
+        self.assertEqual(self._names('pgf-001'), ['Walnut Dining Table'])
+
+    def test_typo_tolerant_match(self):
+        self.assertEqual(self._names('lether'), ['Leather Corner Sofa'])
+        self.assertEqual(self._names('xyzzy'), [])
+
+    def test_upsert_and_remove_keep_index_in_sync(self):
+        self.index.upsert_rows([_row(2, 'Velvet Corner Sofa')])
+        self.index.remove_ids({1})
+        self.assertEqual(self._names('leather'), [])
+        self.assertEqual(self._names('velvet'), ['Velvet Corner Sofa'])
+        self.assertEqual(self._names('walnut'), [])
+
+    def test_single_character_terms_are_ignored(self):
+        self.assertEqual(self._names('d'), [])
+        self.assertEqual(self._names('oak d'), ['Oak Dining Chair'])
+
+    def test_broad_prefix_stops_at_candidate_pool_without_losing_the_best(self):
+        index = SuggestionIndex()
+        # Long names first, so insertion order is the opposite of ranking order
+        rows = [_row(product_id, f'Corner Sofa Deluxe {product_id}') for product_id in range(1, 501)]
+        rows += [_row(501, 'Sofa'), _row(502, 'Loveseat Sofa')]
+        index.build_from_rows(rows)
+        consumed = []
+        candidates = index._candidates
+
+        def counting_candidates(term, fuzzy):
+            for item in candidates(term, fuzzy):
+                consumed.append(item)
+                yield item
+
+        index._candidates = counting_candidates
+        self.assertEqual([item['name'] for item in index.search('so', limit=2)], ['Sofa', 'Loveseat Sofa'])
+        self.assertEqual(len({product_id for product_id, _score in consumed}), 2 * suggest.CANDIDATE_POOL_FACTOR)
+
+        # Incremental upserts keep postings in ranking order
+        index.upsert_rows([_row(7, 'Sofa Bed')])
+        self.assertEqual([item['name'] for item in index.search('sofa', limit=2)], ['Sofa', 'Sofa Bed'])
+
+class SuggestEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        suggest._index = None
+        self.client = APIClient()
+
+    def tearDown(self):
+        suggest._index = None
+
+    def test_endpoint_follows_product_writes(self):
+        Product.objects.create(name='Oak Wardrobe', slug='oak-wardrobe', price='100.00')
+        response = self.client.get('/api/products/suggest/', {'q': 'wardrobr'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['name'] for item in response.data['results']], ['Oak Wardrobe'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name='Oak Bookcase', slug='oak-bookcase', price='80.00')
+        response = self.client.get('/api/products/suggest/', {'q': 'oak'})
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_sync_replays_logged_changes_without_rescanning(self):
+        oak = Product.objects.create(name='Oak Wardrobe', slug='oak-wardrobe', price='100.00')
+        Product.objects.create(name='Oak Bookcase', slug='oak-bookcase', price='80.00')
+        suggest.get_suggestion_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            oak.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name='Oak Sideboard', slug='oak-sideboard', price='90.00')
+        # Only the two logged ids are re-read
+        with self.assertNumQueries(1):
+            index = suggest.get_suggestion_index()
+        self.assertEqual(sorted(item['name'] for item in index.search('oak')), ['Oak Bookcase', 'Oak Sideboard'])
+
+        with self.assertNumQueries(0):
+            suggest.get_suggestion_index()
+
+    def test_warm_builds_the_index_off_the_request(self):
+        Product.objects.create(name='Oak Wardrobe', slug='oak-wardrobe', price='100.00')
+        with mock.patch('apps.core.tasks.enqueue_task', side_effect=lambda func, *args: func(*args)) as enqueue:
+            suggest.warm_suggestion_index()
+        enqueue.assert_called_once()
+        self.assertTrue(suggest._index.is_built)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/products/suggest/', {'q': 'oak'})
+        self.assertEqual([item['name'] for item in response.data['results']], ['Oak Wardrobe'])
@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.products.models import Product
+
+
+class ByCategoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for index in range(3):
+            Product.objects.create(name=f'Sofa {index}', slug=f'sofa-{index}', category='sofa', price='10.00')
+        Product.objects.create(name='Desk', slug='desk', category='office', price='20.00')
+
+    def test_groups_every_category_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/products/by_category/')
+        self.assertEqual(list(response.data), [key for key, _name in Product.CATEGORY_CHOICES])
+        self.assertEqual([item['slug'] for item in response.data['sofa']], ['sofa-2', 'sofa-1', 'sofa-0'])
+        self.assertEqual(len(response.data['office']), 1)
+        self.assertEqual(response.data['bed'], [])
+
+    def test_limit_per_category_keeps_newest(self):
+        response = self.client.get('/api/products/by_category/', {'limit_per_category': 2})
+        self.assertEqual([item['slug'] for item in response.data['sofa']], ['sofa-2', 'sofa-1'])
+        self.assertEqual(len(response.data['office']), 1)
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Product.objects.create(name='Oak Sofa', slug='oak-sofa', category='sofa', price='8000.00',
+                               material='Oak', color='Brown', tags=['living', 'wood'])
+        Product.objects.create(name='Velvet Sofa', slug='velvet-sofa', category='sofa', price='30000.00',
+                               material='Velvet', color='Green', tags=['living'])
+        Product.objects.create(name='Oak Bed', slug='oak-bed', category='bed', price='60000.00',
+                               material='Oak', color='Brown', tags=['bedroom', 'wood'])
+
+    def _counts(self, data, dimension, key='value'):
+        return {entry[key]: entry['count'] for entry in data[dimension]}
+
+    def test_counts_follow_other_filters_in_one_query(self):
+        self.client.get('/api/products/facets/')  # warm the facet vocabulary
+        params = {'category': 'sofa', 'tag': 'wood'}
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/products/facets/', params)
+        data = response.data
+
+        self.assertEqual(data['total'], 1)
+        # Category facet ignores the category selection but honours the tag
+        self.assertEqual(self._counts(data, 'category'), {'sofa': 1, 'bed': 1})
+        self.assertEqual(self._counts(data, 'tag'), {'living': 2, 'wood': 1})
+        self.assertEqual(self._counts(data, 'material'), {'Oak': 1})
+        self.assertEqual(self._counts(data, 'price', key='key')['under-10000'], 1)
+
+    def test_filter_set_is_normalized_for_caching(self):
+        self.client.get('/api/products/facets/', {'color': 'Green,Brown'})
+        with self.assertNumQueries(0):
+            self.client.get('/api/products/facets/?color=Brown&color=Green&utm_source=mail')
+
+    def test_listing_accepts_facet_filters(self):
+        response = self.client.get('/api/products/', {'tag': 'wood', 'max_price': '50000'})
+        self.assertEqual([item['slug'] for item in response.data], ['oak-sofa'])
+
+
+class BatchLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.chair = Product.objects.create(name='Chair', slug='chair', price='10.00')
+        self.desk = Product.objects.create(name='Desk', slug='desk', price='20.00')
+
+    def test_preserves_order_reports_missing_and_reads_through_cache(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/products/batch/', {'ids': f'{self.desk.id},999,{self.chair.id}'})
+        self.assertEqual([item['slug'] for item in response.data['results']], ['desk', 'chair'])
+        self.assertEqual(response.data['missing'], [999])
+
+        with self.assertNumQueries(0):
+            self.client.post('/api/products/batch/', {'ids': [self.chair.id, self.desk.id]}, format='json')
+
+    def test_product_write_refreshes_only_its_entry(self):
+        self.client.get('/api/products/batch/', {'ids': f'{self.chair.id},{self.desk.id}'})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chair.name = 'Armchair'
+            self.chair.save()
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/products/batch/', {'ids': f'{self.chair.id},{self.desk.id}'})
+        self.assertEqual(response.data['results'][0]['name'], 'Armchair')
+
+    def test_rejects_bad_input(self):
+        self.assertEqual(self.client.get('/api/products/batch/', {'ids': '1,abc'}).status_code, 400)
+        too_many = ','.join(str(i) for i in range(1, 302))
+        self.assertEqual(self.client.get('/api/products/batch/', {'ids': too_many}).status_code, 400)
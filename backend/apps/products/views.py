@@ -1,13 +1,22 @@
-from django.conf import settings
-from django.core.cache import cache
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
+from rest_framework.throttling import ScopedRateThrottle
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 from django_filters.rest_framework import DjangoFilterBackend
 from apps.core.db import ensure_db_connection
+from apps.core.pagination import KeysetPagination
+from apps.core.response_cache import build_cache_key, cached_response, get_or_set_many_payloads, get_tag_versions
 from .models import Product
+from .facets import ProductFilter, facet_counts, normalized_query, parse_filter_state
+from .search import ProductSearchFilter, search_products
 from .serializers import ProductSerializer, ProductListSerializer
+from .signals import PRODUCTS_CACHE_TAG, PRODUCTS_STOCK_CACHE_TAG, product_cache_tag
+from .suggest import get_suggestion_index
+
+BATCH_MAX_IDS = 300
 
 
 class ProductViewSet(viewsets.ModelViewSet):
@@ -21,27 +30,26 @@ class ProductViewSet(viewsets.ModelViewSet):
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
+    # Unpaginated by default; ?cursor= opts into keyset pages
+    pagination_class = KeysetPagination
     
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'featured', 'on_sale']
+    # ProductSearchFilter runs last so relevance ranking survives the default ordering
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, ProductSearchFilter]
+    filterset_class = ProductFilter
     search_fields = ['name', 'description', 'short_description', 'sku']
     ordering_fields = ['price', 'created_at', 'name']
     ordering = ['-created_at']
-
-    def _cache_timeout(self):
-        return int(getattr(settings, 'API_RESPONSE_CACHE_TTL', 120))
+    # Only read by ScopedRateThrottle, which is enabled on the suggest action
+    throttle_scope = None
 
     def _cache_key(self, action_name, request):
-        return f"products:{action_name}:{request.get_full_path()}"
+        # Every cached action here serializes stock/in_stock
+        return build_cache_key(
+            'products', action_name, request, tags=[PRODUCTS_CACHE_TAG, PRODUCTS_STOCK_CACHE_TAG]
+        )
 
     def _cache_response_or_fetch(self, key, fetcher):
-        cached_payload = cache.get(key)
-        if cached_payload is not None:
-            return Response(cached_payload)
-
-        payload = fetcher()
-        cache.set(key, payload, timeout=self._cache_timeout())
-        return Response(payload)
+        return cached_response(self.request, key, fetcher)
     
     def get_serializer_class(self):
         """Use lightweight serializer for list views."""
@@ -62,6 +70,15 @@ class ProductViewSet(viewsets.ModelViewSet):
             return response.data
 
         return self._cache_response_or_fetch(cache_key, fetch_payload)
+
+    def retrieve(self, request, *args, **kwargs):
+        cache_key = self._cache_key('retrieve', request)
+
+        def fetch_payload():
+            response = super(ProductViewSet, self).retrieve(request, *args, **kwargs)
+            return response.data
+
+        return self._cache_response_or_fetch(cache_key, fetch_payload)
     
     @action(detail=False, methods=['get'])
     def featured(self, request):
@@ -89,31 +106,109 @@ class ProductViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def by_category(self, request):
-        """Get products grouped by category."""
+        """
+        Get products grouped by category.
+
+        One query for all categories; ?limit_per_category=N keeps only the N
+        newest products of each category (ROW_NUMBER() window).
+        """
         cache_key = self._cache_key('by_category', request)
+        try:
+            limit_per_category = int(request.query_params.get('limit_per_category', 0))
+        except (TypeError, ValueError):
+            limit_per_category = 0
 
         def fetch_payload():
-            categories = Product.CATEGORY_CHOICES
-            result = {}
-            for cat_key, _cat_name in categories:
-                products = self.get_queryset().filter(category=cat_key)
-                result[cat_key] = ProductListSerializer(
-                    products,
-                    many=True,
-                    context={'request': request}
-                ).data
+            category_keys = [cat_key for cat_key, _cat_name in Product.CATEGORY_CHOICES]
+            products = self.get_queryset().filter(category__in=category_keys).order_by('-created_at', '-id')
+            if limit_per_category > 0:
+                products = products.annotate(
+                    category_rank=Window(
+                        expression=RowNumber(),
+                        partition_by=[F('category')],
+                        order_by=[F('created_at').desc(), F('id').desc()],
+                    )
+                ).filter(category_rank__lte=limit_per_category)
+
+            result = {cat_key: [] for cat_key in category_keys}
+            for item in ProductListSerializer(products, many=True, context={'request': request}).data:
+                result[item['category']].append(item)
             return result
 
         return self._cache_response_or_fetch(cache_key, fetch_payload)
 
-    def perform_create(self, serializer):
-        super().perform_create(serializer)
-        cache.clear()
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Facet counts for the filter sidebar.
+
+        Accepts the listing filters (category, material, color, tag,
+        min_price, max_price, featured, on_sale, search) and is cached per
+        normalized filter set.
+        """
+        state = parse_filter_state(request.query_params)
+        cache_key = build_cache_key(
+            'products', 'facets', request, tags=[PRODUCTS_CACHE_TAG], query=normalized_query(state)
+        )
 
-    def perform_update(self, serializer):
-        super().perform_update(serializer)
-        cache.clear()
+        def fetch_payload():
+            queryset = search_products(self.get_queryset(), state.get('search', ''), rank=False)
+            return facet_counts(queryset, state)
+
+        return self._cache_response_or_fetch(cache_key, fetch_payload)
 
-    def perform_destroy(self, instance):
-        super().perform_destroy(instance)
-        cache.clear()
+    @action(detail=False, methods=['get', 'post'], permission_classes=[AllowAny])
+    def batch(self, request):
+        """
+        Resolve many products by id in one request.
+
+        GET /api/products/batch/?ids=3,1,2
+        POST /api/products/batch/ {"ids": [3, 1, 2]}
+
+        Results keep the request order; unknown ids are listed in "missing".
+        Each product is cached on its own, so overlapping batches share entries.
+        """
+        raw_ids = request.data.get('ids') if request.method == 'POST' else request.query_params.get('ids', '')
+        if isinstance(raw_ids, str):
+            raw_ids = [part for part in raw_ids.split(',') if part.strip()]
+        if not isinstance(raw_ids, list):
+            return Response({'error': 'ids must be a list or a comma-separated string'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = list(dict.fromkeys(int(value) for value in raw_ids))
+        except (TypeError, ValueError):
+            return Response({'error': 'ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > BATCH_MAX_IDS:
+            return Response(
+                {'error': f'At most {BATCH_MAX_IDS} ids per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        versions = get_tag_versions(product_cache_tag(product_id) for product_id in ids)
+        keys = {
+            product_id: f"products:item:{product_id}:{versions[product_cache_tag(product_id)]}"
+            for product_id in ids
+        }
+
+        def fetch_missing(missing_ids):
+            ensure_db_connection()
+            products = list(Product.objects.filter(id__in=missing_ids))
+            serialized = ProductListSerializer(products, many=True, context={'request': request}).data
+            return {item['id']: item for item in serialized}
+
+        payloads = get_or_set_many_payloads(keys, fetch_missing)
+        return Response({
+            'results': [payloads[product_id] for product_id in ids if product_id in payloads],
+            'missing': [product_id for product_id in ids if product_id not in payloads],
+        })
+
+    @action(detail=False, methods=['get'], throttle_classes=[ScopedRateThrottle], throttle_scope='suggest')
+    def suggest(self, request):
+        """Search-as-you-type suggestions served from the in-memory index."""
+        query = request.query_params.get('q', '').strip()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 8)), 1), 20)
+        except (TypeError, ValueError):
+            limit = 8
+
+        results = get_suggestion_index().search(query, limit=limit) if query else []
+        return Response({'query': query, 'results': results})
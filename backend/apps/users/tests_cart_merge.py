@@ -2,6 +2,7 @@ from django.test import TestCase
 from rest_framework.test import APIClient
 
 from apps.cart.models import Cart, CartItem
+from apps.products.models import Product
 from apps.users.models import User
 
 
@@ -13,6 +14,9 @@ class LoginCartMergeTests(TestCase):
             email='cartuser@example.com',
             password='StrongPass123!',
         )
+        # Merged ids are validated against the catalog
+        self.sofa = Product.objects.create(name='Sofa', slug='sofa', price='100.00')
+        self.bed = Product.objects.create(name='Bed', slug='bed', price='200.00')
 
     def test_login_merges_guest_cart_items_into_persistent_cart(self):
         response = self.client.post(
@@ -22,8 +26,8 @@ class LoginCartMergeTests(TestCase):
                 'password': 'StrongPass123!',
                 'cart': {
                     'items': [
-                        {'product_id': 101, 'quantity': 2},
-                        {'product_id': 202, 'quantity': 1},
+                        {'product_id': self.sofa.id, 'quantity': 2},
+                        {'product_id': self.bed.id, 'quantity': 1},
                     ]
                 },
             },
@@ -33,26 +37,26 @@ class LoginCartMergeTests(TestCase):
         self.assertEqual(response.status_code, 200)
 
         cart = Cart.objects.get(user=self.user)
-        item_101 = CartItem.objects.get(cart=cart, product_id=101)
-        item_202 = CartItem.objects.get(cart=cart, product_id=202)
+        sofa_item = CartItem.objects.get(cart=cart, product_id=self.sofa.id)
+        bed_item = CartItem.objects.get(cart=cart, product_id=self.bed.id)
 
-        self.assertEqual(item_101.quantity, 2)
-        self.assertEqual(item_202.quantity, 1)
+        self.assertEqual(sofa_item.quantity, 2)
+        self.assertEqual(bed_item.quantity, 1)
 
     def test_login_merges_quantities_when_product_already_exists(self):
         cart, _ = Cart.objects.get_or_create(user=self.user)
-        CartItem.objects.create(cart=cart, product_id=101, quantity=1)
+        CartItem.objects.create(cart=cart, product_id=self.sofa.id, quantity=1)
 
         response = self.client.post(
             '/api/users/login/',
             {
                 'email': self.user.email,
                 'password': 'StrongPass123!',
-                'cart': [{'product_id': 101, 'quantity': 3}],
+                'cart': [{'product_id': self.sofa.id, 'quantity': 3}],
             },
             format='json',
         )
 
         self.assertEqual(response.status_code, 200)
-        item_101 = CartItem.objects.get(cart=cart, product_id=101)
-        self.assertEqual(item_101.quantity, 4)
+        sofa_item = CartItem.objects.get(cart=cart, product_id=self.sofa.id)
+        self.assertEqual(sofa_item.quantity, 4)
@@ -1,5 +1,4 @@
 import logging
-from django.db import transaction
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -12,7 +11,8 @@ from .serializers import (
     RefreshTokenSerializer,
 )
 from .jwt_utils import create_access_token, create_refresh_token, decode_token
-from apps.cart.models import Cart, CartItem
+from apps.cart.guest import merge_guest_cart
+from apps.cart.services import merge_guest_items
 
 logger = logging.getLogger(__name__)
 
@@ -130,21 +130,9 @@ class UserViewSet(viewsets.ModelViewSet):
                 guest_items = cart_payload
 
             if guest_items:
-                cart, _ = Cart.objects.get_or_create(user=user)
-                with transaction.atomic():
-                    for item in guest_items:
-                        product_id = item.get('product_id')
-                        quantity = int(item.get('quantity', 1))
-                        if not product_id:
-                            continue
-                        cart_item, created = CartItem.objects.get_or_create(
-                            cart=cart,
-                            product_id=product_id,
-                            defaults={'quantity': quantity},
-                        )
-                        if not created:
-                            cart_item.quantity += quantity
-                            cart_item.save(update_fields=['quantity'])
+                merge_guest_items(user, guest_items)
+            # Server-side guest cart kept for this session (apps.cart.guest)
+            merge_guest_cart(request.session.session_key, user)
         except Exception as exc:
             logger.exception(f"Guest cart merge failed during login: {exc}")
 
@@ -19,6 +19,11 @@ except Exception:
 
 django_asgi_app = get_asgi_application()
 
+# Build the product autocomplete index before the first suggest request
+from apps.products.suggest import warm_suggestion_index  # noqa: E402
+
+warm_suggestion_index()
+
 if NotificationConsumerAuthMiddleware:
 	application = ProtocolTypeRouter({
 		"http": django_asgi_app,
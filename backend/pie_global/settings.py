@@ -3,6 +3,7 @@ Django settings for Pie Global Furniture project.
 """
 
 import os
+import sys
 from pathlib import Path
 from urllib.parse import urlparse
 from decouple import AutoConfig, Csv
@@ -292,6 +293,12 @@ else:
 # Always define MEDIA_ROOT for local file access (uploads script, migrations, etc.)
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resume point of canonicalize_media_paths (last committed id per model)
+MEDIA_PATH_CHECKPOINT_FILE = config(
+    'MEDIA_PATH_CHECKPOINT_FILE',
+    default=str(BASE_DIR / 'logs' / 'canonicalize_media_paths.json'),
+)
+
 # Media files (uploads) - defined in S3 or local storage config above
 
 # Base URL for serving media in production/development
@@ -357,19 +364,82 @@ REST_FRAMEWORK = {
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',
         'user': '1000/hour',
+        # Search-as-you-type fires on every keystroke
+        'suggest': '120/minute',
     },
 }
 
-# Lightweight in-memory response caching for high-traffic read endpoints
+# Response caching for high-traffic read endpoints
 API_RESPONSE_CACHE_TTL = config('API_RESPONSE_CACHE_TTL', default=120, cast=int)
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'pie-global-cache',
-        'TIMEOUT': API_RESPONSE_CACHE_TTL,
+# Shared (L2) cache used by every worker. Production points CACHE_REDIS_URL at
+# Redis. Without it, a file-backed cache in CACHE_FILE_DIR (inside the project,
+# not the system temp dir) is the local/dev stand-in, so every runserver or
+# gunicorn worker of this checkout sees the same entries and tag bumps. Test
+# runs always get a private in-memory cache so they never share state.
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='').strip()
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test' or 'pytest' in sys.modules
+
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'TIMEOUT': API_RESPONSE_CACHE_TTL,
+            'KEY_PREFIX': 'pgf',
+        }
     }
-}
+elif TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'pie-global-cache',
+            'TIMEOUT': API_RESPONSE_CACHE_TTL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_FILE_DIR', default='').strip() or str(BASE_DIR / '.cache' / 'responses'),
+            'TIMEOUT': API_RESPONSE_CACHE_TTL,
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Catalog payloads embed stock, which orders move without bumping the
+# catalog-wide cache tag. Stock moves only mark the "products-stock" tag
+# dirty; flush_stock_cache_tag bumps it at most every
+# PRODUCT_STOCK_CACHE_FLUSH_INTERVAL seconds (see CELERY_BEAT_SCHEDULE).
+PRODUCT_STOCK_CACHE_FLUSH_INTERVAL = config('PRODUCT_STOCK_CACHE_FLUSH_INTERVAL', default=30, cast=int)
+
+# Per-process (L1) LRU in front of the shared cache. Workers drop L1 entries
+# together via Redis pub/sub on RESPONSE_CACHE_INVALIDATION_CHANNEL; without
+# Redis, tag versions are always read from the shared cache instead.
+RESPONSE_CACHE_L1_MAX_ENTRIES = config('RESPONSE_CACHE_L1_MAX_ENTRIES', default=512, cast=int)
+RESPONSE_CACHE_L1_TTL = config('RESPONSE_CACHE_L1_TTL', default=30, cast=int)
+RESPONSE_CACHE_INVALIDATION_CHANNEL = config(
+    'RESPONSE_CACHE_INVALIDATION_CHANNEL',
+    default='pgf:response-cache:invalidate',
+)
+
+# Stampede protection: expired entries are served for up to
+# RESPONSE_CACHE_STALE_TTL seconds while one background refresh runs; on a
+# cold miss, concurrent requests wait up to RESPONSE_CACHE_LOCK_WAIT_MS for
+# the single request that recomputes the payload.
+RESPONSE_CACHE_STALE_TTL = config('RESPONSE_CACHE_STALE_TTL', default=60, cast=int)
+RESPONSE_CACHE_LOCK_TIMEOUT = config('RESPONSE_CACHE_LOCK_TIMEOUT', default=10, cast=int)
+RESPONSE_CACHE_LOCK_WAIT_MS = config('RESPONSE_CACHE_LOCK_WAIT_MS', default=2000, cast=int)
+
+# Per-worker in-memory product autocomplete index
+PRODUCT_SUGGEST_MAX_PRODUCTS = config('PRODUCT_SUGGEST_MAX_PRODUCTS', default=50000, cast=int)
+
+# Admin dashboard summary/alerts are cached per role for a few seconds
+ADMIN_DASHBOARD_CACHE_TTL = config('ADMIN_DASHBOARD_CACHE_TTL', default=5, cast=int)
+
+# Bounded thread pool for best-effort background work (cache refreshes)
+BACKGROUND_TASK_POOL_SIZE = config('BACKGROUND_TASK_POOL_SIZE', default=4, cast=int)
+BACKGROUND_TASK_POOL_BACKLOG = config('BACKGROUND_TASK_POOL_BACKLOG', default=32, cast=int)
 
 # Celery configuration using Redis as broker and backend
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=REDIS_URL)
@@ -378,6 +448,32 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+CELERY_BEAT_SCHEDULE = {
+    'compact-abandoned-carts': {
+        'task': 'apps.cart.tasks.compact_abandoned_carts',
+        'schedule': 60 * 60 * 6,  # seconds
+    },
+    # Expired notifications leave the unread counters when this soft deletes them
+    'cleanup-expired-notifications': {
+        'task': 'apps.notifications.tasks.cleanup_expired_notifications',
+        'schedule': 60 * 5,
+    },
+    'flush-stock-cache-tag': {
+        'task': 'apps.products.tasks.flush_stock_cache_tag',
+        'schedule': PRODUCT_STOCK_CACHE_FLUSH_INTERVAL,
+    },
+    'reconcile-notification-counters': {
+        'task': 'apps.notifications.tasks.reconcile_notification_counters',
+        'schedule': 60 * 60 * 24,
+    },
+}
+
+# Guest carts live in the cache for GUEST_CART_TTL seconds and are copied to
+# the database at most every GUEST_CART_PERSIST_INTERVAL seconds. Empty carts
+# and guest carts idle for CART_ABANDONED_DAYS are removed by compact_carts.
+GUEST_CART_TTL = config('GUEST_CART_TTL', default=60 * 60 * 24 * 14, cast=int)
+GUEST_CART_PERSIST_INTERVAL = config('GUEST_CART_PERSIST_INTERVAL', default=300, cast=int)
+CART_ABANDONED_DAYS = config('CART_ABANDONED_DAYS', default=30, cast=int)
 
 # JWT configuration for custom auth tokens
 JWT_ACCESS_TTL_MINUTES = config('JWT_ACCESS_TTL_MINUTES', default=30, cast=int)
@@ -8,3 +8,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pie_global.settings')
 
 application = get_wsgi_application()
+
+# Build the product autocomplete index before the first suggest request
+from apps.products.suggest import warm_suggestion_index  # noqa: E402
+
+warm_suggestion_index()
@@ -170,6 +170,15 @@ export const productsApi = {
     const response = await api.get<Record<string, Product[]>>('/products/by_category/');
     return response.data;
   },
+
+  // Resolve many product ids in one round trip (results keep the given order)
+  getBatch: async (ids: number[]) => {
+    type BatchResponse = { results: Product[]; missing: number[] };
+    const response = ids.length > 100
+      ? await api.post<BatchResponse>('/products/batch/', { ids })
+      : await api.get<BatchResponse>('/products/batch/', { params: { ids: ids.join(',') } });
+    return response.data;
+  },
 };
 
 // Orders API
@@ -399,6 +408,11 @@ export const cartApi = {
     const response = await api.get<CartResponse>('/cart/');
     return response.data;
   },
+  // Lightweight badge data (item count, total, version) without the full cart
+  getSummary: async () => {
+    const response = await api.get<{ total_items: number; total_price: number; version: string }>('/cart/summary/');
+    return response.data;
+  },
   addToCart: async (productId: number, quantity: number = 1) => {
     const response = await api.post<any>('/cart/add/', { product_id: productId, quantity });
     return response.data;